@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'analyzer.middleware.metrics_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -142,3 +143,101 @@ GEMINI_CACHE_RESULTS = os.getenv('GEMINI_CACHE_RESULTS', 'True').lower() == 'tru
 # AI Analysis Configuration
 AI_ANALYSIS_ENABLED = True  # Habilita sistema de IA local
 GEMINI_ANALYSIS_ENABLED = (GOOGLE_API_KEY or GEMINI_API_KEY) is not None  # Habilita Gemini se API key estiver configurada
+
+# Material Icons Warmup
+# 'sync': carrega os ícones ao iniciar o worker (antes do fork em servidores prefork)
+# 'background': carrega em uma thread de segundo plano
+# 'off': carrega apenas no primeiro uso
+MATERIAL_ICONS_WARMUP = os.getenv('MATERIAL_ICONS_WARMUP', 'sync').lower()
+
+# Serve o catálogo de ícones a partir de um arquivo mmap compartilhado entre os workers
+MATERIAL_ICONS_SHARED_CATALOG = os.getenv('MATERIAL_ICONS_SHARED_CATALOG', 'True').lower() == 'true'
+
+# Análise em lote (upload de vários projetos / manage.py analyze_batch)
+BATCH_ANALYSIS_WORKERS = int(os.getenv('BATCH_ANALYSIS_WORKERS', 2))
+# O upload em lote só enfileira os projetos (BatchJob); a fila é processada fora do
+# servidor web por `manage.py process_batch_queue --loop` (serviço próprio ou cron).
+# Análises "em andamento" há mais de BATCH_JOB_STALLED_MINUTES (processo encerrado no
+# meio) voltam para a fila, até BATCH_JOB_MAX_ATTEMPTS tentativas; depois viram erro.
+BATCH_JOB_STALLED_MINUTES = float(os.getenv('BATCH_JOB_STALLED_MINUTES', 30))
+BATCH_JOB_MAX_ATTEMPTS = int(os.getenv('BATCH_JOB_MAX_ATTEMPTS', 2))
+# Permite selecionar uma turma inteira de .aia em um único upload
+DATA_UPLOAD_MAX_NUMBER_FILES = int(os.getenv('DATA_UPLOAD_MAX_NUMBER_FILES', 500))
+
+# Cache do Django (relatórios renderizados). O padrão é em memória por processo;
+# com vários workers, prefira um backend compartilhado (ex.: FileBasedCache ou Redis)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'aia-analyzer'),
+    }
+}
+REPORT_CACHE_TIMEOUT = int(os.getenv('REPORT_CACHE_TIMEOUT', 24 * 60 * 60))
+
+# Imagens reduzidas usadas nas análises de pixels (analyzer/image_loading.py):
+# entradas do cache LRU por processo, com chave no hash do conteúdo (0 desativa)
+IMAGE_THUMBNAIL_CACHE_SIZE = int(os.getenv('IMAGE_THUMBNAIL_CACHE_SIZE', 256))
+
+# GIFs animados (analyzer/gif_frames.py): acima destes limites a animação perde
+# pontos no score do asset e gera um problema 'animation' no relatório
+GIF_MAX_FRAMES = int(os.getenv('GIF_MAX_FRAMES', 100))
+# Memória para decodificar todos os quadros (largura × altura × 4 × quadros), em MB
+GIF_MAX_DECODED_MB = float(os.getenv('GIF_MAX_DECODED_MB', 32))
+
+# Memória estimada dos bitmaps decodificados (analyzer/memory_footprint.py), em MB:
+# telas e imagens acima destes limites são sinalizadas na seção de desempenho
+SCREEN_BITMAP_BUDGET_MB = float(os.getenv('SCREEN_BITMAP_BUDGET_MB', 24))
+ASSET_BITMAP_BUDGET_MB = float(os.getenv('ASSET_BITMAP_BUDGET_MB', 8))
+
+# Tempo por etapa de cada análise (AnalysisRun.timings, exibido em file_detail)
+ANALYSIS_TIMING_ENABLED = os.getenv('ANALYSIS_TIMING_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+
+# Perfil de CPU/memória das análises (analyzer/profiling.py). Com ANALYSIS_PROFILING
+# todas as análises rodam sob cProfile + tracemalloc (várias vezes mais lentas) e o
+# perfil é guardado quando a análise leva ao menos ANALYSIS_PROFILE_MIN_MS. Staff
+# também pode perfilar uma única análise com ?profile=1. Os arquivos ficam fora de
+# MEDIA_ROOT e são baixados pelo admin.
+ANALYSIS_PROFILING = os.getenv('ANALYSIS_PROFILING', 'False').lower() in ('1', 'true', 'yes')
+ANALYSIS_PROFILE_MIN_MS = float(os.getenv('ANALYSIS_PROFILE_MIN_MS', 0))
+ANALYSIS_PROFILE_ROOT = os.getenv('ANALYSIS_PROFILE_ROOT', str(BASE_DIR / 'analysis_profiles'))
+
+# Métricas no formato do Prometheus em /metrics (analyzer/metrics.py).
+# Com vários processos (gunicorn, análise em lote), aponte METRICS_MULTIPROC_DIR
+# para um diretório compartilhado e esvazie-o a cada reinício do serviço.
+# Com METRICS_TOKEN definido, /metrics exige "Authorization: Bearer <token>".
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR', '')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Logs (analyzer/logs.py). LOG_FORMAT=json emite uma linha JSON por registro,
+# com analysis_id/aia_file_id das mensagens emitidas durante uma análise.
+# Erros repetidos no mesmo ponto do código são limitados a LOG_RATE_LIMIT_BURST
+# mensagens a cada LOG_RATE_LIMIT_WINDOW segundos.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'analysis_context': {'()': 'analyzer.logs.AnalysisContextFilter'},
+        'rate_limit': {
+            '()': 'analyzer.logs.RateLimitFilter',
+            'window': float(os.getenv('LOG_RATE_LIMIT_WINDOW', 60)),
+            'burst': int(os.getenv('LOG_RATE_LIMIT_BURST', 5)),
+        },
+    },
+    'formatters': {
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s %(analysis_tag)s%(message)s'},
+        'json': {'()': 'analyzer.logs.JsonFormatter'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'text',
+            'filters': ['analysis_context', 'rate_limit'],
+        },
+    },
+    'loggers': {
+        'analyzer': {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False},
+    },
+}
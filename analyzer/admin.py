@@ -1,5 +1,14 @@
+import os
+
 from django.contrib import admin
-from .models import AiaFile, ImageAsset, UsabilityEvaluation
+from django.http import FileResponse, Http404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .models import (
+    AiaFile, ImageAsset, UsabilityEvaluation, DashboardStats, ReportSection, Finding, AnalysisRun, AssetReference,
+    BatchJob,
+)
 
 
 @admin.register(AiaFile)
@@ -12,8 +21,8 @@ class AiaFileAdmin(admin.ModelAdmin):
 
 @admin.register(ImageAsset)
 class ImageAssetAdmin(admin.ModelAdmin):
-    list_display = ['name', 'aia_file', 'asset_type', 'quality_rating', 'width', 'height', 'file_size']
-    list_filter = ['asset_type', 'quality_rating', 'format']
+    list_display = ['name', 'aia_file', 'asset_type', 'quality_rating', 'width', 'height', 'file_size', 'is_referenced']
+    list_filter = ['asset_type', 'quality_rating', 'format', 'is_referenced']
     search_fields = ['name', 'aia_file__name']
     readonly_fields = ['created_at']
 
@@ -22,3 +31,92 @@ class ImageAssetAdmin(admin.ModelAdmin):
 class UsabilityEvaluationAdmin(admin.ModelAdmin):
     list_display = ['aia_file', 'overall_usability_score', 'image_quality_score', 'icon_quality_score', 'evaluated_at']
     readonly_fields = ['evaluated_at']
+
+
+@admin.register(ReportSection)
+class ReportSectionAdmin(admin.ModelAdmin):
+    list_display = ['evaluation', 'key', 'position']
+    list_filter = ['key']
+    search_fields = ['evaluation__aia_file__name']
+
+
+@admin.register(Finding)
+class FindingAdmin(admin.ModelAdmin):
+    list_display = ['evaluation', 'category', 'severity', 'screen', 'image_asset', 'created_at']
+    list_filter = ['category', 'severity', 'created_at']
+    search_fields = ['evaluation__aia_file__name', 'message']
+    raw_id_fields = ['evaluation', 'image_asset']
+    readonly_fields = ['created_at']
+
+
+@admin.register(AssetReference)
+class AssetReferenceAdmin(admin.ModelAdmin):
+    list_display = ['asset_name', 'aia_file', 'screen', 'component', 'property', 'source']
+    list_filter = ['source', 'component_type']
+    search_fields = ['asset_name', 'aia_file__name', 'component']
+    raw_id_fields = ['aia_file', 'image_asset']
+
+
+@admin.register(BatchJob)
+class BatchJobAdmin(admin.ModelAdmin):
+    list_display = ['aia_file', 'status', 'attempts', 'queued_at', 'started_at', 'finished_at']
+    list_filter = ['status', 'queued_at']
+    search_fields = ['aia_file__name', 'error']
+    raw_id_fields = ['aia_file']
+
+
+@admin.register(AnalysisRun)
+class AnalysisRunAdmin(admin.ModelAdmin):
+    list_display = ['aia_file', 'started_at', 'status', 'duration_ms', 'has_profile']
+    list_filter = ['status', 'started_at']
+    search_fields = ['aia_file__name']
+    fields = ['aia_file', 'started_at', 'status', 'duration_ms', 'error', 'timings', 'profile_downloads']
+    readonly_fields = fields
+    
+    # Arquivos de perfil (ver profiling.py): ficam fora de MEDIA_ROOT e são entregues por esta view
+    PROFILE_FILES = {
+        'pstats': ('profile_stats', 'application/octet-stream'),
+        'memory': ('memory_report', 'text/plain; charset=utf-8'),
+    }
+    
+    @admin.display(boolean=True, description='Perfil')
+    def has_profile(self, obj):
+        return bool(obj.profile_stats)
+    
+    @admin.display(description='Perfil de CPU/memória')
+    def profile_downloads(self, obj):
+        if not obj.profile_stats:
+            return 'Sem perfil (analise com ?profile=1 ou ANALYSIS_PROFILING)'
+        return format_html(
+            '<a href="{}">Baixar .pstats</a> &middot; <a href="{}">Baixar relatório de memória</a>',
+            reverse('admin:analyzer_analysisrun_profile', args=[obj.pk, 'pstats']),
+            reverse('admin:analyzer_analysisrun_profile', args=[obj.pk, 'memory']),
+        )
+    
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/profile/<str:kind>/',
+                self.admin_site.admin_view(self.download_profile),
+                name='analyzer_analysisrun_profile',
+            ),
+        ] + super().get_urls()
+    
+    def download_profile(self, request, pk, kind):
+        run = self.get_object(request, str(pk))
+        if run is None or not self.has_view_permission(request, run) or kind not in self.PROFILE_FILES:
+            raise Http404
+        field_name, content_type = self.PROFILE_FILES[kind]
+        field = getattr(run, field_name)
+        if not field or not field.storage.exists(field.name):
+            raise Http404
+        return FileResponse(
+            field.open('rb'), as_attachment=True,
+            filename=os.path.basename(field.name), content_type=content_type,
+        )
+
+
+@admin.register(DashboardStats)
+class DashboardStatsAdmin(admin.ModelAdmin):
+    list_display = ['total_files', 'analyzed_files', 'total_images', 'updated_at']
+    readonly_fields = ['total_files', 'analyzed_files', 'total_images', 'updated_at']
@@ -1,6 +1,49 @@
+import gc
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AnalyzerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analyzer'
+
+    def ready(self):
+        from . import signals  # noqa: F401 - registra os receivers de DashboardStats
+
+        mode = self._material_icons_warmup_mode()
+        if mode is None:
+            return
+
+        from .utils import warmup_material_icons
+        warmup_material_icons(background=(mode == 'background'))
+
+        if mode == 'sync' and hasattr(gc, 'freeze'):
+            # Move os objetos já carregados para a geração permanente do GC, evitando
+            # que coletas nos workers "sujem" as páginas compartilhadas após o fork
+            gc.freeze()
+
+    def _material_icons_warmup_mode(self):
+        """
+        Decide se e como pré-carregar os ícones Material Design neste processo
+
+        Retorna 'sync', 'background' ou None. Comandos de gerenciamento (migrate,
+        shell, etc.) não pagam pelo carregamento; apenas servidores (WSGI/ASGI e
+        runserver) o fazem.
+        """
+        mode = str(getattr(settings, 'MATERIAL_ICONS_WARMUP', 'sync')).lower()
+        if mode not in ('sync', 'background'):
+            return None
+
+        argv = sys.argv
+        if argv and os.path.basename(argv[0]) in ('manage.py', 'django-admin', 'django-admin.py'):
+            command = argv[1] if len(argv) > 1 else ''
+            if command != 'runserver':
+                return None
+            # O autoreloader executa ready() também no processo pai, que não atende requisições
+            if os.environ.get('RUN_MAIN') != 'true' and '--noreload' not in argv:
+                return None
+
+        return mode
@@ -0,0 +1,126 @@
+"""
+Grafo de Referências dos Assets
+===============================
+
+Liga cada arquivo da pasta assets/ do projeto aos componentes e telas que o
+usam, em uma única passada pelas telas (feita junto com a análise de layout,
+que já lê os .scm):
+
+- Designer (.scm): qualquer propriedade de componente cujo valor é o nome de
+  um asset (Picture, Image, BackgroundImage, Icon, Source...);
+- Blocos (.bky): textos com o nome de um asset (ex.: "set Image1.Picture to
+  'gato.png'"), uma referência por tela e asset.
+
+    asset_names = list_asset_names(pasta_do_projeto)
+    uses = collect_designer_references('Screen1', screen_data, asset_names)
+    uses += collect_block_references('Screen1', blocks_xml, asset_names)
+
+O grafo fica na tabela AssetReference. Com ele:
+
+- imagens sem nenhuma referência (ImageAsset.is_referenced = False) só
+  aumentam o APK: saem das médias do score e viram um problema 'unused';
+- o tipo do asset (ícone, fundo, botão, imagem) vem do uso real
+  (usage_asset_type) em vez do nome do arquivo e das dimensões.
+"""
+
+import os
+import re
+from typing import NamedTuple
+from xml.sax.saxutils import unescape
+
+
+ASSETS_DIR = 'assets'
+BLOCK_TEXT_FIELD = re.compile(r'<field name="TEXT">([^<]*)</field>')
+
+# Mesmos limites de determine_asset_type para ícones (pequenos e quase quadrados)
+ICON_MAX_SIZE = 128
+ICON_MAX_SIDE_DIFFERENCE = 32
+
+
+class AssetUse(NamedTuple):
+    screen: str
+    component: str
+    component_type: str
+    property: str
+    asset: str
+    source: str  # 'designer' ou 'blocks'
+
+
+def list_asset_names(project_dir):
+    """Nomes dos arquivos em assets/ (como aparecem nas propriedades dos componentes)"""
+    assets_dir = os.path.join(project_dir, ASSETS_DIR)
+    if not os.path.isdir(assets_dir):
+        return frozenset()
+    return frozenset(name for name in os.listdir(assets_dir) if os.path.isfile(os.path.join(assets_dir, name)))
+
+
+def collect_designer_references(screen_name, screen_data, asset_names):
+    """
+    Propriedades dos componentes de uma tela que apontam para assets, na ordem da árvore
+
+    Returns:
+        lista de AssetUse
+    """
+    uses = []
+    if not asset_names:
+        return uses
+    stack = [screen_data.get('Properties', {})]
+    while stack:
+        component = stack.pop()
+        for prop, value in component.items():
+            if not prop.startswith('$') and isinstance(value, str) and value in asset_names:
+                uses.append(AssetUse(
+                    screen_name, component.get('$Name', ''), component.get('$Type', ''), prop, value, 'designer',
+                ))
+        stack.extend(reversed(component.get('$Components', [])))
+    return uses
+
+
+def collect_block_references(screen_name, blocks_xml, asset_names):
+    """
+    Assets citados em textos dos blocos de uma tela (uma referência por asset)
+
+    Returns:
+        lista de AssetUse
+    """
+    uses = []
+    seen = set()
+    if not asset_names:
+        return uses
+    for text in BLOCK_TEXT_FIELD.findall(blocks_xml):
+        name = unescape(text, {'&quot;': '"', '&apos;': "'"}).strip()
+        if name in asset_names and name not in seen:
+            seen.add(name)
+            uses.append(AssetUse(screen_name, '', '', '', name, 'blocks'))
+    return uses
+
+
+def group_by_asset(uses):
+    """{nome do asset: [AssetUse, ...]}"""
+    graph = {}
+    for use in uses:
+        graph.setdefault(use.asset, []).append(use)
+    return graph
+
+
+def usage_asset_type(uses, width, height):
+    """
+    Tipo do asset pelo uso no Designer (ASSET_TYPE_CHOICES de ImageAsset)
+
+    Returns:
+        'icon', 'background', 'button' ou 'image'; None se o asset não é usado no
+        Designer (só nos blocos ou em nenhum lugar) e o tipo precisa ser estimado
+    """
+    properties = {(use.component_type, use.property) for use in uses if use.source == 'designer'}
+    if not properties:
+        return None
+    if ('Form', 'Icon') in properties:
+        return 'icon'  # ícone do app
+    if any(prop == 'BackgroundImage' for _, prop in properties):
+        return 'background'
+    if any(prop == 'Image' for _, prop in properties):
+        # Imagem de botão: pequena e quadrada funciona como ícone
+        if width <= ICON_MAX_SIZE and height <= ICON_MAX_SIZE and abs(width - height) <= ICON_MAX_SIDE_DIFFERENCE:
+            return 'icon'
+        return 'button'
+    return 'image'
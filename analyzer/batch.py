@@ -0,0 +1,410 @@
+"""
+Análise em Lote de Projetos .aia
+================================
+
+Permite corrigir uma turma inteira de uma vez: os projetos (.aia soltos ou
+dentro de um .zip) são cadastrados como AiaFile e analisados em paralelo por
+processos (ProcessPoolExecutor). O resultado é uma planilha de notas única
+em CSV ou JSON.
+
+Os caches pesados (catálogo de ícones Material Design, atlas de ícones e
+bibliotecas de cor) são carregados no processo principal antes de criar o
+pool: com o método de início 'fork' (padrão no Linux) os processos filhos
+herdam tudo já aquecido, compartilhando as páginas de memória.
+
+Usado por `manage.py analyze_batch <dir>` e pela página de upload em lote.
+A página de upload não analisa nada no processo do servidor web: ela apenas
+enfileira os projetos (BatchJob, enqueue_batch), e a fila é processada por
+`manage.py process_batch_queue` (process_queue). Cada resultado é gravado no
+BatchJob assim que o projeto termina; análises interrompidas (processo
+encerrado, máquina reiniciada) são detectadas pelo tempo em andamento e
+voltam para a fila (requeue_stalled).
+"""
+
+import csv
+import json
+import datetime
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.db import connection, connections
+from django.db.models import F
+from django.utils import timezone
+
+from .metrics import BATCH_QUEUE_DEPTH
+from .models import AiaFile, BatchJob
+
+
+# Limites dos .zip de turma, conferidos no diretório central do .zip antes de
+# descompactar qualquer membro (um .zip pequeno pode expandir para gigabytes)
+MAX_AIA_BYTES = 50 * 1024 * 1024              # mesmo limite do upload de um .aia
+MAX_ZIP_MEMBERS = 500
+MAX_ZIP_TOTAL_BYTES = 2 * 1024 * 1024 * 1024
+
+GRADE_SHEET_FIELDS = [
+    'id', 'name', 'status', 'error', 'total_images', 'total_icons',
+    'image_quality_score', 'icon_quality_score', 'overall_usability_score',
+    'high_quality_images', 'low_quality_images', 'oversized_images',
+    'undersized_images', 'total_issues', 'elapsed_seconds',
+]
+
+
+def project_name_from_filename(filename):
+    """Mesmo critério de AiaFileUploadForm.clean_name"""
+    name = os.path.basename(filename)
+    return name.replace('.aia', '').replace('_', ' ').replace('-', ' ').title() or 'Projeto sem nome'
+
+
+def iter_source_paths(paths):
+    """Arquivos .aia e .zip dos caminhos informados (diretórios são percorridos)"""
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            yield from sorted(
+                p for p in path.rglob('*')
+                if p.is_file() and p.suffix.lower() in ('.aia', '.zip')
+            )
+        elif path.suffix.lower() in ('.aia', '.zip'):
+            yield path
+
+
+def check_aia_sources(paths):
+    """
+    Valida todos os .zip antes de qualquer cadastro (só lê os diretórios dos .zip)
+
+    Raises:
+        ZipLimitError: algum .zip excede os limites (zip_aia_members)
+        zipfile.BadZipFile: algum .zip está corrompido
+    """
+    for path in iter_source_paths(paths):
+        if path.suffix.lower() == '.zip':
+            with zipfile.ZipFile(path) as archive:
+                try:
+                    zip_aia_members(archive)
+                except ZipLimitError as e:
+                    raise ZipLimitError(f'{path.name}: {e}') from e
+
+
+def iter_aia_sources(paths):
+    """
+    Percorre arquivos .aia em diretórios, arquivos soltos e arquivos .zip
+
+    Yields:
+        (nome_do_arquivo, bytes)
+    """
+    for path in iter_source_paths(paths):
+        if path.suffix.lower() == '.aia':
+            yield path.name, path.read_bytes()
+        else:
+            with zipfile.ZipFile(path) as archive:
+                yield from iter_zip_members(archive)
+
+
+class ZipLimitError(ValueError):
+    """Um .zip de turma com membros grandes demais ou em excesso"""
+
+
+def zip_aia_members(archive):
+    """
+    Membros .aia de um .zip (ignora diretórios e outros arquivos), validados
+    pelos tamanhos descompactados declarados no .zip
+
+    Raises:
+        ZipLimitError: membro acima de MAX_AIA_BYTES, mais de MAX_ZIP_MEMBERS
+                       projetos ou total acima de MAX_ZIP_TOTAL_BYTES
+    """
+    members = []
+    total = 0
+    for info in sorted(archive.infolist(), key=lambda info: info.filename):
+        if info.is_dir() or not info.filename.lower().endswith('.aia'):
+            continue
+        if os.path.basename(info.filename).startswith('.'):
+            continue  # metadados do macOS (__MACOSX/._arquivo.aia)
+        if info.file_size > MAX_AIA_BYTES:
+            raise ZipLimitError(
+                f'{info.filename} tem {info.file_size / 1024 / 1024:.0f}MB descompactado '
+                f'(máximo: {MAX_AIA_BYTES // 1024 // 1024}MB por projeto)'
+            )
+        members.append(info)
+        total += info.file_size
+        if len(members) > MAX_ZIP_MEMBERS:
+            raise ZipLimitError(f'O .zip tem mais de {MAX_ZIP_MEMBERS} projetos')
+        if total > MAX_ZIP_TOTAL_BYTES:
+            raise ZipLimitError(
+                f'O .zip descompactado passa de {MAX_ZIP_TOTAL_BYTES // 1024 // 1024}MB'
+            )
+    return members
+
+
+def iter_zip_members(archive):
+    """
+    Arquivos .aia contidos em um .zip, validados antes da leitura (zip_aia_members)
+
+    Yields:
+        (nome_do_arquivo, bytes)
+    """
+    # A validação vem antes do primeiro yield: nada é cadastrado de um .zip recusado
+    members = zip_aia_members(archive)
+    for info in members:
+        # ZipExtFile nunca devolve mais que info.file_size bytes, mesmo com cabeçalho falso
+        yield os.path.basename(info.filename), archive.read(info)
+
+
+def create_aia_files(sources, uploaded_by=None):
+    """
+    Cadastra cada (nome_do_arquivo, bytes|arquivo) como um AiaFile
+
+    Returns:
+        lista de AiaFile criados, na ordem recebida
+    """
+    created = []
+    for filename, content in sources:
+        aia_file = AiaFile(name=project_name_from_filename(filename), uploaded_by=uploaded_by)
+        if isinstance(content, bytes):
+            aia_file.file.save(os.path.basename(filename), ContentFile(content), save=False)
+        else:
+            aia_file.file.save(os.path.basename(filename), File(content), save=False)
+        aia_file.save()
+        created.append(aia_file)
+    return created
+
+
+def warm_analysis_caches():
+    """
+    Carrega no processo atual os caches compartilhados pela análise
+    (antes do fork, para que os processos do pool os herdem)
+    """
+    from . import utils
+
+    utils.ensure_material_icons_loaded()
+    utils.wcag_contrast_ratio.try_load()
+    utils.colour.try_load()
+    atlas_module = utils.icon_atlas.try_load()
+    if atlas_module is not None:
+        atlas_module.get_atlas()
+
+
+def _init_batch_worker():
+    """Inicializador de cada processo do pool"""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        # Métodos de início 'spawn'/'forkserver' não herdam o Django configurado
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aia_analyzer.settings')
+        django.setup()
+        warm_analysis_caches()
+
+    # Várias conexões escrevendo no mesmo SQLite: espera o lock em vez de falhar
+    if connection.vendor == 'sqlite':
+        connection.settings_dict.setdefault('OPTIONS', {}).setdefault('timeout', 60)
+
+
+def analyze_one(aia_file_id):
+    """
+    Analisa um AiaFile (executado nos processos do pool)
+
+    Returns:
+        dict com 'id', 'status' ('ok' ou 'error'), 'error' e 'elapsed_seconds'
+    """
+    from .utils import analyze_aia_file
+
+    started = time.perf_counter()
+    result = {'id': aia_file_id, 'status': 'ok', 'error': ''}
+    try:
+        analyze_aia_file(AiaFile.objects.get(pk=aia_file_id))
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+    result['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+    return result
+
+
+def analyze_batch(aia_file_ids, max_workers=None, progress=None):
+    """
+    Analisa vários AiaFile em paralelo
+
+    Args:
+        aia_file_ids: ids dos arquivos a analisar
+        max_workers: processos do pool (None = número de CPUs, 1 = serial no processo atual)
+        progress: callable(resultado, concluídos, total) chamado a cada projeto
+
+    Returns:
+        {id: resultado de analyze_one}
+    """
+    aia_file_ids = list(aia_file_ids)
+    results = {}
+    total = len(aia_file_ids)
+
+    # Fila exposta em /metrics: projetos do lote ainda não concluídos
+    BATCH_QUEUE_DEPTH.inc(total)
+    try:
+        if max_workers == 1 or total <= 1:
+            for done, aia_file_id in enumerate(aia_file_ids, start=1):
+                results[aia_file_id] = analyze_one(aia_file_id)
+                BATCH_QUEUE_DEPTH.dec()
+                if progress:
+                    progress(results[aia_file_id], done, total)
+            return results
+
+        warm_analysis_caches()
+        # Conexões abertas não podem ser compartilhadas com os processos filhos
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_batch_worker) as executor:
+            futures = {executor.submit(analyze_one, aia_file_id): aia_file_id for aia_file_id in aia_file_ids}
+            for done, future in enumerate(as_completed(futures), start=1):
+                aia_file_id = futures[future]
+                try:
+                    results[aia_file_id] = future.result()
+                except Exception as e:  # processo do pool encerrado abruptamente
+                    results[aia_file_id] = {
+                        'id': aia_file_id, 'status': 'error', 'error': str(e), 'elapsed_seconds': None,
+                    }
+                BATCH_QUEUE_DEPTH.dec()
+                if progress:
+                    progress(results[aia_file_id], done, total)
+
+        return results
+    finally:
+        BATCH_QUEUE_DEPTH.dec(total - len(results))
+
+
+def enqueue_batch(aia_file_ids):
+    """Coloca os projetos na fila de process_queue (upload em lote pela web)"""
+    return BatchJob.objects.bulk_create([BatchJob(aia_file_id=aia_file_id) for aia_file_id in aia_file_ids])
+
+
+def requeue_stalled(stalled_after=None, max_attempts=None):
+    """
+    Devolve à fila os jobs em andamento há mais de `stalled_after` (o processo
+    que os analisava morreu); os que já esgotaram as tentativas viram erro
+
+    Returns:
+        (devolvidos à fila, marcados como erro)
+    """
+    if stalled_after is None:
+        stalled_after = datetime.timedelta(minutes=getattr(settings, 'BATCH_JOB_STALLED_MINUTES', 30))
+    if max_attempts is None:
+        max_attempts = getattr(settings, 'BATCH_JOB_MAX_ATTEMPTS', 2)
+
+    stalled = BatchJob.objects.filter(status='running', started_at__lt=timezone.now() - stalled_after)
+    failed = stalled.filter(attempts__gte=max_attempts).update(
+        status='error', finished_at=timezone.now(),
+        error=f'Análise interrompida {max_attempts} vez(es) (processo encerrado antes de concluir)',
+    )
+    requeued = stalled.filter(attempts__lt=max_attempts).update(status='queued', started_at=None)
+    return requeued, failed
+
+
+def claim_jobs(limit=None):
+    """
+    Marca como em andamento os próximos jobs da fila
+
+    Cada job é tomado com um UPDATE condicional (status ainda 'queued'): dois
+    processadores rodando ao mesmo tempo nunca pegam o mesmo projeto.
+
+    Returns:
+        lista de BatchJob tomados
+    """
+    queued = BatchJob.objects.filter(status='queued').order_by('queued_at', 'id')
+    candidates = list(queued.values_list('pk', flat=True)[:limit] if limit else queued.values_list('pk', flat=True))
+    claimed = []
+    for pk in candidates:
+        if BatchJob.objects.filter(pk=pk, status='queued').update(
+            status='running', started_at=timezone.now(), attempts=F('attempts') + 1, error='',
+        ):
+            claimed.append(pk)
+    return list(BatchJob.objects.filter(pk__in=claimed).order_by('queued_at', 'id'))
+
+
+def process_queue(max_workers=None, limit=None, progress=None):
+    """
+    Analisa os jobs da fila (analyze_batch), gravando cada resultado no BatchJob
+
+    Returns:
+        {id do AiaFile: resultado de analyze_one}
+    """
+    requeue_stalled()
+    jobs = claim_jobs(limit)
+    if not jobs:
+        return {}
+    job_ids = {}
+    for job in jobs:
+        job_ids.setdefault(job.aia_file_id, []).append(job.pk)
+
+    def record(result, done, total):
+        BatchJob.objects.filter(pk__in=job_ids[result['id']]).update(
+            status=result['status'], error=result['error'], finished_at=timezone.now(),
+        )
+        if progress:
+            progress(result, done, total)
+
+    return analyze_batch(list(job_ids), max_workers=max_workers, progress=record)
+
+
+def grade_sheet_rows(aia_file_ids, results=None):
+    """
+    Linhas da planilha de notas, na ordem de aia_file_ids
+
+    Args:
+        results: resultados de analyze_batch (status, erro e tempo); sem eles,
+                 o status é derivado de is_analyzed
+    """
+    results = results or {}
+    aia_files = AiaFile.objects.select_related('evaluation').in_bulk(list(aia_file_ids))
+    # Último job de cada projeto (upload em lote pela web): status e erro gravados pela fila;
+    # a ordem explícita garante que o job mais recente sobrescreve os anteriores no dict
+    jobs = {
+        job.aia_file_id: job
+        for job in BatchJob.objects.filter(aia_file_id__in=list(aia_file_ids)).order_by('queued_at', 'id')
+    }
+
+    rows = []
+    for aia_file_id in aia_file_ids:
+        aia_file = aia_files.get(aia_file_id)
+        if aia_file is None:
+            continue
+        result = results.get(aia_file_id, {})
+        job = jobs.get(aia_file_id)
+        if not result and job is not None:
+            result = {'status': job.status if job.status in ('ok', 'error') else 'pending', 'error': job.error}
+        evaluation = getattr(aia_file, 'evaluation', None)
+        row = dict.fromkeys(GRADE_SHEET_FIELDS, '')
+        row.update({
+            'id': aia_file.pk,
+            'name': aia_file.name,
+            'status': result.get('status') or ('ok' if aia_file.is_analyzed else 'pending'),
+            'error': result.get('error', ''),
+            'total_images': aia_file.total_images,
+            'total_icons': aia_file.total_icons,
+            'elapsed_seconds': result.get('elapsed_seconds', ''),
+        })
+        if evaluation is not None:
+            row.update({
+                'image_quality_score': round(evaluation.image_quality_score, 1),
+                'icon_quality_score': round(evaluation.icon_quality_score, 1),
+                'overall_usability_score': round(evaluation.overall_usability_score, 1),
+                'high_quality_images': evaluation.high_quality_images_count,
+                'low_quality_images': evaluation.low_quality_images_count,
+                'oversized_images': evaluation.oversized_images_count,
+                'undersized_images': evaluation.undersized_images_count,
+                'total_issues': evaluation.total_issues,
+            })
+        rows.append(row)
+    return rows
+
+
+def write_grade_sheet(rows, output, fmt='csv'):
+    """Grava a planilha de notas em um arquivo aberto em modo texto (CSV ou JSON)"""
+    if fmt == 'json':
+        json.dump(rows, output, ensure_ascii=False, indent=2)
+        return
+    writer = csv.DictWriter(output, fieldnames=GRADE_SHEET_FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
@@ -48,3 +48,49 @@ class AiaFileUploadForm(forms.ModelForm):
             name = file.name.replace('.aia', '').replace('_', ' ').replace('-', ' ').title()
         
         return name or 'Projeto sem nome'
+
+
+class MultipleFileInput(forms.ClearableFileInput):
+    """Widget de arquivo que aceita várias seleções"""
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    """Campo que valida e retorna uma lista de arquivos"""
+    
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('widget', MultipleFileInput())
+        super().__init__(*args, **kwargs)
+    
+    def clean(self, data, initial=None):
+        single_file_clean = super().clean
+        if isinstance(data, (list, tuple)):
+            return [single_file_clean(d, initial) for d in data]
+        return [single_file_clean(data, initial)]
+
+
+class BatchUploadForm(forms.Form):
+    """Form for uploading several .aia files (or a .zip with .aia files) at once"""
+    
+    files = MultipleFileField(
+        label='Arquivos .aia ou .zip',
+        widget=MultipleFileInput(attrs={
+            'class': 'form-control',
+            'accept': '.aia,.zip'
+        }),
+    )
+    
+    def clean_files(self):
+        """Validate uploaded files"""
+        files = self.cleaned_data.get('files') or []
+        
+        for file in files:
+            if not file.name.lower().endswith(('.aia', '.zip')):
+                raise forms.ValidationError(f'{file.name}: envie apenas arquivos .aia ou .zip')
+            
+            # Check file size (50MB por projeto, 500MB por .zip)
+            limit_mb = 500 if file.name.lower().endswith('.zip') else 50
+            if file.size > limit_mb * 1024 * 1024:
+                raise forms.ValidationError(f'{file.name} é muito grande. Tamanho máximo: {limit_mb}MB')
+        
+        return files
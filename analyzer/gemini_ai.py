@@ -49,15 +49,20 @@ import logging
 from typing import Dict, List, Optional, Tuple
 from PIL import Image
 import io
-
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-    print("⚠️ Google Gemini não disponível. Instale: pip install google-generativeai")
+import time
 
 from django.conf import settings
+from .lazy_imports import LazyModule
+from .metrics import GEMINI_ERRORS, GEMINI_REQUEST_DURATION, GEMINI_UNAVAILABLE
+from .timing import timed
+
+logger = logging.getLogger(__name__)
+
+# google.generativeai (grpc, protobuf) só é importado ao inicializar o GeminiAnalyzer
+genai = LazyModule(
+    'google.generativeai',
+    install_hint="Google Gemini não disponível. Instale: pip install google-generativeai"
+)
 
 
 class GeminiAnalyzer:
@@ -73,7 +78,7 @@ class GeminiAnalyzer:
     
     def _initialize_gemini(self):
         """Inicializa a conexão com Gemini AI"""
-        if not GEMINI_AVAILABLE:
+        if not genai.is_available():
             return
         
         # Buscar API key (Google prefere GOOGLE_API_KEY)
@@ -85,7 +90,7 @@ class GeminiAnalyzer:
         )
         
         if not self.api_key:
-            print("⚠️ API key não configurada. Configure GOOGLE_API_KEY ou GEMINI_API_KEY.")
+            logger.warning('API key não configurada. Configure GOOGLE_API_KEY ou GEMINI_API_KEY.')
             return
         
         try:
@@ -101,10 +106,10 @@ class GeminiAnalyzer:
                 # Fallback para modelo principal se visão não disponível
                 self.vision_model = self.model
             
-            print("✅ Gemini AI inicializado com sucesso!")
+            logger.info('Gemini AI inicializado')
             
         except Exception as e:
-            print(f"❌ Erro ao inicializar Gemini: {e}")
+            logger.error('Erro ao inicializar Gemini: %s', e)
             self.model = None
             self.vision_model = None
     
@@ -112,6 +117,14 @@ class GeminiAnalyzer:
         """Verifica se Gemini está disponível e configurado"""
         return self.model is not None and self.vision_model is not None
     
+    def _generate(self, call: str, model, content):
+        """Chamada à API (model.generate_content) com a latência registrada em /metrics"""
+        started = time.perf_counter()
+        try:
+            return model.generate_content(content)
+        finally:
+            GEMINI_REQUEST_DURATION.observe(time.perf_counter() - started, call=call)
+    
     def _clean_json_response(self, text: str) -> str:
         """Limpa resposta do Gemini removendo markdown formatting"""
         text = text.strip()
@@ -208,14 +221,15 @@ class GeminiAnalyzer:
             - visual_style: "Amigável Educacional", "Profissional", "Divertido", "Minimalista", "Criativo"
             """
             
-            response = self.model.generate_content(prompt)
+            response = self._generate('context', self.model, prompt)
             text = self._clean_json_response(response.text)
             result = json.loads(text)
             
             return result
             
         except Exception as e:
-            print(f"⚠️ Erro na análise contextual com Gemini: {e}")
+            GEMINI_ERRORS.inc(call='context')
+            logger.warning('Erro na análise contextual com Gemini: %s', e)
             return self._fallback_context_analysis(project_name, images)
     
     def analyze_image_quality_with_ai(self, image_path: str, image_name: str) -> Dict:
@@ -312,14 +326,15 @@ class GeminiAnalyzer:
             }}
             """
             
-            response = self.vision_model.generate_content([prompt, img])
+            response = self._generate('image', self.vision_model, [prompt, img])
             text = self._clean_json_response(response.text)
             result = json.loads(text)
             
             return result
             
         except Exception as e:
-            print(f"⚠️ Erro na análise de imagem com Gemini: {e}")
+            GEMINI_ERRORS.inc(call='image')
+            logger.warning('Erro na análise de imagem com Gemini: %s', e)
             return {"score": 75, "issues": [], "suggestions": []}
     
     def generate_intelligent_recommendations(self, context: Dict, scores: Dict, images: List, detailed_analysis: List) -> List[str]:
@@ -402,7 +417,7 @@ class GeminiAnalyzer:
             Mantenha tom encorajador e educativo, adequado para ambiente de aprendizagem.
             """
             
-            response = self.model.generate_content(prompt)
+            response = self._generate('recommendations', self.model, prompt)
             
             # Processar resposta
             recommendations = self._process_ai_recommendations(response.text)
@@ -410,7 +425,8 @@ class GeminiAnalyzer:
             return recommendations
             
         except Exception as e:
-            print(f"⚠️ Erro na geração de recomendações com Gemini: {e}")
+            GEMINI_ERRORS.inc(call='recommendations')
+            logger.warning('Erro na geração de recomendações com Gemini: %s', e)
             return self._fallback_recommendations(context, scores, images)
     
     def analyze_accessibility_with_ai(self, images: List) -> Dict:
@@ -522,14 +538,15 @@ class GeminiAnalyzer:
             }}
             """
             
-            response = self.model.generate_content(prompt)
+            response = self._generate('accessibility', self.model, prompt)
             text = self._clean_json_response(response.text)
             result = json.loads(text)
             
             return result
             
         except Exception as e:
-            print(f"⚠️ Erro na análise de acessibilidade com Gemini: {e}")
+            GEMINI_ERRORS.inc(call='accessibility')
+            logger.warning('Erro na análise de acessibilidade com Gemini: %s', e)
             return {"score": 80, "issues": [], "recommendations": []}
     
     def generate_priority_matrix(self, context: Dict, scores: Dict, issues: List) -> Dict:
@@ -564,14 +581,15 @@ class GeminiAnalyzer:
             }}
             """
             
-            response = self.model.generate_content(prompt)
+            response = self._generate('priority_matrix', self.model, prompt)
             text = self._clean_json_response(response.text)
             result = json.loads(text)
             
             return result
             
         except Exception as e:
-            print(f"⚠️ Erro na matriz de prioridades com Gemini: {e}")
+            GEMINI_ERRORS.inc(call='priority_matrix')
+            logger.warning('Erro na matriz de prioridades com Gemini: %s', e)
             return self._basic_priority_matrix(issues)
     
     def _prepare_image_summary(self, images: List, detailed_analysis: List) -> str:
@@ -715,6 +733,7 @@ class GeminiAnalyzer:
 
 
 # Função principal para integração com o sistema existente
+@timed('gemini')
 def analyze_with_gemini_ai(aia_file, images: List, scores: Dict, project_name: str = "") -> Dict:
     """
     Função principal para análise completa com Gemini AI
@@ -722,7 +741,8 @@ def analyze_with_gemini_ai(aia_file, images: List, scores: Dict, project_name: s
     analyzer = GeminiAnalyzer()
     
     if not analyzer.is_available():
-        print("⚠️ Gemini AI não disponível. Usando análise básica.")
+        GEMINI_UNAVAILABLE.inc()
+        logger.info('Gemini AI não disponível. Usando análise básica.')
         return {
             "context": analyzer._fallback_context_analysis(project_name, images),
             "recommendations": analyzer._fallback_recommendations({}, scores, images),
@@ -0,0 +1,207 @@
+"""
+Análise de Quadros de GIFs Animados
+===================================
+
+Percorre a estrutura de blocos do GIF (descritores de imagem e extensões de
+controle gráfico) sem decodificar nenhum quadro: os dados LZW de cada quadro
+são apenas contados e pulados com seek. A memória usada é constante, mesmo
+para GIFs com centenas de quadros.
+
+    for frame in iter_gif_frames(arquivo):     # um GifFrame por vez
+        frame.delay_ms, frame.compressed_bytes, frame.width, ...
+
+    stats = analyze_gif(dados)
+    stats['frame_count'], stats['duration_ms'], stats['decoded_bytes_all_frames']
+
+Estimativas de memória no aparelho: cada quadro decodificado ocupa a tela
+lógica inteira em ARGB_8888 (largura × altura × 4 bytes). A reprodução
+mantém um quadro vivo; quem decodifica todos os quadros de uma vez (uma
+AnimationDrawable, por exemplo) precisa de quadros × esse valor.
+
+Atrasos menores que 20 ms (0 ou 1 centésimo) são contados como 100 ms, como
+fazem os navegadores e o Android.
+"""
+
+import io
+import struct
+from typing import NamedTuple
+
+
+BYTES_PER_PIXEL = 4          # ARGB_8888
+MIN_DELAY_MS = 20
+DEFAULT_DELAY_MS = 100
+
+_EXTENSION = 0x21
+_IMAGE_DESCRIPTOR = 0x2C
+_TRAILER = 0x3B
+_GRAPHIC_CONTROL = 0xF9
+_APPLICATION = 0xFF
+
+
+class GifFrame(NamedTuple):
+    index: int
+    left: int
+    top: int
+    width: int
+    height: int
+    delay_ms: int
+    disposal: int
+    compressed_bytes: int
+
+
+class GifFormatError(ValueError):
+    pass
+
+
+def _read(stream, count):
+    data = stream.read(count)
+    if len(data) < count:
+        raise GifFormatError('GIF truncado')
+    return data
+
+
+def _skip_color_table(stream, packed):
+    if packed & 0x80:
+        stream.seek(3 * (2 << (packed & 0x07)), io.SEEK_CUR)
+
+
+def _skip_sub_blocks(stream):
+    """Pula uma sequência de sub-blocos; retorna o total de bytes de dados"""
+    total = 0
+    while True:
+        size = _read(stream, 1)[0]
+        if size == 0:
+            return total
+        stream.seek(size, io.SEEK_CUR)
+        total += size
+
+
+def _open_stream(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source), False
+    if hasattr(source, 'read'):
+        return source, False
+    return open(source, 'rb'), True
+
+
+def read_gif_header(stream):
+    """Valida o cabeçalho; retorna (largura, altura) da tela lógica"""
+    header = _read(stream, 13)
+    if header[:6] not in (b'GIF87a', b'GIF89a'):
+        raise GifFormatError('Não é um arquivo GIF')
+    width, height, packed = struct.unpack_from('<HHB', header, 6)
+    _skip_color_table(stream, packed)
+    return width, height
+
+
+def iter_gif_frames(source, info=None):
+    """
+    Quadros do GIF, um por vez, sem decodificar os pixels
+
+    Args:
+        source: bytes, caminho ou arquivo binário (posicionado no início)
+        info: dict opcional que recebe 'width', 'height', 'loop_count' e 'truncated'
+
+    Yields:
+        GifFrame
+    """
+    info = info if info is not None else {}
+    stream, owned = _open_stream(source)
+    try:
+        info['width'], info['height'] = read_gif_header(stream)
+        info.setdefault('loop_count', None)
+        info['truncated'] = False
+        delay_ms, disposal = 0, 0
+        index = 0
+
+        while True:
+            block = stream.read(1)
+            if not block or block[0] == _TRAILER:
+                break
+
+            if block[0] == _EXTENSION:
+                label = _read(stream, 1)[0]
+                if label == _GRAPHIC_CONTROL:
+                    size = _read(stream, 1)[0]
+                    data = _read(stream, size)
+                    if size >= 4:
+                        disposal = (data[0] >> 2) & 0x07
+                        delay_ms = struct.unpack_from('<H', data, 1)[0] * 10
+                    _skip_sub_blocks(stream)
+                elif label == _APPLICATION:
+                    size = _read(stream, 1)[0]
+                    identifier = _read(stream, size)
+                    if identifier[:8] in (b'NETSCAPE', b'ANIMEXTS'):
+                        sub_size = _read(stream, 1)[0]
+                        if sub_size:
+                            sub_block = _read(stream, sub_size)
+                            if sub_size >= 3 and sub_block[0] == 1:
+                                info['loop_count'] = struct.unpack_from('<H', sub_block, 1)[0]
+                            _skip_sub_blocks(stream)
+                    else:
+                        _skip_sub_blocks(stream)
+                else:
+                    _skip_sub_blocks(stream)
+
+            elif block[0] == _IMAGE_DESCRIPTOR:
+                left, top, width, height, packed = struct.unpack('<HHHHB', _read(stream, 9))
+                _skip_color_table(stream, packed)
+                _read(stream, 1)  # tamanho mínimo do código LZW
+                compressed = _skip_sub_blocks(stream)
+                yield GifFrame(index, left, top, width, height, delay_ms, disposal, compressed)
+                index += 1
+                delay_ms, disposal = 0, 0
+
+            else:
+                raise GifFormatError(f'Bloco desconhecido 0x{block[0]:02x}')
+    except GifFormatError:
+        if 'width' not in info:
+            raise
+        info['truncated'] = True  # quadros lidos até aqui continuam válidos
+    finally:
+        if owned:
+            stream.close()
+
+
+def effective_delay_ms(delay_ms):
+    return DEFAULT_DELAY_MS if delay_ms < MIN_DELAY_MS else delay_ms
+
+
+def analyze_gif(source):
+    """
+    Métricas de animação de um GIF
+
+    Returns:
+        dict com frame_count, duration_ms, loop_count, fps, width, height,
+        max_frame_bytes, avg_frame_bytes, decoded_frame_bytes (um quadro),
+        decoded_bytes_all_frames e truncated
+    """
+    info = {}
+    frame_count = 0
+    duration_ms = 0
+    total_bytes = 0
+    max_frame_bytes = 0
+
+    # Só os totais são acumulados: nenhum quadro fica em memória
+    for frame in iter_gif_frames(source, info):
+        frame_count += 1
+        duration_ms += effective_delay_ms(frame.delay_ms)
+        total_bytes += frame.compressed_bytes
+        max_frame_bytes = max(max_frame_bytes, frame.compressed_bytes)
+
+    if frame_count <= 1:
+        duration_ms = 0  # imagem estática
+    decoded_frame_bytes = info['width'] * info['height'] * BYTES_PER_PIXEL
+    return {
+        'frame_count': frame_count,
+        'duration_ms': duration_ms,
+        'loop_count': info['loop_count'],
+        'fps': round(frame_count * 1000 / duration_ms, 1) if duration_ms else 0,
+        'width': info['width'],
+        'height': info['height'],
+        'max_frame_bytes': max_frame_bytes,
+        'avg_frame_bytes': round(total_bytes / frame_count) if frame_count else 0,
+        'decoded_frame_bytes': decoded_frame_bytes,
+        'decoded_bytes_all_frames': decoded_frame_bytes * frame_count,
+        'truncated': info['truncated'],
+    }
@@ -0,0 +1,142 @@
+"""
+Carregamento de Imagens Reduzidas para as Análises de Pixels
+============================================================
+
+O hash perceptual (9×8 pixels), o hash médio (8×8) e a comparação com o
+atlas de ícones (24 ou 48 pixels) só precisam de versões pequenas das
+imagens, mas decodificavam a imagem inteira para depois reduzi-la.
+
+`load_reduced(dados, max_size)` devolve a imagem com no máximo `max_size`
+pixels no maior lado, gastando o mínimo na decodificação:
+
+- JPEG: `Image.draft()` pede ao decodificador uma escala DCT de 1/2, 1/4 ou
+  1/8, sem nunca montar a imagem em tamanho cheio;
+- demais formatos: `reduce()` (média em blocos inteiros, rápida) e depois
+  um redimensionamento LANCZOS da imagem já pequena (`thumbnail` com
+  `reducing_gap`).
+
+Imagens em modo paleta ('P') ou 1 bit são convertidas antes da redução
+(o PIL só reduz essas imagens com NEAREST, o que distorceria os hashes).
+
+O resultado fica em um cache LRU por processo, com chave no hash do
+conteúdo (SHA-1 dos bytes): projetos diferentes que usam a mesma imagem, e
+análises diferentes da mesma imagem, reaproveitam a versão já reduzida.
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from PIL import Image
+
+
+# Tamanhos usados pelos analisadores (maior lado, em pixels). Com 128px o dHash
+# difere em no máximo 2 bits do calculado na imagem inteira (hashes já gravados
+# continuam comparáveis); com 64px chegaria ao limite de DEFAULT_MAX_DISTANCE.
+HASH_MAX_SIZE = 128       # hash perceptual (dHash 9×8) e hash médio (8×8)
+ATLAS_MAX_SIZE = 192      # comparação visual com o atlas (ícones de até 48px)
+
+# reducing_gap do thumbnail: reduce() até 2× o tamanho final, LANCZOS no resto
+REDUCING_GAP = 2.0
+
+
+def content_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+class ThumbnailCache:
+    """LRU de imagens reduzidas: {(hash do conteúdo, max_size): Image}"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            img = self._entries.get(key)
+            if img is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return img
+
+    def put(self, key, img):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = img
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+thumbnail_cache = ThumbnailCache(getattr(settings, 'IMAGE_THUMBNAIL_CACHE_SIZE', 256))
+
+
+def _normalize_mode(img):
+    """Modos que o PIL só reduz com NEAREST (paleta, 1 bit, 16 bits...) viram RGB/RGBA/L"""
+    if img.mode in ('RGB', 'RGBA', 'L', 'LA'):
+        return img
+    if img.mode == '1':
+        return img.convert('L')
+    if img.mode in ('P', 'PA') and ('transparency' in img.info or img.mode == 'PA'):
+        return img.convert('RGBA')
+    return img.convert('RGB')
+
+
+def reduce_image(img, max_size):
+    """
+    Nova imagem (já decodificada) com no máximo max_size pixels no maior lado
+
+    Args:
+        img: imagem PIL aberta e ainda não carregada (para o draft do JPEG
+             funcionar); ela é reduzida no lugar e não deve ser reutilizada
+    """
+    if img.format == 'JPEG' and max(img.size) > max_size:
+        # Escala DCT: o decodificador já entrega a imagem reduzida (≥ max_size)
+        img.draft(img.mode, (max_size, max_size))
+    img = _normalize_mode(img)
+    if max(img.size) > max_size:
+        img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+    return img.copy()
+
+
+def load_reduced(data, max_size, digest=None):
+    """
+    Imagem reduzida a partir dos bytes do arquivo, usando o cache por conteúdo
+
+    Args:
+        data: bytes do arquivo de imagem
+        max_size: maior lado desejado (imagens menores não são ampliadas)
+        digest: hash do conteúdo, se já calculado (content_hash)
+
+    Returns:
+        imagem PIL carregada; trate-a como somente leitura (é compartilhada pelo cache)
+    """
+    key = (digest or content_hash(data), max_size)
+    img = thumbnail_cache.get(key)
+    if img is None:
+        with Image.open(io.BytesIO(data)) as source:
+            img = reduce_image(source, max_size)
+        thumbnail_cache.put(key, img)
+    return img
+
+
+def load_reduced_file(path, max_size):
+    """load_reduced para um arquivo em disco"""
+    with open(path, 'rb') as f:
+        return load_reduced(f.read(), max_size)
@@ -0,0 +1,173 @@
+"""
+Leitura de Metadados de Imagens sem Decodificação
+=================================================
+
+O score de qualidade de um asset usa apenas largura, altura, formato e
+tamanho do arquivo. Estes valores ficam nos primeiros bytes de cada formato
+aceito pelo analisador, então não é preciso abrir a imagem com o PIL:
+
+    PNG   assinatura + chunk IHDR            (24 bytes)
+    GIF   "logical screen descriptor"        (10 bytes)
+    BMP   BITMAPINFOHEADER / BITMAPCOREHEADER (26 bytes)
+    WebP  chunk VP8 / VP8L / VP8X            (30 bytes)
+    JPEG  primeiro marcador SOFn, pulando os segmentos anteriores (EXIF...)
+
+    info = probe_image(dados)          # bytes, caminho ou arquivo binário
+    info.format, info.width, info.height, info.size
+
+Os nomes de formato são os mesmos de `PIL.Image.format`. Para arquivos em
+outro formato ou com cabeçalho inválido, `probe_image` devolve None e quem
+chama pode recorrer ao PIL. A decodificação completa fica apenas para as
+análises que precisam dos pixels (hash perceptual, comparação visual).
+"""
+
+import io
+import struct
+from typing import NamedTuple
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Marcadores SOFn com as dimensões do quadro (exceto DHT, JPG e DAC)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Marcadores sem segmento de dados (RSTn, TEM, SOI)
+JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xD9)) | {0x01}
+
+HEADER_BYTES = 32
+
+
+class ImageInfo(NamedTuple):
+    format: str
+    width: int
+    height: int
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+
+def probe_image(source):
+    """
+    Formato e dimensões lidos do cabeçalho da imagem
+
+    Args:
+        source: bytes, caminho do arquivo ou arquivo binário aberto (posicionado no início)
+
+    Returns:
+        ImageInfo ou None se o formato não for reconhecido ou o cabeçalho estiver truncado
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return _probe_stream(io.BytesIO(source))
+    if hasattr(source, 'read'):
+        return _probe_stream(source)
+    with open(source, 'rb') as f:
+        return _probe_stream(f)
+
+
+def _probe_stream(stream):
+    head = stream.read(HEADER_BYTES)
+    try:
+        if head.startswith(PNG_SIGNATURE):
+            return _probe_png(head)
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return _probe_gif(head)
+        if head.startswith(b'\xff\xd8'):
+            return _probe_jpeg(stream, head)
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            return _probe_webp(head)
+        if head.startswith(b'BM'):
+            return _probe_bmp(head)
+    except struct.error:
+        return None  # cabeçalho truncado
+    return None
+
+
+def _valid(info):
+    return info if info.width > 0 and info.height > 0 else None
+
+
+def _probe_png(head):
+    if head[12:16] != b'IHDR':
+        return None
+    width, height = struct.unpack_from('>II', head, 16)
+    return _valid(ImageInfo('PNG', width, height))
+
+
+def _probe_gif(head):
+    width, height = struct.unpack_from('<HH', head, 6)
+    return _valid(ImageInfo('GIF', width, height))
+
+
+def _probe_bmp(head):
+    header_size = struct.unpack_from('<I', head, 14)[0]
+    if header_size == 12:  # OS/2 BITMAPCOREHEADER
+        width, height = struct.unpack_from('<HH', head, 18)
+    elif header_size >= 40:
+        width, height = struct.unpack_from('<ii', head, 18)
+    else:
+        return None
+    # Altura negativa: linhas gravadas de cima para baixo
+    return _valid(ImageInfo('BMP', width, abs(height)))
+
+
+def _probe_webp(head):
+    chunk = head[12:16]
+    if chunk == b'VP8 ':
+        if head[23:26] != b'\x9d\x01\x2a':
+            return None
+        width, height = struct.unpack_from('<HH', head, 26)
+        return _valid(ImageInfo('WEBP', width & 0x3FFF, height & 0x3FFF))
+    if chunk == b'VP8L':
+        if head[20] != 0x2F:
+            return None
+        bits = struct.unpack_from('<I', head, 21)[0]
+        return _valid(ImageInfo('WEBP', (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1))
+    if chunk == b'VP8X':
+        width = int.from_bytes(head[24:27], 'little') + 1
+        height = int.from_bytes(head[27:30], 'little') + 1
+        return _valid(ImageInfo('WEBP', width, height))
+    return None
+
+
+def _probe_jpeg(stream, head):
+    """Percorre os segmentos até o primeiro SOFn, pulando os dados com seek"""
+    data = head
+    position = 2
+
+    def ensure(count):
+        nonlocal data
+        if len(data) < position + count:
+            data += stream.read(position + count - len(data))
+        return len(data) >= position + count
+
+    while ensure(2):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:  # byte de preenchimento
+            position += 1
+            continue
+        position += 2
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker == 0xD9:  # EOI antes de qualquer quadro
+            return None
+        if not ensure(2):
+            return None
+        length = struct.unpack_from('>H', data, position)[0]
+        if marker in JPEG_SOF_MARKERS:
+            if not ensure(7):
+                return None
+            height, width = struct.unpack_from('>HH', data, position + 3)
+            return _valid(ImageInfo('JPEG', width, height))
+        if length < 2:
+            return None
+        # Pula o segmento sem manter os dados em memória (EXIF, ICC, miniaturas...)
+        skip_to = position + length
+        if skip_to > len(data):
+            stream.seek(skip_to - len(data), io.SEEK_CUR)
+            data = b''
+            position = 0
+        else:
+            position = skip_to
+    return None
@@ -0,0 +1,151 @@
+"""
+Índice de Similaridade de Imagens entre Projetos
+================================================
+
+Identifica projetos que compartilham as mesmas imagens (ou versões quase
+idênticas: redimensionadas, recomprimidas, com pequenas edições) sem comparar
+todos os pares de projetos.
+
+Cada ImageAsset recebe um hash perceptual de 64 bits (dHash), calculado na
+análise. A busca usa *multi-index hashing*: o hash é dividido em 4 blocos de
+16 bits, gravados em colunas indexadas (phash_0 … phash_3). Pelo princípio da
+casa dos pombos, dois hashes a uma distância de Hamming ≤ d têm pelo menos um
+bloco a uma distância ≤ d // 4. A consulta busca, via índice, apenas os
+candidatos com algum bloco nessa vizinhança e confirma a distância exata em
+Python:
+
+    d ≤ 3  ->  cada bloco exato                 (4 valores por consulta)
+    d ≤ 7  ->  bloco exato ou com 1 bit trocado (4 × 17 valores)
+
+O índice fica no próprio banco: é persistido e atualizado junto com as
+análises, e cada busca custa O(log n) por valor consultado no B-tree mais o
+número (pequeno) de candidatos.
+"""
+
+from itertools import combinations
+
+from django.db.models import Q
+from PIL import Image
+
+
+HASH_BITS = 64
+CHUNK_COUNT = 4
+CHUNK_BITS = HASH_BITS // CHUNK_COUNT
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+CHUNK_FIELDS = tuple(f'phash_{i}' for i in range(CHUNK_COUNT))
+
+# Distância padrão: até 6 de 64 bits diferentes (~90% de similaridade)
+DEFAULT_MAX_DISTANCE = 6
+
+
+def dhash(img, hash_size=8):
+    """
+    Hash de diferença (dHash) de 64 bits de uma imagem PIL
+
+    A imagem é reduzida para (hash_size + 1) × hash_size em tons de cinza e
+    cada bit indica se um pixel é mais claro que o vizinho à direita. Áreas
+    transparentes são compostas sobre fundo branco.
+    """
+    if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+        rgba = img.convert('RGBA')
+        background = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+        img = Image.alpha_composite(background, rgba)
+
+    small = img.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hash_to_hex(value):
+    return f'{value:016x}'
+
+
+def split_hash(value):
+    """Blocos de 16 bits do hash, do mais significativo para o menos"""
+    return [
+        (value >> (CHUNK_BITS * (CHUNK_COUNT - 1 - i))) & CHUNK_MASK
+        for i in range(CHUNK_COUNT)
+    ]
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def chunk_neighbors(chunk, radius):
+    """Todos os valores de 16 bits a no máximo `radius` bits de `chunk`"""
+    values = {chunk}
+    for distance in range(1, radius + 1):
+        for bits in combinations(range(CHUNK_BITS), distance):
+            flipped = chunk
+            for bit in bits:
+                flipped ^= 1 << bit
+            values.add(flipped)
+    return values
+
+
+def set_perceptual_hash(image_asset, img):
+    """Calcula e atribui o hash perceptual (não salva o objeto)"""
+    value = dhash(img)
+    image_asset.perceptual_hash = hash_to_hex(value)
+    for field, chunk in zip(CHUNK_FIELDS, split_hash(value)):
+        setattr(image_asset, field, chunk)
+
+
+def find_similar_assets(image_asset, max_distance=DEFAULT_MAX_DISTANCE, other_projects_only=True, limit=50):
+    """
+    Imagens de outros projetos idênticas ou quase idênticas a image_asset
+
+    Returns:
+        lista de {'asset', 'distance', 'similarity'} ordenada pela distância
+    """
+    from .models import ImageAsset
+
+    if not image_asset.perceptual_hash:
+        return []
+
+    value = int(image_asset.perceptual_hash, 16)
+    if value == 0:
+        return []  # imagem sem variação (cor sólida): coincidiria com qualquer outra
+    radius = max_distance // CHUNK_COUNT
+    query = Q()
+    for field, chunk in zip(CHUNK_FIELDS, split_hash(value)):
+        query |= Q(**{f'{field}__in': sorted(chunk_neighbors(chunk, radius))})
+
+    candidates = ImageAsset.objects.filter(query).exclude(pk=image_asset.pk).select_related('aia_file')
+    if other_projects_only:
+        candidates = candidates.exclude(aia_file_id=image_asset.aia_file_id)
+
+    results = []
+    for candidate in candidates:
+        distance = hamming_distance(value, int(candidate.perceptual_hash, 16))
+        if distance <= max_distance:
+            results.append({
+                'asset': candidate,
+                'distance': distance,
+                'similarity': round(100 * (1 - distance / HASH_BITS), 1),
+            })
+
+    results.sort(key=lambda item: (item['distance'], item['asset'].aia_file_id, item['asset'].pk))
+    return results[:limit]
+
+
+def group_by_project(results):
+    """
+    Agrupa o resultado de find_similar_assets por projeto
+
+    Returns:
+        [{'aia_file', 'matches': [...], 'best_distance'}, ...] do mais parecido ao menos
+    """
+    projects = {}
+    for item in results:
+        aia_file = item['asset'].aia_file
+        group = projects.setdefault(aia_file.pk, {'aia_file': aia_file, 'matches': [], 'best_distance': item['distance']})
+        group['matches'].append(item)
+    return sorted(projects.values(), key=lambda group: (group['best_distance'], group['aia_file'].pk))
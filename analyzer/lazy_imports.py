@@ -0,0 +1,94 @@
+"""
+Carregamento Preguiçoso (Lazy Loading) de Dependências Pesadas
+==============================================================
+
+Bibliotecas como colour-science, google.generativeai (grpc, protobuf) e o
+motor de feedback com IA (numpy) custam centenas de milissegundos para
+importar. Como `views` importa `utils` na inicialização de cada worker do
+Django e de cada comando de gerenciamento, esses imports eram pagos mesmo
+quando nunca eram usados (ex.: Gemini desabilitado).
+
+Este módulo adia o import real até o primeiro acesso a um atributo:
+
+    colour = LazyModule('colour')
+    colour.RGB_to_HSL(...)   # o import acontece aqui, uma única vez
+
+A verificação de disponibilidade (`is_available`) usa apenas
+`importlib.util.find_spec`, que localiza o módulo sem executá-lo.
+"""
+
+import importlib
+import importlib.util
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+class LazyModule:
+    """
+    Proxy que importa o módulo real apenas no primeiro uso
+    """
+
+    def __init__(self, name, package=None, install_hint=None):
+        self._name = name
+        self._package = package
+        self._install_hint = install_hint
+        self._module = None
+        self._error = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Importa o módulo (uma única vez, mesmo com várias threads)"""
+        if self._module is not None:
+            return self._module
+        if self._error is not None:
+            raise self._error
+
+        with self._lock:
+            if self._module is None and self._error is None:
+                try:
+                    self._module = importlib.import_module(self._name, self._package)
+                except ImportError as e:
+                    self._error = e
+                    if self._install_hint:
+                        logger.warning('%s', self._install_hint)
+                    raise
+
+        if self._error is not None:
+            raise self._error
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    @property
+    def is_loaded(self):
+        """Indica se o módulo já foi importado de fato"""
+        return self._module is not None
+
+    def is_available(self):
+        """
+        Verifica se o módulo pode ser importado sem importá-lo
+        (após um import com falha, retorna False definitivamente)
+        """
+        if self._module is not None:
+            return True
+        if self._error is not None:
+            return False
+        try:
+            return importlib.util.find_spec(self._name, self._package) is not None
+        except (ImportError, ValueError):
+            return False
+
+    def try_load(self):
+        """Importa o módulo retornando None em caso de ImportError"""
+        try:
+            return self._load()
+        except ImportError:
+            return None
+
+    def __repr__(self):
+        state = 'carregado' if self.is_loaded else 'não carregado'
+        return f"<LazyModule '{self._name}' ({state})>"
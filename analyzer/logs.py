@@ -0,0 +1,114 @@
+"""
+Logs da Análise
+===============
+
+Os módulos do analyzer usam a hierarquia padrão do `logging`
+(`logging.getLogger(__name__)`: analyzer.utils, analyzer.gemini_ai, ...),
+configurada em settings.LOGGING. As mensagens usam formatação tardia:
+
+    logger.warning('Erro ao calcular contraste para %s: %s', component_name, e)
+
+Assim, uma mensagem abaixo do nível configurado (LOG_LEVEL) custa uma
+comparação de inteiros: o texto nunca é montado.
+
+Este módulo traz as peças usadas na configuração:
+
+- AnalysisContextFilter: adiciona a cada registro o id da análise em
+  andamento (AnalysisRun) e do AiaFile, definidos por analysis_log_context();
+- RateLimitFilter: limita erros repetidos (mesmo ponto do código) a algumas
+  mensagens por janela de tempo e informa quantas foram suprimidas;
+- JsonFormatter: uma linha JSON por registro (LOG_FORMAT=json), para
+  agregadores de log.
+"""
+
+import datetime
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+_analysis_context = ContextVar('analysis_log_context', default=None)
+
+
+@contextmanager
+def analysis_log_context(analysis_id, aia_file_id=None):
+    """Marca os logs emitidos no bloco com o id da análise (AnalysisRun) e do AiaFile"""
+    token = _analysis_context.set((analysis_id, aia_file_id))
+    try:
+        yield
+    finally:
+        _analysis_context.reset(token)
+
+
+class AnalysisContextFilter(logging.Filter):
+    """Preenche record.analysis_id, record.aia_file_id e record.analysis_tag ('[análise N] ' ou '')"""
+
+    def filter(self, record):
+        context = _analysis_context.get()
+        if context is None:
+            record.analysis_id = record.aia_file_id = None
+            record.analysis_tag = ''
+        else:
+            record.analysis_id, record.aia_file_id = context
+            record.analysis_tag = f'[análise {record.analysis_id}] '
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Deixa passar no máximo `burst` registros por janela de `window` segundos
+    para cada ponto do código (arquivo e linha) a partir de `min_level`
+
+    Quando a janela seguinte começa, a primeira mensagem informa quantas
+    foram suprimidas na anterior.
+    """
+
+    def __init__(self, window=60.0, burst=5, min_level='WARNING'):
+        super().__init__()
+        self.window = float(window)
+        self.burst = int(burst)
+        self.min_level = logging._checkLevel(min_level)
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    def filter(self, record):
+        if record.levelno < self.min_level:
+            return True
+
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or record.created - state[0] >= self.window:
+                suppressed = state[2] if state is not None else 0
+                self._windows[key] = [record.created, 1, 0]
+                if suppressed:
+                    record.msg = f'{record.msg} (+{suppressed} mensagem(ns) repetida(s) suprimida(s))'
+                return True
+            state[1] += 1
+            if state[1] <= self.burst:
+                return True
+            state[2] += 1
+            return False
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro, com o contexto da análise quando houver"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc)
+                    .isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process,
+        }
+        analysis_id = getattr(record, 'analysis_id', None)
+        if analysis_id is not None:
+            data['analysis_id'] = analysis_id
+            data['aia_file_id'] = getattr(record, 'aia_file_id', None)
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
@@ -0,0 +1,66 @@
+import time
+import zipfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from analyzer.batch import (
+    ZipLimitError, analyze_batch, check_aia_sources, create_aia_files, grade_sheet_rows, iter_aia_sources,
+    write_grade_sheet,
+)
+
+
+class Command(BaseCommand):
+    help = 'Cadastra e analisa em paralelo todos os projetos .aia de um diretório (ou .zip) e gera a planilha de notas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Diretórios, arquivos .aia ou arquivos .zip com projetos .aia')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Número de processos (padrão: número de CPUs, 1 = serial)',
+        )
+        parser.add_argument(
+            '--output',
+            default='notas.csv',
+            help='Arquivo da planilha de notas (.csv ou .json)',
+        )
+
+    def handle(self, *args, **options):
+        for path in options['paths']:
+            if not Path(path).exists():
+                raise CommandError(f'Caminho não encontrado: {path}')
+
+        output = Path(options['output'])
+        fmt = 'json' if output.suffix.lower() == '.json' else 'csv'
+
+        # Todos os .zip são validados antes do primeiro cadastro: nada fica pela metade
+        try:
+            check_aia_sources(options['paths'])
+        except (ZipLimitError, zipfile.BadZipFile) as e:
+            raise CommandError(str(e))
+        aia_files = create_aia_files(iter_aia_sources(options['paths']))
+        if not aia_files:
+            raise CommandError('Nenhum arquivo .aia encontrado')
+        self.stdout.write(self.style.SUCCESS(f'📦 {len(aia_files)} projeto(s) cadastrado(s); iniciando análise...'))
+
+        started = time.perf_counter()
+        ids = [aia_file.pk for aia_file in aia_files]
+        names = {aia_file.pk: aia_file.name for aia_file in aia_files}
+
+        def progress(result, done, total):
+            status = '✅' if result['status'] == 'ok' else f"❌ {result['error']}"
+            self.stdout.write(f"[{done}/{total}] {names[result['id']]}: {status}")
+
+        results = analyze_batch(ids, max_workers=options['workers'], progress=progress)
+        rows = grade_sheet_rows(ids, results)
+
+        with open(output, 'w', encoding='utf-8', newline='') as f:
+            write_grade_sheet(rows, f, fmt)
+
+        failed = sum(1 for row in rows if row['status'] != 'ok')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'• Projetos analisados: {len(rows) - failed}')
+        if failed:
+            self.stdout.write(self.style.WARNING(f'• Projetos com erro: {failed}'))
+        self.stdout.write(self.style.SUCCESS(f'💾 Planilha de notas salva em {output} ({elapsed:.1f}s)'))
@@ -0,0 +1,310 @@
+import json
+import platform
+import resource
+import shutil
+import statistics
+import tempfile
+import time
+import zipfile
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from analyzer import utils
+from analyzer.batch import create_aia_files, warm_analysis_caches
+
+
+DEFAULT_CORPUS = Path(settings.MEDIA_ROOT) / 'aia_files'
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'analysis_baseline.json'
+
+# Etapas medidas (funções chamadas diretamente por analyze_aia_file, sem sobreposição)
+STAGES = {
+    'extraction': (zipfile.ZipFile, 'extractall'),
+    'layout': (utils, 'analyze_layout_and_spacing'),
+    'images': (utils, 'process_image_file'),
+    'memory': (utils, 'analyze_memory_footprint'),
+    'icon_consistency': (utils, 'analyze_icon_style_consistency'),
+    'report': (utils, 'generate_usability_evaluation'),
+}
+
+
+class _Rollback(Exception):
+    """Usada para desfazer os dados gravados com --use-current-db"""
+
+
+class GeminiStub:
+    """Substitui o módulo gemini_ai: resposta fixa, sem rede e sem API key"""
+
+    def try_load(self):
+        return self
+
+    def analyze_with_gemini_ai(self, aia_file, images, scores, project_name=''):
+        return {
+            'ai_powered': True,
+            'context': {
+                'category': 'educational',
+                'target_audience': 'teens',
+                'confidence_score': 0.7,
+                'reasoning': f'Resposta simulada para {len(images)} imagem(ns).',
+            },
+            'recommendations': [f'Recomendação simulada {i + 1}' for i in range(5)],
+            'priority_matrix': {'critical': ['Item crítico simulado'], 'high': ['Item simulado']},
+            'accessibility': {'critical_fixes': ['Correção simulada']},
+        }
+
+
+# Controle de transação não conta como consulta: dentro de uma transação externa
+# (--use-current-db, testes) cada atomic() vira SAVEPOINT/RELEASE em vez de BEGIN
+TRANSACTION_STATEMENTS = ('BEGIN', 'SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK')
+
+
+class StageRecorder:
+    """Acumula tempo de parede, CPU e consultas SQL de cada etapa"""
+
+    def __init__(self):
+        self.queries = 0
+        self.stages = {}
+
+    def count_query(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            self.queries += 1
+        return execute(sql, params, many, context)
+
+    def reset(self):
+        self.stages = {name: {'wall_ms': 0.0, 'cpu_ms': 0.0, 'queries': 0} for name in [*STAGES, 'total']}
+
+    def wrap(self, name, func):
+        def timed(*args, **kwargs):
+            wall, cpu, queries = time.perf_counter(), time.process_time(), self.queries
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stage = self.stages[name]
+                stage['wall_ms'] += (time.perf_counter() - wall) * 1000
+                stage['cpu_ms'] += (time.process_time() - cpu) * 1000
+                stage['queries'] += self.queries - queries
+        return timed
+
+    def patches(self):
+        """Context managers que instrumentam as etapas e simulam o Gemini"""
+        yield connection.execute_wrapper(self.count_query)
+        for name, (owner, attr) in STAGES.items():
+            yield mock.patch.object(owner, attr, self.wrap(name, getattr(owner, attr)))
+        yield mock.patch.object(utils, 'gemini_ai', GeminiStub())
+        yield mock.patch.object(utils, 'is_gemini_enabled', lambda: True)
+
+
+def reset_peak_rss():
+    """Zera o pico de memória do processo (VmHWM, Linux); False se não suportado"""
+    try:
+        Path('/proc/self/clear_refs').write_text('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """Pico de memória residente do processo em MB"""
+    try:
+        for line in Path('/proc/self/status').read_text().splitlines():
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_benchmark(paths, runs=1, progress=None):
+    """
+    Analisa cada projeto `runs` vezes (um AiaFile novo por execução) no banco atual
+
+    Returns:
+        dict com 'projects' ({nome: métricas medianas}) e 'totals' (soma por etapa)
+    """
+    warm_analysis_caches()
+    recorder = StageRecorder()
+    analyze = recorder.wrap('total', utils.analyze_aia_file)
+    projects = {}
+
+    with ExitStack() as stack:
+        for patcher in recorder.patches():
+            stack.enter_context(patcher)
+
+        for path in paths:
+            samples = []
+            rss_reset = reset_peak_rss()
+            for _ in range(runs):
+                aia_file = create_aia_files([(path.name, path.read_bytes())])[0]
+                recorder.reset()
+                run = analyze(aia_file)
+                samples.append(recorder.stages)
+
+            stages = {
+                name: {
+                    'wall_ms': round(statistics.median(s[name]['wall_ms'] for s in samples), 2),
+                    'cpu_ms': round(statistics.median(s[name]['cpu_ms'] for s in samples), 2),
+                    'queries': max(s[name]['queries'] for s in samples),
+                }
+                for name in samples[0]
+            }
+            projects[path.name] = {
+                'images': aia_file.total_images,
+                'stages': stages,
+                'peak_rss_mb': round(peak_rss_mb(), 1),
+                'peak_rss_per_project': rss_reset,
+                # Detalhamento dos spans da última execução (ver analyzer/timing.py)
+                'spans': run.timings,
+            }
+            if progress:
+                progress(path.name, projects[path.name])
+
+    totals = {
+        name: {
+            metric: round(sum(p['stages'][name][metric] for p in projects.values()), 2)
+            for metric in ('wall_ms', 'cpu_ms', 'queries')
+        }
+        for name in [*STAGES, 'total']
+    }
+    return {'projects': projects, 'totals': totals}
+
+
+def compare_results(result, baseline, max_regression=25.0, min_delta_ms=50.0):
+    """
+    Compara um resultado com a baseline
+
+    Tempo: regressão se passar de max_regression % E de min_delta_ms (ruído).
+    Consultas SQL: determinísticas, qualquer aumento é regressão.
+
+    Returns:
+        lista de mensagens (vazia se não houve regressão)
+    """
+    factor = 1 + max_regression / 100
+    regressions = []
+
+    for name, current in result['totals'].items():
+        base = baseline.get('totals', {}).get(name)
+        if not base:
+            continue
+        for metric in ('wall_ms', 'cpu_ms'):
+            if current[metric] > base[metric] * factor and current[metric] - base[metric] > min_delta_ms:
+                regressions.append(
+                    f'{name}: {metric} {current[metric]:.1f} > {base[metric]:.1f} (+{max_regression:.0f}%)'
+                )
+
+    for project, current in result['projects'].items():
+        base = baseline.get('projects', {}).get(project)
+        if not base:
+            continue
+        for name, stage in current['stages'].items():
+            base_queries = base['stages'].get(name, {}).get('queries')
+            if base_queries is not None and stage['queries'] > base_queries:
+                regressions.append(f'{project} / {name}: {stage["queries"]} consultas > {base_queries}')
+        if current['peak_rss_mb'] > base['peak_rss_mb'] * factor:
+            regressions.append(
+                f'{project}: pico de memória {current["peak_rss_mb"]:.0f}MB > {base["peak_rss_mb"]:.0f}MB'
+            )
+
+    return regressions
+
+
+class Command(BaseCommand):
+    help = (
+        'Executa analyze_aia_file sobre os projetos de media/aia_files em um banco SQLite descartável '
+        '(Gemini simulado) e mede tempo, CPU, memória e consultas de cada etapa'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus', default=str(DEFAULT_CORPUS), help='Diretório com os projetos .aia')
+        parser.add_argument('--runs', type=int, default=1, help='Execuções por projeto (usa a mediana)')
+        parser.add_argument('--limit', type=int, default=None, help='Máximo de projetos analisados')
+        parser.add_argument('--output', default=None, help='Salva o resultado completo neste arquivo JSON')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Arquivo JSON de baseline')
+        parser.add_argument('--save-baseline', action='store_true', help='Salva o resultado como nova baseline')
+        parser.add_argument(
+            '--max-regression', type=float, default=25.0,
+            help='Regressão máxima de tempo/memória tolerada em relação à baseline (em %%)',
+        )
+        parser.add_argument(
+            '--use-current-db', action='store_true',
+            help='Usa o banco atual dentro de uma transação desfeita ao final (em vez de um banco descartável)',
+        )
+
+    def handle(self, *args, **options):
+        paths = sorted(Path(options['corpus']).glob('*.aia'))[:options['limit']]
+        if not paths:
+            raise CommandError(f"Nenhum projeto .aia em {options['corpus']}")
+        self.stdout.write(f'⏱️  Analisando {len(paths)} projeto(s), {options["runs"]} execução(ões) cada...')
+
+        def progress(name, project):
+            stages = project['stages']
+            self.stdout.write(
+                f"   {stages['total']['wall_ms']:8.1f} ms  {stages['total']['queries']:4d} consultas  "
+                f"{project['peak_rss_mb']:6.0f} MB  {name} ({project['images']} imagens)"
+            )
+
+        media_root = tempfile.mkdtemp(prefix='aia_benchmark_')
+        try:
+            with override_settings(MEDIA_ROOT=media_root):
+                result = self.run_isolated(paths, options['runs'], progress, options['use_current_db'])
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        result['meta'] = {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'projects': len(paths),
+            'runs': options['runs'],
+        }
+
+        self.stdout.write('\n📊 Total por etapa:')
+        for name, stage in result['totals'].items():
+            self.stdout.write(
+                f"   {name:17s} {stage['wall_ms']:9.1f} ms  CPU {stage['cpu_ms']:9.1f} ms  {stage['queries']:5d} consultas"
+            )
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"💾 Resultado salvo em: {options['output']}"))
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'💾 Baseline salva em: {baseline_path}'))
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f'⚠️ Baseline {baseline_path} não encontrada: nada a comparar'))
+            return
+
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+        regressions = compare_results(result, baseline, options['max_regression'])
+        if regressions:
+            for message in regressions:
+                self.stdout.write(self.style.ERROR(f'❌ {message}'))
+            raise CommandError(f'{len(regressions)} regressão(ões) em relação à baseline {baseline_path}')
+        self.stdout.write(self.style.SUCCESS('✅ Nenhuma regressão em relação à baseline'))
+
+    def run_isolated(self, paths, runs, progress, use_current_db):
+        if use_current_db:
+            result = None
+            try:
+                with transaction.atomic():
+                    result = run_benchmark(paths, runs, progress)
+                    raise _Rollback
+            except _Rollback:
+                pass
+            return result
+
+        # Banco SQLite descartável (em memória), criado e migrado como nos testes
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            return run_benchmark(paths, runs, progress)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,151 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from analyzer.models import AiaFile, ImageAsset, UsabilityEvaluation
+
+
+class _Rollback(Exception):
+    """Usada para desfazer os dados sintéticos ao final do benchmark"""
+
+
+def explain_query_plan(queryset):
+    """Retorna as linhas de EXPLAIN QUERY PLAN (SQLite) de um QuerySet"""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def hot_queries(aia_file):
+    """
+    Consultas dos relatórios/dashboard e o índice que cada uma deve usar
+
+    Returns:
+        [(descrição, queryset, nome_do_índice), ...]
+    """
+    images = ImageAsset.objects.filter(aia_file=aia_file)
+    return [
+        ('imagens por qualidade', images.filter(quality_rating='low'), 'image_file_quality_idx'),
+        ('imagens por tipo', images.filter(asset_type='icon'), 'image_file_type_idx'),
+        (
+            'ícones Material Design',
+            images.filter(is_material_icon=True, material_icon_style__isnull=False),
+            'image_file_material_idx',
+        ),
+        ('imagens grandes', images.filter(file_size__gt=500 * 1024), 'image_file_size_idx'),
+        ('imagens pequenas', images.filter(width__lt=48), 'image_file_dimensions_idx'),
+        ('arquivos recentes', AiaFile.objects.order_by('-uploaded_at')[:5], 'aiafile_uploaded_idx'),
+        (
+            'ranking de análises',
+            UsabilityEvaluation.objects.order_by('-overall_usability_score', '-evaluated_at')[:5],
+            'evaluation_ranking_idx',
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Popula o banco com dados sintéticos (dentro de uma transação desfeita ao final) '
+        'e verifica com EXPLAIN QUERY PLAN se as consultas principais usam os índices'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assets', type=int, default=100_000, help='Quantidade de ImageAsset sintéticos')
+        parser.add_argument('--files', type=int, default=2_000, help='Quantidade de AiaFile sintéticos')
+        parser.add_argument('--repeat', type=int, default=20, help='Execuções de cada consulta para medir o tempo')
+        parser.add_argument('--seed', type=int, default=42, help='Semente do gerador aleatório')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Este benchmark usa EXPLAIN QUERY PLAN e requer SQLite')
+        if options['files'] < 1 or options['assets'] < 0:
+            raise CommandError('--files deve ser >= 1 e --assets >= 0')
+
+        failures = []
+        try:
+            with transaction.atomic():
+                sample_file = self._seed(options['files'], options['assets'], random.Random(options['seed']))
+                failures = self._check_queries(sample_file, options['repeat'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f'❌ Consultas sem o índice esperado: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('✅ Todas as consultas usam os índices esperados'))
+
+    def _seed(self, file_count, asset_count, rng):
+        started = time.perf_counter()
+        now = timezone.now()
+
+        files = AiaFile.objects.bulk_create(
+            [AiaFile(name=f'bench_{i}', file=f'aia_files/bench_{i}.aia', is_analyzed=True) for i in range(file_count)],
+            batch_size=1000,
+        )
+        # uploaded_at usa auto_now_add; espalha as datas para o ORDER BY ser realista
+        for i, aia_file in enumerate(files):
+            aia_file.uploaded_at = now - timezone.timedelta(minutes=i)
+        AiaFile.objects.bulk_update(files, ['uploaded_at'], batch_size=1000)
+
+        UsabilityEvaluation.objects.bulk_create(
+            [UsabilityEvaluation(aia_file=f, overall_usability_score=rng.uniform(0, 100)) for f in files],
+            batch_size=1000,
+        )
+
+        ratings = ['low', 'medium', 'high', 'excellent']
+        types = ['image', 'icon', 'background', 'button', 'other']
+        styles = ['filled', 'outlined', 'round', 'sharp', 'twotone']
+        batch = []
+        for i in range(asset_count):
+            is_material = rng.random() < 0.2
+            batch.append(ImageAsset(
+                aia_file=files[i % file_count],
+                name=f'asset_{i}.png',
+                original_path=f'assets/asset_{i}.png',
+                extracted_file=f'extracted_images/asset_{i}.png',
+                width=rng.choice([24, 48, 96, 192, 512, 1080]),
+                height=rng.choice([24, 48, 96, 192, 512, 1920]),
+                file_size=rng.randint(200, 2_000_000),
+                format='PNG',
+                quality_score=rng.uniform(0, 100),
+                quality_rating=rng.choice(ratings),
+                asset_type=rng.choice(types),
+                is_material_icon=is_material,
+                material_icon_style=rng.choice(styles) if is_material else None,
+            ))
+            if len(batch) >= 5000:
+                ImageAsset.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            ImageAsset.objects.bulk_create(batch)
+
+        self.stdout.write(
+            f'💾 {file_count} arquivos e {asset_count} imagens sintéticos criados '
+            f'em {time.perf_counter() - started:.1f}s'
+        )
+        return files[0]
+
+    def _check_queries(self, sample_file, repeat):
+        failures = []
+        for description, queryset, index_name in hot_queries(sample_file):
+            plan = explain_query_plan(queryset)
+            uses_index = any(index_name in line for line in plan)
+            sorts_in_memory = any('TEMP B-TREE' in line for line in plan)
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                list(queryset.all())
+            elapsed_ms = (time.perf_counter() - started) * 1000 / max(repeat, 1)
+
+            ok = uses_index and not sorts_in_memory
+            status = '✅' if ok else '❌'
+            self.stdout.write(f'{status} {description}: {elapsed_ms:.2f} ms')
+            for line in plan:
+                self.stdout.write(f'      {line}')
+            if not ok:
+                failures.append(description)
+        return failures
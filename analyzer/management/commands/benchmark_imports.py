@@ -0,0 +1,148 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Código executado no processo filho: simula a inicialização de um worker do Django
+WORKER_BOOT_CODE = (
+    "import os, django; "
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aia_analyzer.settings'); "
+    "django.setup(); "
+    "import aia_analyzer.urls, analyzer.views"
+)
+
+# Módulos pesados que NÃO devem ser importados na inicialização do worker
+HEAVY_MODULES = [
+    'google.generativeai',
+    'grpc',
+    'colour',
+    'wcag_contrast_ratio',
+    'numpy',
+    'analyzer.ai_feedback',
+    'analyzer.gemini_ai',
+]
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'import_time_baseline.json'
+
+
+def parse_importtime(stderr):
+    """
+    Converte a saída de `python -X importtime` em {módulo: (cumulativo_us, profundidade)}
+    Formato: 'import time:   self [us] | cumulative | imported package'
+    A indentação do nome indica a profundidade do import na árvore.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            cumulative = int(parts[1].strip())
+        except ValueError:
+            continue  # linha de cabeçalho
+        name = parts[2].rstrip()
+        depth = len(name) - len(name.lstrip())
+        modules[name.strip()] = (cumulative, depth)
+    return modules
+
+
+class Command(BaseCommand):
+    help = 'Mede o tempo de importação (cold start) de um worker do Django com python -X importtime'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Número de execuções (usa a mediana)')
+        parser.add_argument('--top', type=int, default=15, help='Quantidade de módulos mais lentos a exibir')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Arquivo JSON de baseline')
+        parser.add_argument('--save-baseline', action='store_true', help='Salva o resultado como nova baseline')
+        parser.add_argument(
+            '--max-regression', type=float, default=20.0,
+            help='Regressão máxima tolerada em relação à baseline (em %%)',
+        )
+
+    def _run_once(self):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', WORKER_BOOT_CODE],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        wall_ms = (time.perf_counter() - started) * 1000
+        if proc.returncode != 0:
+            raise CommandError(f'Falha ao inicializar o worker:\n{proc.stderr[-2000:]}')
+        return wall_ms, parse_importtime(proc.stderr)
+
+    def handle(self, *args, **options):
+        runs = max(1, options['runs'])
+        self.stdout.write(f'⏱️  Medindo inicialização do worker ({runs} execuções)...')
+
+        # Primeira execução aquece o cache de bytecode (.pyc) e não é contabilizada
+        self._run_once()
+        wall_times = []
+        samples = []
+        for _ in range(runs):
+            wall_ms, modules = self._run_once()
+            wall_times.append(wall_ms)
+            samples.append(modules)
+
+        all_modules = set().union(*samples)
+        median_modules = {
+            name: statistics.median(sample.get(name, (0, 0))[0] for sample in samples)
+            for name in all_modules
+        }
+        # Soma apenas os imports de nível superior (os demais já estão no cumulativo)
+        top_depth = min(depth for sample in samples for _, depth in sample.values())
+        top_level = {
+            name for sample in samples for name, (_, depth) in sample.items() if depth == top_depth
+        }
+        import_total_ms = sum(median_modules[name] for name in top_level) / 1000
+        result = {
+            'wall_ms': round(statistics.median(wall_times), 1),
+            'import_ms': round(import_total_ms, 1),
+            'heavy_modules_loaded': sorted(m for m in HEAVY_MODULES if m in all_modules),
+        }
+
+        self.stdout.write(f"• Tempo total do processo: {result['wall_ms']:.1f} ms")
+        self.stdout.write(f"• Tempo de imports: {result['import_ms']:.1f} ms")
+        self.stdout.write(f"\n📦 Top {options['top']} módulos (cumulativo):")
+        slowest = sorted(median_modules.items(), key=lambda item: item[1], reverse=True)
+        for name, us in slowest[:options['top']]:
+            self.stdout.write(f'   {us / 1000:8.1f} ms  {name}')
+
+        if result['heavy_modules_loaded']:
+            self.stdout.write(self.style.WARNING(
+                f"\n⚠️ Módulos pesados importados na inicialização: {', '.join(result['heavy_modules_loaded'])}"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('\n✅ Nenhum módulo pesado importado na inicialização'))
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(result, indent=2), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'💾 Baseline salva em: {baseline_path}'))
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f'⚠️ Baseline {baseline_path} não encontrada: nada a comparar'))
+            return
+
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+        # Módulo pesado novo na inicialização é regressão independente do tempo medido
+        new_heavy = sorted(set(result['heavy_modules_loaded']) - set(baseline.get('heavy_modules_loaded', [])))
+        if new_heavy:
+            raise CommandError(f"Módulos pesados novos na inicialização: {', '.join(new_heavy)}")
+        limit = baseline['import_ms'] * (1 + options['max_regression'] / 100)
+        self.stdout.write(
+            f"\n📊 Baseline: {baseline['import_ms']:.1f} ms de imports (limite {limit:.1f} ms)"
+        )
+        if result['import_ms'] > limit:
+            raise CommandError(
+                f"Regressão no tempo de importação: {result['import_ms']:.1f} ms > {limit:.1f} ms"
+            )
@@ -0,0 +1,67 @@
+import statistics
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analyzer.models import UsabilityEvaluation
+from analyzer.templatetags.report_filters import _markdown_to_html_multipass, markdown_to_html
+
+
+GOLDEN_DIR = Path(__file__).resolve().parents[2] / 'testdata' / 'reports'
+
+
+def load_reports(limit=None):
+    """Relatórios salvos no banco; sem nenhum, usa os relatórios de referência dos testes"""
+    reports = list(
+        UsabilityEvaluation.objects.exclude(recommendations='')
+        .order_by('-evaluated_at')
+        .values_list('recommendations', flat=True)[:limit]
+    )
+    if not reports:
+        reports = [path.read_text(encoding='utf-8') for path in sorted(GOLDEN_DIR.glob('*.txt'))]
+    return reports
+
+
+def time_renderer(renderer, texts, repeat):
+    """Mediana, em milissegundos, do tempo para converter todos os textos"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            renderer(text)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+class Command(BaseCommand):
+    help = 'Compara o markdown_to_html em passe único com a implementação original em vários passes de regex'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50, help='Execuções de cada conversão (usa a mediana)')
+        parser.add_argument('--limit', type=int, default=None, help='Máximo de relatórios lidos do banco')
+        parser.add_argument(
+            '--scale', type=int, default=1,
+            help='Concatena cada relatório N vezes para simular relatórios maiores',
+        )
+
+    def handle(self, *args, **options):
+        reports = load_reports(options['limit'])
+        if not reports:
+            raise CommandError('Nenhum relatório encontrado')
+        texts = ['\n'.join([report] * max(1, options['scale'])) for report in reports]
+        total_kb = sum(len(text.encode('utf-8')) for text in texts) / 1024
+
+        for text in texts:
+            if str(markdown_to_html(text)) != str(_markdown_to_html_multipass(text)):
+                raise CommandError('A saída do renderizador em passe único difere da implementação original')
+        self.stdout.write(self.style.SUCCESS(f'✅ Saída idêntica em {len(texts)} relatório(s) ({total_kb:.1f} KB)'))
+
+        repeat = max(1, options['repeat'])
+        multipass_ms = time_renderer(_markdown_to_html_multipass, texts, repeat)
+        single_pass_ms = time_renderer(markdown_to_html, texts, repeat)
+
+        self.stdout.write(f'• Vários passes: {multipass_ms:.2f} ms')
+        self.stdout.write(f'• Passe único:   {single_pass_ms:.2f} ms')
+        self.stdout.write(f'• Throughput:    {total_kb / (single_pass_ms / 1000):.0f} KB/s')
+        self.stdout.write(self.style.SUCCESS(f'📊 Speedup: {multipass_ms / single_pass_ms:.2f}x'))
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from analyzer import utils
+
+
+class Command(BaseCommand):
+    help = 'Rasteriza os ícones do Material Design em um atlas NumPy para comparação visual'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[24, 48],
+            help='Tamanhos (px) a rasterizar',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Número de processos (padrão: número de CPUs, 1 = serial)',
+        )
+
+    def handle(self, *args, **options):
+        atlas_module = utils.icon_atlas.try_load()
+        if atlas_module is None:
+            raise CommandError('numpy é necessário para gerar o atlas. Instale: pip install numpy')
+
+        if not utils.ensure_material_icons_loaded():
+            raise CommandError(
+                'Nenhum ícone Material Design carregado. Execute antes: python manage.py load_material_icons'
+            )
+
+        self.stdout.write(self.style.SUCCESS('🖼️  Rasterizando ícones do Material Design...'))
+        started = time.perf_counter()
+
+        try:
+            result = atlas_module.build_atlas(
+                utils.MATERIAL_ICONS_DB,
+                sizes=tuple(sorted(set(options['sizes']))),
+                max_workers=options['workers'],
+            )
+        except atlas_module.EmptyAtlasError as e:
+            raise CommandError(f'{e}. Execute antes: python manage.py load_material_icons --force-reload')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"• Ícones rasterizados: {result['icons']}")
+        if result['missing']:
+            self.stdout.write(self.style.WARNING(
+                f"• SVGs não encontrados: {result['missing']} (execute load_material_icons --force-reload)"
+            ))
+        for svg_path, error in result['failed'][:10]:
+            self.stdout.write(self.style.WARNING(f'• Falha em {svg_path}: {error}'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Atlas gerado em {atlas_module.ATLAS_DIR} ({elapsed:.1f}s)'
+        ))
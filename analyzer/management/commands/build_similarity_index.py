@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analyzer.image_loading import HASH_MAX_SIZE, load_reduced_file
+from analyzer.image_similarity import CHUNK_FIELDS, set_perceptual_hash
+from analyzer.models import ImageAsset
+
+
+class Command(BaseCommand):
+    help = 'Calcula o hash perceptual das imagens ainda não indexadas (imagens repetidas entre projetos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recalcula o hash de todas as imagens, não apenas das que ainda não foram indexadas',
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Imagens gravadas por UPDATE em lote')
+
+    def handle(self, *args, **options):
+        assets = ImageAsset.objects.only('id', 'name', 'extracted_file').order_by('pk')
+        if not options['rebuild']:
+            assets = assets.filter(perceptual_hash='')
+
+        started = time.perf_counter()
+        fields = ['perceptual_hash', *CHUNK_FIELDS]
+        batch = []
+        indexed = 0
+        errors = 0
+
+        for asset in assets.iterator(chunk_size=options['batch_size']):
+            try:
+                set_perceptual_hash(asset, load_reduced_file(asset.extracted_file.path, HASH_MAX_SIZE))
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f'⚠️  {asset.name}: {e}'))
+                errors += 1
+                continue
+
+            batch.append(asset)
+            if len(batch) >= options['batch_size']:
+                ImageAsset.objects.bulk_update(batch, fields)
+                indexed += len(batch)
+                batch = []
+
+        if batch:
+            ImageAsset.objects.bulk_update(batch, fields)
+            indexed += len(batch)
+
+        self.stdout.write(f'• Imagens indexadas: {indexed}')
+        if errors:
+            self.stdout.write(self.style.WARNING(f'• Imagens com erro: {errors}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Índice de similaridade atualizado ({time.perf_counter() - started:.1f}s)'
+        ))
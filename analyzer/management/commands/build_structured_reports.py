@@ -0,0 +1,84 @@
+import tempfile
+import time
+import zipfile
+
+from django.core.management.base import BaseCommand
+
+from analyzer.models import UsabilityEvaluation
+from analyzer.report_structure import collect_findings, save_structured_report
+from analyzer.utils import (
+    NO_ASSETS_RECOMMENDATION,
+    analyze_icon_style_consistency,
+    analyze_layout_and_spacing,
+    analyze_memory_footprint,
+    generate_analysis_sections,
+    generate_detailed_recommendations,
+    generate_layout_recommendations,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera as seções e os problemas estruturados (ReportSection/Finding) das avaliações '
+        'feitas antes dessas tabelas existirem, sem refazer a análise das imagens'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Regrava todas as avaliações, não apenas as que ainda não têm seções',
+        )
+
+    def layout_analysis(self, aia_file):
+        """Reanalisa as telas (.scm) do projeto; None se o arquivo .aia não estiver disponível"""
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                with zipfile.ZipFile(aia_file.file.path, 'r') as zip_ref:
+                    zip_ref.extractall(temp_dir)
+                return analyze_layout_and_spacing(temp_dir)
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            self.stdout.write(self.style.WARNING(f'⚠️  {aia_file.name}: telas não analisadas ({e})'))
+            return None
+
+    def handle(self, *args, **options):
+        evaluations = UsabilityEvaluation.objects.select_related('aia_file').order_by('pk')
+        if not options['rebuild']:
+            evaluations = evaluations.filter(sections__isnull=True)
+
+        started = time.perf_counter()
+        built = 0
+        for evaluation in evaluations:
+            aia_file = evaluation.aia_file
+            images = list(aia_file.images.all())
+            layout_analysis = self.layout_analysis(aia_file)
+            icon_analysis = analyze_icon_style_consistency(aia_file)
+            memory_analysis = analyze_memory_footprint(
+                layout_analysis.get('asset_references', []) if layout_analysis else [], images,
+            )
+
+            # Scores já gravados (incluem a penalização por inconsistência de ícones)
+            scores = {
+                'image_quality_score': evaluation.image_quality_score,
+                'icon_quality_score': evaluation.icon_quality_score,
+                'overall_score': evaluation.overall_usability_score,
+            }
+            sections = generate_analysis_sections(images, scores, layout_analysis, icon_analysis, memory_analysis)
+            if layout_analysis:
+                sections.append(('layout', '\n'.join(generate_layout_recommendations(layout_analysis))))
+            if icon_analysis.get('issues'):
+                sections.append(('icon_consistency', '\n'.join(icon_analysis['issues'])))
+            # Só a lista de ações (o texto completo fica em evaluation.recommendations)
+            sections.append((
+                'recommendations',
+                generate_detailed_recommendations(aia_file, images, scores) if images else NO_ASSETS_RECOMMENDATION,
+            ))
+
+            save_structured_report(
+                evaluation, sections, collect_findings(images, layout_analysis, icon_analysis, memory_analysis),
+            )
+            built += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {built} avaliação(ões) com relatório estruturado ({time.perf_counter() - started:.1f}s)'
+        ))
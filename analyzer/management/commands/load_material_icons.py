@@ -11,15 +11,27 @@ class Command(BaseCommand):
             action='store_true',
             help='Força o recarregamento mesmo se o cache existir',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Número de processos para varrer as categorias (padrão: número de CPUs, 1 = serial)',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(
             self.style.SUCCESS('🚀 Iniciando carregamento dos ícones do Material Design...')
         )
         
+        if options['force_reload']:
+            self.stdout.write('♻️  --force-reload: todos os SVGs serão reprocessados')
+        
         try:
-            # Carrega os ícones
-            load_material_icons()
+            # Carrega os ícones (incremental, a menos que --force-reload)
+            load_material_icons(
+                force_reload=options['force_reload'],
+                max_workers=options['workers'],
+            )
             
             self.stdout.write(
                 self.style.SUCCESS('✅ Ícones do Material Design carregados com sucesso!')
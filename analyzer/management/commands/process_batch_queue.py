@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from analyzer.batch import process_queue
+
+
+class Command(BaseCommand):
+    help = (
+        'Analisa os projetos enfileirados pelo upload em lote (BatchJob). Rode como serviço '
+        '(--loop) ou pelo cron; análises interrompidas voltam para a fila automaticamente'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.BATCH_ANALYSIS_WORKERS,
+            help='Número de processos (padrão: BATCH_ANALYSIS_WORKERS, 1 = serial)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Máximo de projetos por rodada (padrão: toda a fila)',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Continua aguardando novos projetos em vez de sair com a fila vazia',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Segundos entre consultas à fila com --loop',
+        )
+
+    def progress(self, result, done, total):
+        status = '✅' if result['status'] == 'ok' else f"❌ {result['error']}"
+        self.stdout.write(f"[{done}/{total}] projeto {result['id']}: {status}")
+
+    def handle(self, *args, **options):
+        while True:
+            results = process_queue(max_workers=options['workers'], limit=options['limit'], progress=self.progress)
+            if results:
+                failed = sum(1 for result in results.values() if result['status'] != 'ok')
+                self.stdout.write(self.style.SUCCESS(f'📦 {len(results) - failed} projeto(s) analisado(s)'))
+                if failed:
+                    self.stdout.write(self.style.WARNING(f'• Projetos com erro: {failed}'))
+            if not options['loop']:
+                if not results:
+                    self.stdout.write('Fila vazia.')
+                return
+            if not results:
+                connections.close_all()
+                time.sleep(options['interval'])
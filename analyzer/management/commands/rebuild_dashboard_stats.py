@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from analyzer.models import DashboardStats
+
+
+class Command(BaseCommand):
+    help = 'Recalcula as estatísticas materializadas do dashboard a partir das tabelas'
+
+    def handle(self, *args, **options):
+        stats = DashboardStats.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Estatísticas recalculadas: {stats.total_files} arquivos, '
+            f'{stats.analyzed_files} analisados, {stats.total_images} imagens'
+        ))
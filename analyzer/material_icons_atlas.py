@@ -0,0 +1,317 @@
+"""
+Atlas Rasterizado dos Ícones Material Design
+============================================
+
+Permite a comparação visual real (pixel a pixel) entre os ícones dos alunos
+e a biblioteca Material Design. A etapa de build (`manage.py
+build_material_icons_atlas`) rasteriza cada ícone/estilo em 24 e 48 px com o
+renderizador local (svg_raster.py) e empacota tudo em um único array uint8:
+
+    material_icons_atlas/atlas_48.npy   (N, 48, 48) uint8 - cobertura do ícone
+    material_icons_atlas/stats_48.npy   (N, 2) float32    - média e desvio padrão
+    material_icons_atlas/index.json     [[categoria, icone, estilo], ...]
+
+Os .npy são abertos com mmap (np.load(mmap_mode='r')), então o atlas é
+compartilhado entre os workers assim como o catálogo de ícones.
+
+A consulta compara uma imagem com o atlas inteiro de forma vetorizada
+(produto matricial em blocos), usando correlação cruzada normalizada (NCC)
+ou SSIM global. Tanto os ícones do atlas quanto a imagem consultada passam
+pela mesma normalização: recorte pela área com "tinta", centralização e
+redimensionamento para a área útil de 20/24 do ícone.
+"""
+
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from .svg_raster import render_svg
+
+
+logger = logging.getLogger(__name__)
+
+
+ATLAS_DIR = Path(__file__).parent.parent / 'material_icons_atlas'
+ATLAS_SIZES = (24, 48)
+LIVE_AREA = 20 / 24  # área útil dos ícones Material Design (2px de margem em 24px)
+
+# Constantes do SSIM para valores em [0, 1]
+_SSIM_C1 = 0.01 ** 2
+_SSIM_C2 = 0.03 ** 2
+
+_loaded_atlases = {}
+
+
+class EmptyAtlasError(ValueError):
+    """Nenhum SVG dos ícones foi encontrado: não há o que rasterizar"""
+
+
+def normalize_ink(ink, size):
+    """
+    Recorta a área com cobertura, centraliza em um quadrado e redimensiona
+    para a área útil de um ícone size × size
+
+    Args:
+        ink: imagem 'L' (0 = fundo, 255 = ícone)
+        size: lado da imagem resultante
+    """
+    bbox = ink.getbbox()
+    result = Image.new('L', (size, size), 0)
+    if not bbox:
+        return result
+
+    cropped = ink.crop(bbox)
+    side = max(cropped.size)
+    square = Image.new('L', (side, side), 0)
+    square.paste(cropped, ((side - cropped.width) // 2, (side - cropped.height) // 2))
+
+    live = max(1, round(size * LIVE_AREA))
+    square = square.resize((live, live), Image.Resampling.LANCZOS)
+    offset = (size - live) // 2
+    result.paste(square, (offset, offset))
+    return result
+
+
+def image_to_ink(img):
+    """
+    Converte uma imagem do aluno em cobertura de "tinta" ('L')
+
+    - Imagens com transparência: o canal alfa define o ícone
+    - Imagens opacas: assume fundo predominante; o ícone é o que contrasta com ele
+    """
+    if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+        alpha = img.convert('RGBA').getchannel('A')
+        if alpha.getextrema()[0] < 255:
+            return alpha
+
+    gray = img.convert('L')
+    inverted = Image.eval(gray, lambda value: 255 - value)
+    # Fundo claro (mais comum): o ícone é escuro -> usa a imagem invertida
+    histogram = gray.histogram()
+    light = sum(histogram[128:])
+    return inverted if light >= sum(histogram[:128]) else gray
+
+
+def _rasterize_chunk(svg_paths, sizes):
+    """Rasteriza uma lista de SVGs (executado em processos do pool)"""
+    results = {size: np.zeros((len(svg_paths), size, size), dtype=np.uint8) for size in sizes}
+    failed = []
+    supersample_size = max(sizes) * 4
+
+    for row, svg_path in enumerate(svg_paths):
+        try:
+            with open(svg_path, 'rb') as f:
+                ink = render_svg(f.read(), supersample_size, supersample=1)
+            for size in sizes:
+                results[size][row] = np.asarray(normalize_ink(ink, size))
+        except Exception as e:
+            failed.append((svg_path, str(e)))
+
+    return results, failed
+
+
+def build_atlas(icons_db, output_dir=ATLAS_DIR, sizes=ATLAS_SIZES, max_workers=None, chunk_size=256):
+    """
+    Rasteriza todos os ícones/estilos de MATERIAL_ICONS_DB no atlas
+
+    O atlas anterior só é substituído ao final; em caso de erro os arquivos
+    temporários (*.tmp) são removidos.
+
+    Returns:
+        dict com 'icons' (linhas do atlas), 'missing' (SVG não encontrado) e 'failed'
+
+    Raises:
+        EmptyAtlasError: nenhum SVG dos ícones foi encontrado
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    entries = []
+    svg_paths = []
+    missing = 0
+    for category, icons in icons_db.items():
+        for icon_name, styles in icons.items():
+            for style_name, info in styles.items():
+                if not os.path.exists(info.get('path', '')):
+                    missing += 1
+                    continue
+                entries.append([category, icon_name, style_name])
+                svg_paths.append(info['path'])
+    if not entries:
+        raise EmptyAtlasError(f'Nenhum SVG encontrado ({missing} ícone(s)/estilo(s) sem arquivo)')
+
+    temp_files = [output_dir / f'{name}_{size}.npy.tmp' for size in sizes for name in ('atlas', 'stats')]
+    temp_files.append(output_dir / 'index.json.tmp')
+    try:
+        failed = _write_atlas(output_dir, sizes, entries, svg_paths, max_workers, chunk_size)
+    except BaseException:
+        for path in temp_files:
+            path.unlink(missing_ok=True)
+        raise
+
+    _loaded_atlases.clear()
+    return {'icons': len(entries), 'missing': missing, 'failed': failed}
+
+
+def _write_atlas(output_dir, sizes, entries, svg_paths, max_workers, chunk_size):
+    """Rasteriza e grava atlas, estatísticas e índice (ver build_atlas)"""
+    chunks = [svg_paths[i:i + chunk_size] for i in range(0, len(svg_paths), chunk_size)]
+    atlases = {
+        size: np.lib.format.open_memmap(
+            output_dir / f'atlas_{size}.npy.tmp', mode='w+', dtype=np.uint8,
+            shape=(len(entries), size, size),
+        )
+        for size in sizes
+    }
+
+    failed = []
+    if max_workers == 1 or len(chunks) <= 1:
+        chunk_results = (_rasterize_chunk(chunk, sizes) for chunk in chunks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        chunk_results = executor.map(_rasterize_chunk, chunks, [sizes] * len(chunks))
+
+    try:
+        row = 0
+        for results, chunk_failed in chunk_results:
+            count = len(next(iter(results.values())))
+            for size in sizes:
+                atlases[size][row:row + count] = results[size]
+            failed.extend(chunk_failed)
+            row += count
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    for size, atlas in atlases.items():
+        flat = atlas.reshape(len(entries), -1).astype(np.float32) / 255.0
+        stats = np.stack([flat.mean(axis=1), flat.std(axis=1)], axis=1).astype(np.float32)
+        atlas.flush()
+        with open(output_dir / f'stats_{size}.npy.tmp', 'wb') as f:
+            np.save(f, stats)
+        os.replace(output_dir / f'atlas_{size}.npy.tmp', output_dir / f'atlas_{size}.npy')
+        os.replace(output_dir / f'stats_{size}.npy.tmp', output_dir / f'stats_{size}.npy')
+    atlases.clear()
+
+    index_tmp = output_dir / 'index.json.tmp'
+    index_tmp.write_text(
+        json.dumps({'sizes': list(sizes), 'entries': entries}, ensure_ascii=False),
+        encoding='utf-8',
+    )
+    os.replace(index_tmp, output_dir / 'index.json')
+
+    # Tamanhos de um build anterior não correspondem mais às linhas de index.json
+    for size in ATLAS_SIZES:
+        if size not in sizes:
+            for name in ('atlas', 'stats'):
+                (output_dir / f'{name}_{size}.npy').unlink(missing_ok=True)
+    return failed
+
+
+class IconAtlas:
+    """
+    Atlas de um tamanho (24 ou 48 px) aberto via mmap, com consulta vetorizada
+    """
+
+    def __init__(self, directory, size):
+        directory = Path(directory)
+        self.size = size
+        self.images = np.load(directory / f'atlas_{size}.npy', mmap_mode='r')
+        self.stats = np.load(directory / f'stats_{size}.npy', mmap_mode='r')
+        with open(directory / 'index.json', 'r', encoding='utf-8') as f:
+            self.entries = json.load(f)['entries']
+
+    def __len__(self):
+        return len(self.entries)
+
+    def prepare_query(self, img):
+        """Converte uma imagem PIL no vetor normalizado usado nas comparações"""
+        ink = normalize_ink(image_to_ink(img), self.size)
+        return np.asarray(ink, dtype=np.float32).reshape(-1) / 255.0
+
+    def scores(self, img, metric='ncc', chunk_rows=2048):
+        """
+        Similaridade da imagem com cada ícone do atlas
+
+        Args:
+            metric: 'ncc' (correlação cruzada normalizada, -1 a 1) ou 'ssim' (SSIM global)
+            chunk_rows: linhas do atlas convertidas para float por vez (limita memória)
+        """
+        query = self.prepare_query(img)
+        pixels = query.size
+        query_mean = float(query.mean())
+        query_std = float(query.std())
+
+        flat = self.images.reshape(len(self.entries), -1)
+        dots = np.empty(len(self.entries), dtype=np.float32)
+        for start in range(0, len(self.entries), chunk_rows):
+            block = flat[start:start + chunk_rows].astype(np.float32)
+            dots[start:start + chunk_rows] = block @ query / 255.0
+
+        atlas_mean = self.stats[:, 0]
+        atlas_std = self.stats[:, 1]
+        covariance = dots / pixels - atlas_mean * query_mean
+
+        if metric == 'ssim':
+            return (
+                (2 * atlas_mean * query_mean + _SSIM_C1) * (2 * covariance + _SSIM_C2)
+                / ((atlas_mean ** 2 + query_mean ** 2 + _SSIM_C1) * (atlas_std ** 2 + query_std ** 2 + _SSIM_C2))
+            )
+
+        denominator = atlas_std * query_std
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ncc = np.where(denominator > 0, covariance / denominator, 0.0)
+        return ncc
+
+    def compare(self, img, metric='ncc', top_k=5):
+        """
+        Retorna os top_k ícones mais similares como
+        [(score, categoria, icone, estilo), ...] em ordem decrescente
+        """
+        scores = self.scores(img, metric=metric)
+        top_k = min(top_k, len(scores))
+        if top_k <= 0:
+            return []
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return [(float(scores[i]), *self.entries[i]) for i in best]
+
+
+def get_atlas(size=None, directory=ATLAS_DIR):
+    """
+    Retorna o atlas (cacheado por processo) ou None se ainda não foi gerado
+
+    Args:
+        size: 24 ou 48; None usa o maior tamanho do último build (index.json['sizes'])
+    """
+    directory = Path(directory)
+    index_path = directory / 'index.json'
+    if not index_path.exists():
+        return None
+
+    if size is None:
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                built = json.load(f).get('sizes') or []
+        except (OSError, ValueError) as e:
+            logger.warning('Erro ao ler o índice do atlas de ícones: %s', e)
+            return None
+        available = [s for s in built if (directory / f'atlas_{s}.npy').exists()]
+        if not available:
+            return None
+        size = max(available)
+
+    key = (str(directory), size)
+    if key not in _loaded_atlases:
+        try:
+            _loaded_atlases[key] = IconAtlas(directory, size)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning('Erro ao abrir atlas de ícones: %s', e)
+            return None
+    return _loaded_atlases[key]
@@ -0,0 +1,217 @@
+"""
+Catálogo de Ícones Material Design Compartilhado via mmap
+=========================================================
+
+Cada worker do gunicorn mantinha sua própria cópia de MATERIAL_ICONS_DB como
+dicionários aninhados (dezenas de MB por processo). Este módulo grava o
+catálogo em um arquivo binário compacto que é mapeado em memória (mmap,
+somente leitura): todos os workers compartilham as mesmas páginas físicas do
+cache de páginas do sistema operacional.
+
+`MaterialIconsCatalog` implementa a interface de `Mapping` somente leitura
+com a mesma forma de MATERIAL_ICONS_DB:
+
+    catalog['action']['home']['filled']  ->  {'path': ..., 'hash': ..., ...}
+
+Formato do arquivo (little-endian):
+
+    cabeçalho:  magic(8s) n_categorias(I) n_icones(I) n_estilos(I) off_strings(I)
+    categorias: n_categorias × (nome_off, nome_len, primeiro_icone, qtd_icones)
+    ícones:     n_icones     × (nome_off, nome_len, primeiro_estilo, qtd_estilos)
+    estilos:    n_estilos    × (nome_off, nome_len, info_off, info_len)
+    strings:    nomes em UTF-8 e informações de cada estilo em JSON
+
+Cada nível é ordenado pelo nome (bytes UTF-8), permitindo busca binária.
+"""
+
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+
+
+CATALOG_MAGIC = b'AIAMIC01'
+_HEADER = struct.Struct('<8sIIII')
+_RECORD = struct.Struct('<IIII')
+
+
+def build_catalog(icons_db, path):
+    """
+    Grava o catálogo binário a partir de {categoria: {icone: {estilo: info}}}
+
+    A escrita é atômica (arquivo temporário + os.replace): workers que já
+    mapearam a versão anterior continuam lendo o inode antigo com segurança.
+    """
+    strings = bytearray()
+    string_offsets = {}
+
+    def add_string(data):
+        if data not in string_offsets:
+            string_offsets[data] = len(strings)
+            strings.extend(data)
+        return string_offsets[data], len(data)
+
+    category_records = []
+    icon_records = []
+    style_records = []
+
+    for category in sorted(icons_db, key=lambda name: name.encode('utf-8')):
+        icons = icons_db[category]
+        first_icon = len(icon_records)
+        for icon_name in sorted(icons, key=lambda name: name.encode('utf-8')):
+            styles = icons[icon_name]
+            first_style = len(style_records)
+            for style_name in sorted(styles, key=lambda name: name.encode('utf-8')):
+                info = json.dumps(styles[style_name], ensure_ascii=False, separators=(',', ':'))
+                style_records.append(
+                    add_string(style_name.encode('utf-8')) + add_string(info.encode('utf-8'))
+                )
+            icon_records.append(
+                add_string(icon_name.encode('utf-8')) + (first_style, len(style_records) - first_style)
+            )
+        category_records.append(
+            add_string(category.encode('utf-8')) + (first_icon, len(icon_records) - first_icon)
+        )
+
+    strings_offset = _HEADER.size + _RECORD.size * (
+        len(category_records) + len(icon_records) + len(style_records)
+    )
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(
+            CATALOG_MAGIC, len(category_records), len(icon_records),
+            len(style_records), strings_offset,
+        ))
+        for record in category_records + icon_records + style_records:
+            f.write(_RECORD.pack(*record))
+        f.write(strings)
+    os.replace(tmp_path, path)
+
+
+def open_catalog(path):
+    """Abre o catálogo em modo somente leitura (mmap)"""
+    return MaterialIconsCatalog(path)
+
+
+class _CatalogLevel(Mapping):
+    """Visão somente leitura de um intervalo ordenado de registros do catálogo"""
+
+    def __init__(self, catalog, table_offset, first, count):
+        self._catalog = catalog
+        self._table_offset = table_offset
+        self._first = first
+        self._count = count
+
+    def _record(self, index):
+        return _RECORD.unpack_from(self._catalog._mm, self._table_offset + index * _RECORD.size)
+
+    def _name(self, record):
+        return self._catalog._bytes(record[0], record[1])
+
+    def _value(self, record):
+        raise NotImplementedError
+
+    def _find(self, key):
+        """Busca binária pelo nome dentro do intervalo"""
+        if not isinstance(key, str):
+            return None
+        target = key.encode('utf-8')
+        low, high = self._first, self._first + self._count
+        while low < high:
+            middle = (low + high) // 2
+            record = self._record(middle)
+            name = self._name(record)
+            if name < target:
+                low = middle + 1
+            elif name > target:
+                high = middle
+            else:
+                return record
+        return None
+
+    def __getitem__(self, key):
+        record = self._find(key)
+        if record is None:
+            raise KeyError(key)
+        return self._value(record)
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def __iter__(self):
+        for index in range(self._first, self._first + self._count):
+            yield self._name(self._record(index)).decode('utf-8')
+
+    def __len__(self):
+        return self._count
+
+    def items(self):
+        for index in range(self._first, self._first + self._count):
+            record = self._record(index)
+            yield self._name(record).decode('utf-8'), self._value(record)
+
+    def values(self):
+        for _, value in self.items():
+            yield value
+
+
+class _StylesView(_CatalogLevel):
+    """{estilo: info} de um ícone"""
+
+    def _value(self, record):
+        return json.loads(self._catalog._bytes(record[2], record[3]))
+
+
+class _IconsView(_CatalogLevel):
+    """{icone: {estilo: info}} de uma categoria"""
+
+    def _value(self, record):
+        return _StylesView(self._catalog, self._catalog._styles_offset, record[2], record[3])
+
+
+class MaterialIconsCatalog(_CatalogLevel):
+    """
+    {categoria: {icone: {estilo: info}}} lido diretamente do arquivo mapeado
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, n_categories, n_icons, n_styles, strings_offset = _HEADER.unpack_from(self._mm, 0)
+        if magic != CATALOG_MAGIC:
+            self._mm.close()
+            raise ValueError(f'Arquivo de catálogo inválido: {self.path}')
+
+        self._icons_offset = _HEADER.size + n_categories * _RECORD.size
+        self._styles_offset = self._icons_offset + n_icons * _RECORD.size
+        self._strings_offset = strings_offset
+        self.icon_count = n_icons
+        self.style_count = n_styles
+
+        super().__init__(self, _HEADER.size, 0, n_categories)
+
+    def _bytes(self, offset, length):
+        start = self._strings_offset + offset
+        return self._mm[start:start + length]
+
+    def _value(self, record):
+        return _IconsView(self, self._icons_offset, record[2], record[3])
+
+    def iter_icon_names(self):
+        """Percorre (categoria, icone) sem decodificar as informações dos estilos"""
+        for category, icons in self.items():
+            for icon_name in icons:
+                yield category, icon_name
+
+    def close(self):
+        self._mm.close()
+
+    def __repr__(self):
+        return (
+            f"<MaterialIconsCatalog '{self.path}' "
+            f"({len(self)} categorias, {self.icon_count} ícones, {self.style_count} estilos)>"
+        )
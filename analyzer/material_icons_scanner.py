@@ -0,0 +1,154 @@
+"""
+Varredura dos ícones Material Design em source/src/
+===================================================
+
+Funções usadas por `load_material_icons` para percorrer a estrutura
+
+    source/src/categoria/nome_do_icone/estilo/arquivo.svg
+
+Cada categoria é processada de forma independente, o que permite distribuir
+as categorias entre processos (ProcessPoolExecutor). Este módulo não importa
+Django para que os processos filhos iniciem rapidamente.
+
+Reconstrução incremental: cada entrada do cache guarda `mtime` e `size` do
+SVG. Se o arquivo não mudou desde o último cache, a entrada anterior é
+reaproveitada sem ler, parsear ou calcular o hash do SVG novamente.
+"""
+
+import hashlib
+import logging
+import os
+import xml.etree.ElementTree as ET
+
+
+logger = logging.getLogger(__name__)
+
+
+# Configurações dos ícones Material Design
+MATERIAL_ICON_STYLES = {
+    'materialicons': 'filled',
+    'materialiconsoutlined': 'outlined',
+    'materialiconsround': 'round',
+    'materialiconssharp': 'sharp',
+    'materialiconstwotone': 'twotone'
+}
+
+
+def parse_svg_info(svg_content):
+    """
+    Extrai informações básicas de um arquivo SVG
+    """
+    try:
+        root = ET.fromstring(svg_content)
+
+        # Remove namespace se presente
+        if root.tag.startswith('{'):
+            root.tag = root.tag.split('}')[1]
+
+        info = {}
+
+        # Extrai atributos principais
+        info['viewBox'] = root.get('viewBox', '0 0 24 24')
+        info['width'] = root.get('width', '24')
+        info['height'] = root.get('height', '24')
+
+        return info
+
+    except ET.ParseError as e:
+        logger.warning('Erro ao fazer parse do SVG: %s', e)
+        return {'viewBox': '0 0 24 24', 'width': '24', 'height': '24'}
+
+
+def svg_digest(svg_bytes):
+    """
+    MD5 do SVG, igual ao das versões anteriores do cache (texto UTF-8 com
+    quebras de linha normalizadas, como Path.read_text), para que o hash de
+    um mesmo arquivo não mude entre versões
+    """
+    text = svg_bytes.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def _is_unchanged(previous, svg_path, stat):
+    """Verifica se a entrada do cache anterior corresponde ao SVG atual"""
+    return (
+        previous is not None
+        and previous.get('path') == svg_path
+        and previous.get('mtime') == stat.st_mtime
+        and previous.get('size') == stat.st_size
+        and 'hash' in previous
+    )
+
+
+def scan_icon_category(category_path, previous_icons=None):
+    """
+    Processa todos os ícones de uma categoria
+
+    Args:
+        category_path: caminho do diretório da categoria
+        previous_icons: entradas do cache anterior para esta categoria
+                        ({icone: {estilo: info}}) ou None para forçar o parse
+
+    Returns:
+        (nome_categoria, {icone: {estilo: info}}, {'parsed': n, 'reused': n, 'errors': n})
+    """
+    previous_icons = previous_icons or {}
+    category_name = os.path.basename(category_path)
+    icons = {}
+    stats = {'parsed': 0, 'reused': 0, 'errors': 0}
+
+    with os.scandir(category_path) as icon_entries:
+        for icon_entry in icon_entries:
+            if not icon_entry.is_dir():
+                continue
+
+            icon_name = icon_entry.name
+            previous_styles = previous_icons.get(icon_name, {})
+            styles = icons.setdefault(icon_name, {})
+
+            with os.scandir(icon_entry.path) as style_entries:
+                for style_entry in style_entries:
+                    if not style_entry.is_dir():
+                        continue
+
+                    style_name = MATERIAL_ICON_STYLES.get(style_entry.name, style_entry.name)
+
+                    # Procura arquivo SVG no diretório do estilo (o primeiro em ordem alfabética)
+                    svg_files = sorted(
+                        entry.path for entry in os.scandir(style_entry.path)
+                        if entry.name.endswith('.svg') and entry.is_file()
+                    )
+                    if not svg_files:
+                        continue
+                    svg_path = svg_files[0]
+
+                    try:
+                        stat = os.stat(svg_path)
+                        previous = previous_styles.get(style_name)
+
+                        if _is_unchanged(previous, svg_path, stat):
+                            styles[style_name] = previous
+                            stats['reused'] += 1
+                            continue
+
+                        with open(svg_path, 'rb') as f:
+                            svg_bytes = f.read()
+                        svg_info = parse_svg_info(svg_bytes)
+
+                        styles[style_name] = {
+                            'path': svg_path,
+                            'viewBox': svg_info.get('viewBox', '0 0 24 24'),
+                            'width': svg_info.get('width', '24'),
+                            'height': svg_info.get('height', '24'),
+                            'hash': svg_digest(svg_bytes),
+                            'mtime': stat.st_mtime,
+                            'size': stat.st_size,
+                        }
+                        stats['parsed'] += 1
+
+                    except Exception as e:
+                        logger.warning('Erro ao processar %s: %s', svg_path, e)
+                        stats['errors'] += 1
+                        continue
+
+    return category_name, icons, stats
@@ -0,0 +1,264 @@
+"""
+Índice de Busca dos Ícones Material Design
+==========================================
+
+Índice em memória, construído uma vez por processo a partir de
+MATERIAL_ICONS_DB (catálogo mmap ou cache JSON), usado pela API de busca
+(`api_material_icons_search`) para type-ahead na página de análise Material
+Design.
+
+Estruturas:
+
+- `_tokens`: lista ordenada de (token, id_do_ícone). Os tokens são as partes
+  do nome do ícone (separadas por "_"); a consulta é dividida da mesma forma.
+  A busca por prefixo é uma busca binária (bisect) seguida de uma varredura
+  curta.
+- `_by_category`: ícones de cada categoria (termo igual ao nome da categoria).
+- `_deletes`: índice de deleções (algoritmo SymSpell) de cada token do
+  vocabulário com até 2 caracteres removidos. Um termo com erro de digitação
+  encontra os candidatos gerando as próprias deleções e consultando o
+  dicionário; a distância de edição é então confirmada só para eles.
+
+Ranking de cada termo da consulta (todos os termos precisam casar):
+
+    nome exato 100 · token exato 60 · prefixo do nome 50 · prefixo de token 40
+    categoria 30 · aproximado 20 - 5 × distância
+
+Empates favorecem nomes mais curtos e depois a ordem alfabética.
+
+O número de deleções cresce rápido com o tamanho do termo: a API recusa
+consultas acima de MAX_QUERY_LENGTH e termos acima de MAX_TERM_LENGTH, e a
+busca aproximada ignora termos maiores que o maior token do vocabulário mais
+a distância tolerada (não poderiam casar com nada).
+"""
+
+import hashlib
+import re
+import threading
+from bisect import bisect_left
+
+
+SCORE_EXACT_NAME = 100
+SCORE_EXACT_TOKEN = 60
+SCORE_NAME_PREFIX = 50
+SCORE_TOKEN_PREFIX = 40
+SCORE_CATEGORY = 30
+SCORE_FUZZY = 20
+FUZZY_PENALTY = 5
+
+MIN_FUZZY_LENGTH = 3
+
+# Limites da consulta na API (caracteres)
+MAX_QUERY_LENGTH = 64
+MAX_TERM_LENGTH = 32
+
+_index = None
+_index_source = None
+_index_lock = threading.Lock()
+
+
+def normalize_query(query):
+    """Minúsculas e termos separados (espaços, hífens e "_" viram separadores)"""
+    return [term for term in re.split(r'[\s_\-]+', query.lower()) if term]
+
+
+def max_edit_distance(term):
+    """Distância de edição tolerada para um termo da consulta"""
+    if len(term) < MIN_FUZZY_LENGTH:
+        return 0
+    return 1 if len(term) <= 5 else 2
+
+
+def _deletions(word, distance):
+    """Todas as variações de word com até `distance` caracteres removidos"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a, b, limit):
+    """Distância de Levenshtein, interrompida assim que passa de `limit`"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ch_a in enumerate(a, start=1):
+        current = [i]
+        for j, ch_b in enumerate(b, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ch_a != ch_b),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class MaterialIconsSearchIndex:
+    """Índice de busca imutável sobre {categoria: {ícone: {estilo: info}}}"""
+
+    def __init__(self, icons_db):
+        # Cada entrada: (nome, categoria, estilos)
+        self.entries = []
+        tokens = []
+        for category, icons in icons_db.items():
+            for icon_name, styles in icons.items():
+                icon_id = len(self.entries)
+                self.entries.append((icon_name, category, tuple(sorted(styles))))
+                for token in set(icon_name.split('_')):
+                    if token:
+                        tokens.append((token, icon_id))
+
+        self._tokens = sorted(tokens)
+        self._token_keys = [token for token, _ in self._tokens]
+        self.max_token_length = max((len(token) for token in self._token_keys), default=0)
+        self._by_category = {}
+        for icon_id, (_, category, _) in enumerate(self.entries):
+            self._by_category.setdefault(category, []).append(icon_id)
+
+        self._deletes = {}
+        for token in set(self._token_keys):
+            if len(token) >= MIN_FUZZY_LENGTH:
+                for variant in _deletions(token, 2):
+                    self._deletes.setdefault(variant, set()).add(token)
+
+        digest = hashlib.md5()
+        for name, category, styles in sorted(self.entries):
+            digest.update(f'{category}/{name}:{",".join(styles)};'.encode('utf-8'))
+        self.version = digest.hexdigest()[:16]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _exact(self, token):
+        start = bisect_left(self._token_keys, token)
+        ids = set()
+        for key, icon_id in self._tokens[start:]:
+            if key != token:
+                break
+            ids.add(icon_id)
+        return ids
+
+    def _prefix(self, prefix):
+        start = bisect_left(self._token_keys, prefix)
+        matches = {}
+        for key, icon_id in self._tokens[start:]:
+            if not key.startswith(prefix):
+                break
+            matches.setdefault(icon_id, key)
+        return matches
+
+    def _fuzzy(self, term):
+        """{id_do_ícone: distância} para tokens a até max_edit_distance(term) edições"""
+        limit = max_edit_distance(term)
+        if not limit or len(term) > self.max_token_length + limit:
+            return {}
+        candidates = set()
+        for variant in _deletions(term, limit):
+            candidates.update(self._deletes.get(variant, ()))
+
+        matches = {}
+        for token in candidates:
+            distance = edit_distance(term, token, limit)
+            if 0 < distance <= limit:
+                for icon_id in self._exact(token):
+                    if distance < matches.get(icon_id, limit + 1):
+                        matches[icon_id] = distance
+        return matches
+
+    def _score_term(self, term):
+        """{id_do_ícone: (pontuação, tipo_de_casamento)} de um termo"""
+        scores = {}
+
+        def offer(icon_id, score, kind):
+            if score > scores.get(icon_id, (0, ''))[0]:
+                scores[icon_id] = (score, kind)
+
+        for icon_id, key in self._prefix(term).items():
+            name = self.entries[icon_id][0]
+            if key == term:
+                offer(icon_id, SCORE_EXACT_NAME if name == term else SCORE_EXACT_TOKEN, 'exact')
+            else:
+                offer(icon_id, SCORE_NAME_PREFIX if name.startswith(term) else SCORE_TOKEN_PREFIX, 'prefix')
+
+        for icon_id in self._by_category.get(term, ()):
+            offer(icon_id, SCORE_CATEGORY, 'category')
+
+        for icon_id, distance in self._fuzzy(term).items():
+            offer(icon_id, SCORE_FUZZY - FUZZY_PENALTY * distance, 'fuzzy')
+
+        return scores
+
+    def search(self, query, style=None, category=None):
+        """
+        Ícones que casam com todos os termos da consulta, do mais relevante ao menos
+
+        Returns:
+            lista de dicts {'name', 'category', 'styles', 'score', 'match'}
+        """
+        terms = normalize_query(query)
+        if not terms:
+            return []
+
+        combined = None
+        for term in terms:
+            term_scores = self._score_term(term)
+            if combined is None:
+                combined = {icon_id: [score, kind] for icon_id, (score, kind) in term_scores.items()}
+            else:
+                combined = {
+                    icon_id: [combined[icon_id][0] + score, min(combined[icon_id][1], kind, key=_MATCH_ORDER.index)]
+                    for icon_id, (score, kind) in term_scores.items() if icon_id in combined
+                }
+            if not combined:
+                return []
+
+        results = []
+        for icon_id, (score, kind) in combined.items():
+            name, icon_category, styles = self.entries[icon_id]
+            if style and style not in styles:
+                continue
+            if category and category != icon_category:
+                continue
+            results.append({
+                'name': name,
+                'category': icon_category,
+                'styles': list(styles),
+                'score': score,
+                'match': kind,
+            })
+
+        results.sort(key=lambda item: (-item['score'], len(item['name']), item['name'], item['category']))
+        return results
+
+
+# Do casamento mais fraco para o mais forte: ao combinar vários termos, o resultado
+# fica com o tipo mais fraco entre eles (min pela posição nesta lista)
+_MATCH_ORDER = ['fuzzy', 'category', 'prefix', 'exact']
+
+
+def get_search_index():
+    """
+    Índice de busca do processo atual, reconstruído se MATERIAL_ICONS_DB mudou
+
+    Returns:
+        MaterialIconsSearchIndex ou None se não há ícones carregados
+    """
+    global _index, _index_source
+    from . import utils
+
+    utils.ensure_material_icons_loaded()
+    icons_db = utils.MATERIAL_ICONS_DB
+    if not icons_db:
+        return None
+
+    if _index is None or _index_source is not icons_db:
+        with _index_lock:
+            if _index is None or _index_source is not icons_db:
+                _index = MaterialIconsSearchIndex(icons_db)
+                _index_source = icons_db
+    return _index
@@ -0,0 +1,164 @@
+"""
+Memória de Bitmaps Decodificados por Tela
+=========================================
+
+O tamanho do arquivo (bytes_per_pixel) não é o que trava um app do App
+Inventor em um celular simples: cada imagem exibida é decodificada em um
+bitmap ARGB_8888 de largura × altura × 4 bytes, não importa se o PNG tem
+20KB. Um fundo de 3000×4000px ocupa 46MB de memória.
+
+Esta etapa cruza o grafo de referências dos assets (asset_graph.py) com as
+dimensões dos ImageAsset:
+
+    memory = analyze_memory_footprint(layout_analysis['asset_references'], assets)
+    memory['peak_screen'], memory['peak_bytes'], memory['screens']
+
+Só contam as propriedades do Designer que exibem uma imagem: Picture (Image,
+ImageSprite), Image (Button e afins) e BackgroundImage (Screen, Canvas,
+arranjos). O ícone do app (Screen1.Icon) não é exibido nas telas. Cada
+imagem conta uma vez por tela (o mesmo arquivo em vários componentes
+compartilha a decodificação) e em tamanho original: a estimativa não
+considera o redimensionamento para o tamanho do componente nem imagens
+trocadas pelos blocos.
+
+Telas acima de SCREEN_BITMAP_BUDGET_MB e imagens acima de
+ASSET_BITMAP_BUDGET_MB são sinalizadas no relatório.
+"""
+
+from django.conf import settings
+
+from .timing import timed
+
+
+IMAGE_PROPERTIES = ('Picture', 'Image', 'BackgroundImage')
+MB = 1024 * 1024
+
+
+def screen_budget_bytes():
+    return getattr(settings, 'SCREEN_BITMAP_BUDGET_MB', 24) * MB
+
+
+def asset_budget_bytes():
+    return getattr(settings, 'ASSET_BITMAP_BUDGET_MB', 8) * MB
+
+
+def displayed_images(references):
+    """Referências do Designer que exibem uma imagem na tela"""
+    return [use for use in references if use.source == 'designer' and use.property in IMAGE_PROPERTIES]
+
+
+@timed('memory')
+def analyze_memory_footprint(references, assets):
+    """
+    Pico estimado de memória de bitmaps de cada tela
+
+    Args:
+        references: AssetUse de todas as telas (asset_graph.py)
+        assets: ImageAsset do projeto
+
+    Returns:
+        dict com 'screens' (da mais pesada para a mais leve: screen, decoded_bytes,
+        assets [(asset, bytes)], over_budget), 'peak_screen', 'peak_bytes',
+        'oversized_assets' [(asset, bytes)], 'unresolved' (referências sem
+        ImageAsset) e os limites usados
+    """
+    by_name = {asset.name: asset for asset in assets}
+    screen_limit = screen_budget_bytes()
+    asset_limit = asset_budget_bytes()
+
+    screen_assets = {}
+    unresolved = []
+    for reference in displayed_images(references):
+        used = screen_assets.setdefault(reference.screen, {})
+        asset = by_name.get(reference.asset)
+        if asset is None:
+            unresolved.append(reference)
+        elif asset.name not in used:
+            used[asset.name] = asset
+
+    screens = []
+    for screen, used in screen_assets.items():
+        costs = sorted(((asset, asset.decoded_bytes) for asset in used.values()), key=lambda item: -item[1])
+        total = sum(cost for _, cost in costs)
+        screens.append({
+            'screen': screen,
+            'decoded_bytes': total,
+            'assets': costs,
+            'over_budget': total > screen_limit,
+        })
+    screens.sort(key=lambda item: -item['decoded_bytes'])
+
+    oversized = sorted(
+        ((asset, asset.decoded_bytes) for asset in assets if asset.decoded_bytes > asset_limit),
+        key=lambda item: -item[1],
+    )
+    peak = screens[0] if screens else None
+    return {
+        'screens': screens,
+        'peak_screen': peak['screen'] if peak else '',
+        'peak_bytes': peak['decoded_bytes'] if peak else 0,
+        'oversized_assets': oversized,
+        'unresolved': unresolved,
+        'screen_budget_bytes': screen_limit,
+        'asset_budget_bytes': asset_limit,
+    }
+
+
+def generate_performance_report(memory_analysis, unused_assets=()):
+    """
+    Seção 'performance' do relatório
+
+    Args:
+        memory_analysis: resultado de analyze_memory_footprint (ou None)
+        unused_assets: ImageAsset que nenhuma tela usa (ImageAsset.is_referenced False)
+    """
+    screens = memory_analysis['screens'] if memory_analysis else []
+    if not screens and not unused_assets:
+        return ''
+
+    lines = ['', '⚡ **DESEMPENHO: MEMÓRIA DE IMAGENS E TAMANHO DO APK**']
+    if screens:
+        screen_limit = memory_analysis['screen_budget_bytes'] / MB
+        lines += [
+            '',
+            f"📊 **PICO ESTIMADO:** {memory_analysis['peak_screen']} com "
+            f"{memory_analysis['peak_bytes'] / MB:.1f}MB de bitmaps (limite: {screen_limit:g}MB por tela)",
+            '',
+            '📱 **TELAS:**',
+        ]
+        for screen in screens:
+            status = '❌ acima do limite' if screen['over_budget'] else '✅'
+            lines.append(
+                f"• {screen['screen']}: {screen['decoded_bytes'] / MB:.1f}MB em "
+                f"{len(screen['assets'])} imagem(ns) {status}"
+            )
+
+        heaviest = sorted(
+            {asset.name: (asset, cost) for screen in screens for asset, cost in screen['assets']}.values(),
+            key=lambda item: -item[1],
+        )[:5]
+        lines += ['', '🖼️ **IMAGENS QUE MAIS OCUPAM MEMÓRIA:**']
+        lines += [f'• {asset.name}: {asset.width}×{asset.height}px → {cost / MB:.1f}MB' for asset, cost in heaviest]
+
+    if unused_assets:
+        wasted = sum(asset.file_size for asset in unused_assets)
+        lines += [
+            '',
+            f'📦 **ASSETS SEM USO:** {len(unused_assets)} imagem(ns) que nenhuma tela ou bloco usa '
+            f'({wasted / 1024:.0f}KB a mais no APK)',
+        ]
+        lines += [
+            f'• {asset.name}: {asset.file_size / 1024:.0f}KB'
+            for asset in sorted(unused_assets, key=lambda asset: -asset.file_size)[:5]
+        ]
+
+    lines += [
+        '',
+        '📈 **COMO MELHORAR:**',
+        '• A memória depende dos pixels (largura × altura × 4 bytes), não do tamanho do arquivo',
+        '• Redimensione cada imagem para o tamanho em que ela aparece na tela',
+        '• Prefira cores de fundo a imagens de fundo em tela cheia',
+    ]
+    if unused_assets:
+        lines.append('• Remova da pasta de mídia as imagens que o app não usa')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,399 @@
+"""
+Métricas de Operação (formato texto do Prometheus)
+==================================================
+
+Registro de métricas em processo, sem serviço externo, exposto em /metrics:
+
+    ANALYSIS_DURATION.observe(12.5, status='ok')
+    GEMINI_ERRORS.inc(call='context')
+    BATCH_QUEUE_DEPTH.inc(30)
+
+Tipos suportados:
+
+- Counter: só cresce (inc);
+- Gauge: valor atual (inc/dec/set); com vários processos é a soma dos
+  processos ainda vivos;
+- Histogram: distribuição em faixas fixas (_bucket, _sum e _count).
+
+Vários processos (workers do gunicorn, pool da análise em lote): defina
+METRICS_MULTIPROC_DIR com um diretório compartilhado. Cada processo grava seus
+valores em um arquivo próprio mapeado em memória (`metrics_<pid>.db`) e a
+requisição a /metrics soma os arquivos de todos os processos. Uma atualização
+custa uma escrita em memória, sem chamada ao sistema. Esvazie o diretório ao
+reiniciar o serviço, senão os contadores continuam da execução anterior.
+
+Sem METRICS_MULTIPROC_DIR os valores ficam apenas na memória do processo.
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+
+from django.conf import settings
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def is_metrics_enabled():
+    return bool(getattr(settings, 'METRICS_ENABLED', True))
+
+
+# --- Armazenamento dos valores -------------------------------------------------
+
+class _MemoryStore:
+    """Valores do processo atual"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def inc(self, key, amount):
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def set(self, key, value):
+        with self.lock:
+            self.values[key] = value
+
+    def samples(self):
+        """[(chave, valor, pid), ...]"""
+        with self.lock:
+            return [(key, value, self.pid) for key, value in self.values.items()]
+
+
+class _MmapStore:
+    """
+    Valores do processo atual em um arquivo mapeado em memória
+
+    Layout: 8 bytes com o tamanho usado, seguidos de entradas
+    [tamanho da chave: int32][chave utf-8 + espaços até alinhar em 8][valor: double].
+    Só o processo dono escreve no arquivo; os demais apenas leem.
+    """
+
+    INITIAL_SIZE = 64 * 1024
+
+    def __init__(self, directory):
+        self.pid = os.getpid()
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.path = os.path.join(directory, f'metrics_{self.pid}.db')
+        self._file = open(self.path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            self._file.truncate(self.INITIAL_SIZE)
+            size = self.INITIAL_SIZE
+        self._capacity = size
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        self._positions = {}
+        self._used = struct.unpack_from('i', self._map, 0)[0]
+        if self._used == 0:
+            self._used = 8
+            struct.pack_into('i', self._map, 0, self._used)
+        else:
+            for key, _value, position in _read_entries(self._map, self._used):
+                self._positions[key] = position
+
+    def _position(self, key):
+        position = self._positions.get(key)
+        if position is None:
+            encoded = key.encode('utf-8')
+            padded = encoded + b' ' * (8 - (len(encoded) + 4) % 8)
+            entry = struct.pack(f'i{len(padded)}sd', len(encoded), padded, 0.0)
+            while self._used + len(entry) > self._capacity:
+                self._capacity *= 2
+                self._file.truncate(self._capacity)
+                self._map = mmap.mmap(self._file.fileno(), self._capacity)
+            self._map[self._used:self._used + len(entry)] = entry
+            self._used += len(entry)
+            struct.pack_into('i', self._map, 0, self._used)
+            position = self._used - 8
+            self._positions[key] = position
+        return position
+
+    def inc(self, key, amount):
+        with self.lock:
+            position = self._position(key)
+            value = struct.unpack_from('d', self._map, position)[0]
+            struct.pack_into('d', self._map, position, value + amount)
+
+    def set(self, key, value):
+        with self.lock:
+            struct.pack_into('d', self._map, self._position(key), value)
+
+    def samples(self):
+        return _read_directory(self.directory)
+
+
+def _read_entries(data, used):
+    """Yields (chave, valor, posição do valor)"""
+    position = 8
+    while position < used:
+        length = struct.unpack_from('i', data, position)[0]
+        position += 4
+        key = bytes(data[position:position + length]).decode('utf-8')
+        position += length + (8 - (length + 4) % 8)
+        yield key, struct.unpack_from('d', data, position)[0], position
+        position += 8
+
+
+def _read_directory(directory):
+    """Amostras de todos os processos que gravaram em METRICS_MULTIPROC_DIR"""
+    samples = []
+    for filename in sorted(os.listdir(directory)):
+        if not (filename.startswith('metrics_') and filename.endswith('.db')):
+            continue
+        try:
+            pid = int(filename[len('metrics_'):-len('.db')])
+            with open(os.path.join(directory, filename), 'rb') as f:
+                data = f.read()
+        except (ValueError, OSError):
+            continue
+        if len(data) < 8:
+            continue
+        used = min(struct.unpack_from('i', data, 0)[0], len(data))
+        samples.extend((key, value, pid) for key, value, _position in _read_entries(data, used))
+    return samples
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _get_store():
+    """Store do processo atual (recriado após fork ou troca de METRICS_MULTIPROC_DIR)"""
+    global _store
+    directory = getattr(settings, 'METRICS_MULTIPROC_DIR', '') or None
+    store = _store
+    if store is not None and store.pid == os.getpid() and getattr(store, 'directory', None) == directory:
+        return store
+    with _store_lock:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            _store = _MmapStore(directory)
+        else:
+            _store = _MemoryStore()
+        return _store
+
+
+def reset_metrics():
+    """Descarta os valores do processo atual (usado nos testes)"""
+    global _store
+    with _store_lock:
+        _store = None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# --- Métricas ------------------------------------------------------------------
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.register(self)
+
+    def _key(self, suffix, labels, extra=()):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name}: labels esperados {self.labelnames}, recebidos {tuple(labels)}')
+        pairs = [[name, str(labels[name])] for name in self.labelnames]
+        pairs.extend([name, value] for name, value in extra)
+        return json.dumps([self.name, suffix, pairs])
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError('Counter só pode ser incrementado')
+        if is_metrics_enabled():
+            _get_store().inc(self._key('_total', labels), amount)
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        if is_metrics_enabled():
+            _get_store().inc(self._key('', labels), amount)
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        if is_metrics_enabled():
+            _get_store().set(self._key('', labels), value)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        if not is_metrics_enabled():
+            return
+        store = _get_store()
+        # Guarda a contagem de cada faixa; os valores acumulados são montados na exportação
+        for bound in self.buckets:
+            if value <= bound:
+                store.inc(self._key('_bucket', labels, [('le', _format_value(bound))]), 1)
+                break
+        store.inc(self._key('_sum', labels), value)
+        store.inc(self._key('_count', labels), 1)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f'Métrica duplicada: {metric.name}')
+        self.metrics[metric.name] = metric
+
+    def collect(self):
+        """
+        Soma os valores de todos os processos
+
+        Returns:
+            {nome da métrica: {(sufixo, ((label, valor), ...)): valor}}
+        """
+        collected = {name: {} for name in self.metrics}
+        alive = {}
+        for key, value, pid in _get_store().samples():
+            name, suffix, pairs = json.loads(key)
+            metric = self.metrics.get(name)
+            if metric is None:
+                continue
+            if metric.type == 'gauge' and pid != os.getpid():
+                if pid not in alive:
+                    alive[pid] = _pid_alive(pid)
+                if not alive[pid]:
+                    continue
+            sample_key = (suffix, tuple(tuple(pair) for pair in pairs))
+            collected[name][sample_key] = collected[name].get(sample_key, 0.0) + value
+        return collected
+
+    def render(self):
+        """Todas as métricas no formato texto do Prometheus (0.0.4)"""
+        collected = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f'# HELP {name} {_escape_help(metric.documentation)}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            samples = collected[name]
+            if metric.type == 'histogram':
+                lines.extend(_histogram_lines(metric, samples))
+            else:
+                for (suffix, labels), value in sorted(samples.items()):
+                    lines.append(f'{name}{suffix}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(metric, samples):
+    """Faixas acumuladas (todas as faixas de cada combinação de labels), _sum e _count"""
+    label_sets = sorted({labels for (suffix, labels) in samples if suffix == '_count'})
+    lines = []
+    for labels in label_sets:
+        cumulative = 0.0
+        for bound in metric.buckets:
+            le = _format_value(bound)
+            cumulative += samples.get(('_bucket', labels + (('le', le),)), 0.0)
+            lines.append(f'{metric.name}_bucket{_format_labels(labels + (("le", le),))} {_format_value(cumulative)}')
+        for suffix in ('_sum', '_count'):
+            lines.append(f'{metric.name}{suffix}{_format_labels(labels)} {_format_value(samples.get((suffix, labels), 0.0))}')
+    return lines
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if float(value).is_integer():
+        return f'{value:.1f}'
+    return repr(float(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in labels) + '}'
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _escape_help(text):
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+REGISTRY = Registry()
+
+
+def render_metrics():
+    return REGISTRY.render()
+
+
+# --- Métricas da aplicação -----------------------------------------------------
+
+ANALYSIS_DURATION = Histogram(
+    'aia_analysis_duration_seconds', 'Duração de analyze_aia_file', ['status'],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+ANALYSIS_STAGE_DURATION = Histogram(
+    'aia_analysis_stage_seconds', 'Duração de cada etapa de primeiro nível da análise (spans)', ['stage'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+ANALYSES_IN_PROGRESS = Gauge('aia_analyses_in_progress', 'Análises em execução')
+PROJECT_ASSETS = Histogram(
+    'aia_project_assets', 'Imagens por projeto analisado',
+    buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500),
+)
+BATCH_QUEUE_DEPTH = Gauge('aia_batch_queue_depth', 'Projetos aguardando na análise em lote')
+
+GEMINI_REQUEST_DURATION = Histogram(
+    'aia_gemini_request_seconds', 'Latência das chamadas à API do Gemini', ['call'],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+GEMINI_ERRORS = Counter('aia_gemini_errors', 'Chamadas ao Gemini que falharam (resposta de fallback)', ['call'])
+GEMINI_UNAVAILABLE = Counter('aia_gemini_unavailable', 'Análises feitas sem o Gemini disponível')
+
+REPORT_CACHE_REQUESTS = Counter(
+    'aia_report_cache_requests', 'Consultas ao cache de relatórios renderizados', ['part', 'result'],
+)
+
+HTTP_REQUESTS = Counter('aia_http_requests', 'Requisições atendidas', ['view', 'method', 'status'])
+HTTP_REQUEST_DURATION = Histogram('aia_http_request_duration_seconds', 'Tempo de resposta das views', ['view'])
+
+
+def record_analysis_run(run, aia_file):
+    """Métricas de uma execução de analyze_aia_file (AnalysisRun já finalizado)"""
+    ANALYSIS_DURATION.observe(run.duration_ms / 1000, status=run.status)
+    if run.status == 'ok':
+        PROJECT_ASSETS.observe(aia_file.total_images)
+    for path, entry in (run.timings or {}).items():
+        if '/' not in path:
+            ANALYSIS_STAGE_DURATION.observe(entry['ms'] / 1000, stage=path)
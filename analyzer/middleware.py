@@ -0,0 +1,19 @@
+import time
+
+from .metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS
+
+
+def metrics_middleware(get_response):
+    """Conta as requisições e mede o tempo de resposta de cada view (ver /metrics)"""
+
+    def middleware(request):
+        started = time.perf_counter()
+        response = get_response(request)
+        # Nome da rota, não o caminho: mantém o número de séries pequeno
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None else 'unresolved'
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, view=view)
+        HTTP_REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        return response
+
+    return middleware
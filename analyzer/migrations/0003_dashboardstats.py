@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:48
+
+from django.db import migrations, models
+
+
+def populate_dashboard_stats(apps, schema_editor):
+    """Inicializa a linha de estatísticas com os dados já existentes"""
+    AiaFile = apps.get_model('analyzer', 'AiaFile')
+    ImageAsset = apps.get_model('analyzer', 'ImageAsset')
+    DashboardStats = apps.get_model('analyzer', 'DashboardStats')
+    DashboardStats.objects.update_or_create(pk=1, defaults={
+        'total_files': AiaFile.objects.count(),
+        'analyzed_files': AiaFile.objects.filter(is_analyzed=True).count(),
+        'total_images': ImageAsset.objects.count(),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0002_imageasset_is_material_icon_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_files', models.IntegerField(default=0)),
+                ('analyzed_files', models.IntegerField(default=0)),
+                ('total_images', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(populate_dashboard_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0003_dashboardstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aiafile',
+            index=models.Index(fields=['-uploaded_at', '-id'], name='aiafile_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imageasset',
+            index=models.Index(fields=['aia_file', 'quality_rating'], name='image_file_quality_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imageasset',
+            index=models.Index(fields=['aia_file', 'asset_type'], name='image_file_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imageasset',
+            index=models.Index(condition=models.Q(('is_material_icon', True)), fields=['aia_file', 'material_icon_style'], name='image_file_material_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imageasset',
+            index=models.Index(fields=['aia_file', 'file_size'], name='image_file_size_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imageasset',
+            index=models.Index(fields=['aia_file', 'width', 'height'], name='image_file_dimensions_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usabilityevaluation',
+            index=models.Index(fields=['-overall_usability_score', '-evaluated_at'], name='evaluation_ranking_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0005_imageasset_perceptual_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Finding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('quality', 'Baixa qualidade'), ('file_size', 'Arquivo pesado'), ('resolution', 'Resolução baixa'), ('material_design', 'Material Design'), ('icon_consistency', 'Consistência de ícones'), ('layout', 'Layout e espaçamento'), ('typography', 'Tipografia'), ('contrast', 'Contraste'), ('saturation', 'Saturação')], max_length=20)),
+                ('severity', models.CharField(choices=[('critical', 'Crítica'), ('high', 'Alta'), ('medium', 'Média'), ('low', 'Baixa')], max_length=10)),
+                ('screen', models.CharField(blank=True, max_length=100)),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('evaluation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='findings', to='analyzer.usabilityevaluation')),
+                ('image_asset', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='findings', to='analyzer.imageasset')),
+            ],
+            options={
+                'ordering': ['evaluation', 'id'],
+                'indexes': [models.Index(fields=['category', 'severity', 'created_at'], name='finding_category_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReportSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(choices=[('images', 'Qualidade das Imagens'), ('icons', 'Qualidade dos Ícones'), ('academic', 'Análise Acadêmica'), ('layout', 'Layout e Interface'), ('icon_consistency', 'Consistência de Ícones'), ('recommendations', 'Recomendações')], max_length=30)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('content', models.TextField(blank=True)),
+                ('evaluation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sections', to='analyzer.usabilityevaluation')),
+            ],
+            options={
+                'ordering': ['evaluation', 'position'],
+                'constraints': [models.UniqueConstraint(fields=('evaluation', 'key'), name='report_section_unique_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0006_structured_report'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('duration_ms', models.FloatField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('running', 'Em andamento'), ('ok', 'Concluída'), ('error', 'Erro')], default='running', max_length=10)),
+                ('error', models.TextField(blank=True)),
+                ('timings', models.JSONField(blank=True, default=dict)),
+                ('aia_file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_runs', to='analyzer.aiafile')),
+            ],
+            options={
+                'ordering': ['-started_at', '-id'],
+                'indexes': [models.Index(fields=['aia_file', '-started_at'], name='analysis_run_file_idx')],
+            },
+        ),
+    ]
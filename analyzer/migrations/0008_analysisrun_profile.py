@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:15
+
+import analyzer.profiling
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0007_analysisrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisrun',
+            name='memory_report',
+            field=models.FileField(blank=True, storage=analyzer.profiling.profile_storage, upload_to=analyzer.profiling.profile_upload_to),
+        ),
+        migrations.AddField(
+            model_name='analysisrun',
+            name='profile_stats',
+            field=models.FileField(blank=True, storage=analyzer.profiling.profile_storage, upload_to=analyzer.profiling.profile_upload_to),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0008_analysisrun_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageasset',
+            name='animation_decoded_bytes',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='imageasset',
+            name='animation_duration_ms',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='imageasset',
+            name='frame_count',
+            field=models.IntegerField(default=1),
+        ),
+        migrations.AlterField(
+            model_name='finding',
+            name='category',
+            field=models.CharField(choices=[('quality', 'Baixa qualidade'), ('file_size', 'Arquivo pesado'), ('resolution', 'Resolução baixa'), ('material_design', 'Material Design'), ('icon_consistency', 'Consistência de ícones'), ('layout', 'Layout e espaçamento'), ('typography', 'Tipografia'), ('contrast', 'Contraste'), ('saturation', 'Saturação'), ('animation', 'Animação pesada')], max_length=20),
+        ),
+    ]
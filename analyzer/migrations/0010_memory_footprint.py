@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0009_imageasset_animation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='finding',
+            name='category',
+            field=models.CharField(choices=[('quality', 'Baixa qualidade'), ('file_size', 'Arquivo pesado'), ('resolution', 'Resolução baixa'), ('material_design', 'Material Design'), ('icon_consistency', 'Consistência de ícones'), ('layout', 'Layout e espaçamento'), ('typography', 'Tipografia'), ('contrast', 'Contraste'), ('saturation', 'Saturação'), ('animation', 'Animação pesada'), ('memory', 'Memória de imagens')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='reportsection',
+            name='key',
+            field=models.CharField(choices=[('images', 'Qualidade das Imagens'), ('icons', 'Qualidade dos Ícones'), ('academic', 'Análise Acadêmica'), ('layout', 'Layout e Interface'), ('icon_consistency', 'Consistência de Ícones'), ('performance', 'Desempenho'), ('recommendations', 'Recomendações')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0010_memory_footprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageasset',
+            name='is_referenced',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='finding',
+            name='category',
+            field=models.CharField(choices=[('quality', 'Baixa qualidade'), ('file_size', 'Arquivo pesado'), ('resolution', 'Resolução baixa'), ('material_design', 'Material Design'), ('icon_consistency', 'Consistência de ícones'), ('layout', 'Layout e espaçamento'), ('typography', 'Tipografia'), ('contrast', 'Contraste'), ('saturation', 'Saturação'), ('animation', 'Animação pesada'), ('memory', 'Memória de imagens'), ('unused', 'Asset sem uso')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='AssetReference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset_name', models.CharField(max_length=255)),
+                ('screen', models.CharField(max_length=100)),
+                ('component', models.CharField(blank=True, max_length=100)),
+                ('component_type', models.CharField(blank=True, max_length=100)),
+                ('property', models.CharField(blank=True, max_length=100)),
+                ('source', models.CharField(choices=[('designer', 'Designer'), ('blocks', 'Blocos')], default='designer', max_length=10)),
+                ('aia_file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asset_references', to='analyzer.aiafile')),
+                ('image_asset', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='references', to='analyzer.imageasset')),
+            ],
+            options={
+                'ordering': ['aia_file', 'screen', 'id'],
+                'indexes': [models.Index(fields=['aia_file', 'asset_name'], name='asset_ref_file_asset_idx')],
+            },
+        ),
+    ]
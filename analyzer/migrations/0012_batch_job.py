@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0011_asset_reference'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Na fila'), ('running', 'Em análise'), ('ok', 'Concluída'), ('error', 'Erro')], default='queued', max_length=10)),
+                ('error', models.TextField(blank=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('queued_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('aia_file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batch_jobs', to='analyzer.aiafile')),
+            ],
+            options={
+                'ordering': ['queued_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'queued_at'], name='batch_job_status_idx')],
+            },
+        ),
+    ]
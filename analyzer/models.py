@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from .profiling import profile_storage, profile_upload_to
 import os
 
 
@@ -17,6 +19,12 @@ class AiaFile(models.Model):
     total_icons = models.IntegerField(default=0)
     analysis_completed_at = models.DateTimeField(null=True, blank=True)
     
+    class Meta:
+        indexes = [
+            # Listagem e dashboard: ORDER BY uploaded_at DESC (id desempata a paginação)
+            models.Index(fields=['-uploaded_at', '-id'], name='aiafile_uploaded_idx'),
+        ]
+    
     def __str__(self):
         return self.name
     
@@ -76,8 +84,42 @@ class ImageAsset(models.Model):
     material_icon_style = models.CharField(max_length=20, null=True, blank=True)  # filled, outlined, round, sharp, twotone
     is_material_icon = models.BooleanField(default=False)
     
+    # Hash perceptual (dHash de 64 bits) e seus 4 blocos de 16 bits indexados,
+    # usados para encontrar imagens repetidas entre projetos (ver image_similarity.py)
+    perceptual_hash = models.CharField(max_length=16, blank=True, default='')
+    phash_0 = models.IntegerField(null=True, blank=True, db_index=True)
+    phash_1 = models.IntegerField(null=True, blank=True, db_index=True)
+    phash_2 = models.IntegerField(null=True, blank=True, db_index=True)
+    phash_3 = models.IntegerField(null=True, blank=True, db_index=True)
+    
+    # GIFs animados (ver gif_frames.py): número de quadros, duração de um ciclo
+    # e memória para decodificar todos os quadros no aparelho (ARGB_8888)
+    frame_count = models.IntegerField(default=1)
+    animation_duration_ms = models.IntegerField(null=True, blank=True)
+    animation_decoded_bytes = models.BigIntegerField(null=True, blank=True)
+    
+    # Usada por algum componente ou bloco (ver AssetReference); None em análises
+    # anteriores ao grafo de referências
+    is_referenced = models.BooleanField(null=True, blank=True)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        # Filtros usados pelos relatórios, sempre restritos a um arquivo .aia
+        indexes = [
+            models.Index(fields=['aia_file', 'quality_rating'], name='image_file_quality_idx'),
+            models.Index(fields=['aia_file', 'asset_type'], name='image_file_type_idx'),
+            # Índice parcial: o Django gera "WHERE is_material_icon" (sem "= 1"),
+            # que o SQLite só consegue casar com a condição do índice
+            models.Index(
+                fields=['aia_file', 'material_icon_style'],
+                condition=models.Q(is_material_icon=True),
+                name='image_file_material_idx',
+            ),
+            models.Index(fields=['aia_file', 'file_size'], name='image_file_size_idx'),
+            models.Index(fields=['aia_file', 'width', 'height'], name='image_file_dimensions_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.aia_file.name} - {self.name}"
     
@@ -95,10 +137,54 @@ class ImageAsset(models.Model):
 
     @property
     def bytes_per_pixel(self):
+        # Arquivo inteiro / área: animações são avaliadas à parte (animation_issues)
         if self.width > 0 and self.height > 0:
             return round(self.file_size / (self.width * self.height), 2)
         return 0
 
+    @property
+    def decoded_bytes(self):
+        """Memória do bitmap decodificado no aparelho (ARGB_8888, um quadro)"""
+        return self.width * self.height * 4
+
+    @property
+    def is_animated(self):
+        return self.frame_count > 1
+
+
+class AssetReference(models.Model):
+    """
+    Uso de um asset do projeto por um componente (Designer) ou pelos blocos de
+    uma tela, extraído dos .scm/.bky (ver asset_graph.py)
+    """
+    
+    SOURCE_CHOICES = [
+        ('designer', 'Designer'),
+        ('blocks', 'Blocos'),
+    ]
+    
+    aia_file = models.ForeignKey(AiaFile, on_delete=models.CASCADE, related_name='asset_references')
+    # Vazio para assets que não são imagens (sons, vídeos, fontes...)
+    image_asset = models.ForeignKey(
+        ImageAsset, on_delete=models.CASCADE, null=True, blank=True, related_name='references'
+    )
+    asset_name = models.CharField(max_length=255)
+    screen = models.CharField(max_length=100)
+    component = models.CharField(max_length=100, blank=True)
+    component_type = models.CharField(max_length=100, blank=True)
+    property = models.CharField(max_length=100, blank=True)
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default='designer')
+    
+    class Meta:
+        ordering = ['aia_file', 'screen', 'id']
+        indexes = [
+            models.Index(fields=['aia_file', 'asset_name'], name='asset_ref_file_asset_idx'),
+        ]
+    
+    def __str__(self):
+        target = f'{self.component}.{self.property}' if self.component else self.get_source_display()
+        return f'{self.asset_name} - {self.screen} ({target})'
+
 
 class UsabilityEvaluation(models.Model):
     """Model for storing usability evaluation results"""
@@ -122,6 +208,15 @@ class UsabilityEvaluation(models.Model):
     # Evaluation metadata
     evaluated_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            # Ranking do dashboard: maior score primeiro, mais recente no empate
+            models.Index(
+                fields=['-overall_usability_score', '-evaluated_at'],
+                name='evaluation_ranking_idx',
+            ),
+        ]
+    
     def __str__(self):
         return f"Avaliação - {self.aia_file.name}"
     
@@ -131,3 +226,228 @@ class UsabilityEvaluation(models.Model):
         return (self.low_quality_images_count + 
                 self.oversized_images_count + 
                 self.undersized_images_count)
+
+
+class ReportSection(models.Model):
+    """
+    Seção do relatório de uma avaliação, gravada separadamente para que as
+    páginas busquem apenas as seções que exibem
+    """
+    
+    SECTION_CHOICES = [
+        ('images', 'Qualidade das Imagens'),
+        ('icons', 'Qualidade dos Ícones'),
+        ('academic', 'Análise Acadêmica'),
+        ('layout', 'Layout e Interface'),
+        ('icon_consistency', 'Consistência de Ícones'),
+        ('performance', 'Desempenho'),
+        ('recommendations', 'Recomendações'),
+    ]
+    
+    evaluation = models.ForeignKey(UsabilityEvaluation, on_delete=models.CASCADE, related_name='sections')
+    key = models.CharField(max_length=30, choices=SECTION_CHOICES)
+    position = models.PositiveSmallIntegerField(default=0)
+    content = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['evaluation', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['evaluation', 'key'], name='report_section_unique_key'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_key_display()} - {self.evaluation.aia_file.name}"
+
+
+class Finding(models.Model):
+    """
+    Problema encontrado na análise (uma linha por ocorrência)
+    
+    Permite consultas entre projetos, por exemplo todas as violações de
+    contraste do semestre:
+    
+        Finding.objects.filter(category='contrast', created_at__gte=inicio_do_semestre)
+    """
+    
+    CATEGORY_CHOICES = [
+        ('quality', 'Baixa qualidade'),
+        ('file_size', 'Arquivo pesado'),
+        ('resolution', 'Resolução baixa'),
+        ('material_design', 'Material Design'),
+        ('icon_consistency', 'Consistência de ícones'),
+        ('layout', 'Layout e espaçamento'),
+        ('typography', 'Tipografia'),
+        ('contrast', 'Contraste'),
+        ('saturation', 'Saturação'),
+        ('animation', 'Animação pesada'),
+        ('memory', 'Memória de imagens'),
+        ('unused', 'Asset sem uso'),
+    ]
+    
+    SEVERITY_CHOICES = [
+        ('critical', 'Crítica'),
+        ('high', 'Alta'),
+        ('medium', 'Média'),
+        ('low', 'Baixa'),
+    ]
+    
+    evaluation = models.ForeignKey(UsabilityEvaluation, on_delete=models.CASCADE, related_name='findings')
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
+    severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES)
+    image_asset = models.ForeignKey(
+        ImageAsset, on_delete=models.CASCADE, null=True, blank=True, related_name='findings'
+    )
+    screen = models.CharField(max_length=100, blank=True)
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['evaluation', 'id']
+        indexes = [
+            # Consultas entre projetos: categoria/gravidade em um período
+            models.Index(fields=['category', 'severity', 'created_at'], name='finding_category_idx'),
+        ]
+    
+    def __str__(self):
+        return f"[{self.get_severity_display()}] {self.get_category_display()} - {self.evaluation.aia_file.name}"
+
+
+class BatchJob(models.Model):
+    """
+    Projeto do upload em lote na fila de análise, processada fora do servidor
+    web por `manage.py process_batch_queue` (ver batch.py)
+    """
+    
+    STATUS_CHOICES = [
+        ('queued', 'Na fila'),
+        ('running', 'Em análise'),
+        ('ok', 'Concluída'),
+        ('error', 'Erro'),
+    ]
+    
+    aia_file = models.ForeignKey(AiaFile, on_delete=models.CASCADE, related_name='batch_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    queued_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['queued_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'queued_at'], name='batch_job_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.aia_file.name} - {self.get_status_display()}"
+
+
+class AnalysisRun(models.Model):
+    """
+    Uma execução de analyze_aia_file, com a duração e o tempo de cada etapa
+    (ver timing.py)
+    """
+    
+    STATUS_CHOICES = [
+        ('running', 'Em andamento'),
+        ('ok', 'Concluída'),
+        ('error', 'Erro'),
+    ]
+    
+    aia_file = models.ForeignKey(AiaFile, on_delete=models.CASCADE, related_name='analysis_runs')
+    started_at = models.DateTimeField(default=timezone.now)
+    duration_ms = models.FloatField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='running')
+    error = models.TextField(blank=True)
+    # {caminho do span: {'ms': float, 'count': int}}; vazio com a medição desabilitada
+    timings = models.JSONField(default=dict, blank=True)
+    # Perfil opcional (cProfile + tracemalloc), fora de MEDIA_ROOT (ver profiling.py)
+    profile_stats = models.FileField(upload_to=profile_upload_to, storage=profile_storage, blank=True)
+    memory_report = models.FileField(upload_to=profile_upload_to, storage=profile_storage, blank=True)
+    
+    class Meta:
+        ordering = ['-started_at', '-id']
+        indexes = [
+            models.Index(fields=['aia_file', '-started_at'], name='analysis_run_file_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Análise #{self.pk} - {self.aia_file.name} ({self.get_status_display()})"
+
+
+class DashboardStats(models.Model):
+    """
+    Estatísticas agregadas do dashboard materializadas em uma única linha
+
+    Os contadores são atualizados de forma incremental (F() dentro da mesma
+    transação da alteração) no envio, na conclusão da análise e na exclusão
+    de arquivos, de modo que o dashboard não precisa varrer as tabelas.
+    """
+    
+    SINGLETON_ID = 1
+    
+    total_files = models.IntegerField(default=0)
+    analyzed_files = models.IntegerField(default=0)
+    total_images = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Estatísticas do dashboard ({self.updated_at:%d/%m/%Y %H:%M})"
+    
+    @classmethod
+    def compute(cls):
+        """Recalcula os contadores a partir das tabelas (varredura completa)"""
+        return {
+            'total_files': AiaFile.objects.count(),
+            'analyzed_files': AiaFile.objects.filter(is_analyzed=True).count(),
+            'total_images': ImageAsset.objects.count(),
+        }
+    
+    @classmethod
+    def rebuild(cls):
+        """Recria a linha de estatísticas a partir das tabelas"""
+        stats, _ = cls.objects.update_or_create(pk=cls.SINGLETON_ID, defaults=cls.compute())
+        return stats
+    
+    @classmethod
+    def current(cls):
+        """Retorna a linha de estatísticas (criando-a na primeira leitura)"""
+        stats = cls.objects.filter(pk=cls.SINGLETON_ID).first()
+        if stats is None:
+            stats = cls.rebuild()
+        return stats
+    
+    @classmethod
+    def apply_delta(cls, files=0, analyzed_files=0, images=0):
+        """
+        Soma os deltas aos contadores com um único UPDATE atômico
+        
+        Deve ser chamado dentro da mesma transação que alterou os dados.
+        Se a linha ainda não existe, ela é criada a partir das tabelas (que
+        já refletem a alteração corrente).
+        """
+        if not (files or analyzed_files or images):
+            return
+        updated = cls.objects.filter(pk=cls.SINGLETON_ID).update(
+            total_files=models.F('total_files') + files,
+            analyzed_files=models.F('analyzed_files') + analyzed_files,
+            total_images=models.F('total_images') + images,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            cls.rebuild()
+    
+    @classmethod
+    def record_analysis(cls, aia_file, was_analyzed, previous_images):
+        """
+        Atualiza os contadores após a conclusão da análise de um arquivo
+        
+        Args:
+            was_analyzed: se o arquivo já estava analisado (reanálise)
+            previous_images: total_images registrado antes da análise
+        """
+        cls.apply_delta(
+            analyzed_files=0 if was_analyzed else 1,
+            images=aia_file.total_images - previous_images,
+        )
@@ -0,0 +1,116 @@
+"""
+Paginação por cursor (keyset) para listas ordenadas por data
+============================================================
+
+A paginação por OFFSET (Paginator do Django) precisa contar a tabela inteira e
+percorrer todas as linhas anteriores à página pedida. Aqui cada página é
+buscada a partir da última linha da página anterior:
+
+    WHERE (uploaded_at, id) < (:uploaded_at, :id)
+    ORDER BY uploaded_at DESC, id DESC
+    LIMIT :tamanho + 1
+
+o que é servido diretamente pelo índice aiafile_uploaded_idx, com custo
+constante independentemente da posição na lista. O `id` desempata registros
+com o mesmo `uploaded_at`.
+
+Os cursores são opacos para o cliente: base64 de "<isoformat>|<id>".
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(obj, field='uploaded_at'):
+    """Gera o cursor que aponta para obj"""
+    raw = f'{getattr(obj, field).isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Converte o cursor em (datetime, id)
+
+    Returns:
+        tupla (datetime, int) ou None se o cursor for vazio ou inválido
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        value, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(value), int(pk)
+    except (ValueError, UnicodeError, binascii.Error):
+        return None
+
+
+class KeysetPage:
+    """Uma página de resultados com os cursores para navegação"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def paginate_keyset(queryset, page_size, after=None, before=None, field='uploaded_at'):
+    """
+    Pagina um QuerySet em ordem decrescente de (field, id)
+
+    Args:
+        queryset: QuerySet base (filtros/select_related); a ordenação é definida aqui
+        page_size: quantidade de itens por página
+        after: cursor da página seguinte (itens mais antigos)
+        before: cursor da página anterior (itens mais recentes)
+
+    Returns:
+        KeysetPage com no máximo page_size itens
+    """
+    after = decode_cursor(after)
+    before = decode_cursor(before) if after is None else None
+
+    if before is not None:
+        value, pk = before
+        rows = list(
+            queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pk__gt': pk}))
+            .order_by(field, 'pk')[:page_size + 1]
+        )
+        has_more = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        # Voltando, sempre existe a página seguinte (a que o usuário acabou de ver)
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(rows[-1], field) if rows else None,
+            previous_cursor=encode_cursor(rows[0], field) if rows and has_more else None,
+        )
+
+    ordered = queryset.order_by(f'-{field}', '-pk')
+    if after is not None:
+        value, pk = after
+        ordered = ordered.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+    rows = list(ordered[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1], field) if rows and has_more else None,
+        previous_cursor=encode_cursor(rows[0], field) if rows and after is not None else None,
+    )
@@ -0,0 +1,212 @@
+"""
+Perfil de CPU e Memória de uma Análise (opcional)
+=================================================
+
+Para diagnosticar projetos patológicos (GIFs enormes, telas gigantes) sem
+reproduzi-los localmente, uma análise pode ser executada sob cProfile e
+tracemalloc:
+
+- settings.ANALYSIS_PROFILING = True: perfila todas as análises e guarda o
+  resultado das que levarem pelo menos ANALYSIS_PROFILE_MIN_MS;
+- `?profile=1` no POST de analyze_file (apenas staff): perfila essa análise.
+
+O resultado fica no AnalysisRun da análise, em um diretório fora de
+MEDIA_ROOT (ANALYSIS_PROFILE_ROOT/<id do AiaFile>/), e é baixado pelo admin:
+
+- run_<id>.pstats: estatísticas do cProfile (`python -m pstats arquivo`,
+  snakeviz...);
+- run_<id>.memory.txt: pico de memória e as linhas que mais alocaram.
+
+Os dois ligam ganchos em toda chamada de função e alocação: a análise fica
+várias vezes mais lenta. O cProfile mede apenas a thread da análise.
+
+O tracemalloc é global ao processo: só uma análise é perfilada por vez
+(_profiling_lock). Se outra análise já está sendo perfilada, a nova roda
+sem perfil (start() devolve False). Falhas do perfil são registradas no
+log e nunca interrompem a análise.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import tempfile
+import threading
+import tracemalloc
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+
+logger = logging.getLogger(__name__)
+
+TOP_ALLOCATIONS = 40
+TOP_FUNCTIONS = 40
+
+# Uma análise perfilada por processo: o tracemalloc (pico, start/stop) é compartilhado
+_profiling_lock = threading.Lock()
+
+
+def is_profiling_enabled():
+    return bool(getattr(settings, 'ANALYSIS_PROFILING', False))
+
+
+class ProfileStorage(FileSystemStorage):
+    """Perfis ficam fora de MEDIA_ROOT: só o admin os entrega"""
+
+    @property
+    def base_location(self):
+        return str(getattr(settings, 'ANALYSIS_PROFILE_ROOT', os.path.join(settings.BASE_DIR, 'analysis_profiles')))
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+    @property
+    def base_url(self):
+        return None
+
+
+_profile_storage = ProfileStorage()
+
+
+def profile_storage():
+    """Storage dos campos de perfil de AnalysisRun (callable: não entra nas migrações)"""
+    return _profile_storage
+
+
+def profile_upload_to(run, filename):
+    return f'{run.aia_file_id}/{filename}'
+
+
+class AnalysisProfiler:
+    """
+    cProfile + tracemalloc em volta de uma análise
+
+        profiler = AnalysisProfiler()
+        if profiler.start():
+            ...
+        profiler.stop()
+        profiler.save(run)
+
+    stop() e save() nunca levantam exceção (podem ficar em um finally).
+    """
+
+    def __init__(self, frames=25):
+        self.frames = frames
+        self.profile = cProfile.Profile()
+        self.snapshot = None
+        self.peak_bytes = 0
+        self.active = False
+        self._started_tracemalloc = False
+
+    def start(self):
+        """
+        Liga cProfile e tracemalloc
+
+        Returns:
+            False se outra análise já está sendo perfilada (esta roda sem perfil)
+        """
+        if not _profiling_lock.acquire(blocking=False):
+            logger.info('Outra análise já está sendo perfilada; esta roda sem perfil')
+            return False
+        try:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._started_tracemalloc = True
+            else:
+                # Rastreamento ligado fora daqui (PYTHONTRACEMALLOC): o pico é só desta análise
+                tracemalloc.reset_peak()
+            self.profile.enable()
+        except Exception as e:
+            logger.warning('Erro ao iniciar o perfil da análise: %s', e)
+            self._release()
+            return False
+        self.active = True
+        return True
+
+    def stop(self):
+        """Desliga o perfil e guarda snapshot e pico (não faz nada se start() não perfilou)"""
+        if not self.active:
+            return
+        try:
+            self.profile.disable()
+            self.snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ])
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+        except Exception as e:
+            logger.warning('Erro ao finalizar o perfil da análise: %s', e)
+            self.snapshot = None
+        finally:
+            self._release()
+
+    def _release(self):
+        try:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        finally:
+            self._started_tracemalloc = False
+            self.active = False
+            _profiling_lock.release()
+
+    def pstats_bytes(self):
+        """Estatísticas no formato marshal do pstats (o mesmo de dump_stats)"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'analysis.pstats')
+            self.profile.dump_stats(path)
+            with open(path, 'rb') as f:
+                return f.read()
+
+    def memory_report(self, run=None):
+        """Relatório em texto: pico, maiores alocações por linha e por pilha, e funções mais caras"""
+        lines = []
+        if run is not None:
+            lines.append(f'Análise #{run.pk} - {run.aia_file.name} ({run.duration_ms or 0:.0f} ms)')
+        lines.append(f'Pico de memória rastreada: {self.peak_bytes / 1024 / 1024:.1f} MB')
+
+        if self.snapshot is not None:
+            stats = self.snapshot.statistics('lineno')
+            total = sum(stat.size for stat in stats)
+            lines.append(f'Memória ainda alocada ao final: {total / 1024 / 1024:.1f} MB')
+            lines.append('')
+            lines.append(f'Top {TOP_ALLOCATIONS} alocações por linha:')
+            for stat in stats[:TOP_ALLOCATIONS]:
+                frame = stat.traceback[0]
+                lines.append(f'{stat.size / 1024:10.1f} KiB {stat.count:8d} blocos  {frame.filename}:{frame.lineno}')
+
+            lines.append('')
+            lines.append('Pilhas das 5 maiores alocações:')
+            for stat in self.snapshot.statistics('traceback')[:5]:
+                lines.append(f'{stat.size / 1024:.1f} KiB em {stat.count} blocos')
+                lines.extend(f'    {line}' for line in stat.traceback.format(most_recent_first=True)[:20])
+
+        lines.append('')
+        lines.append(f'Top {TOP_FUNCTIONS} funções por tempo acumulado (cProfile):')
+        output = io.StringIO()
+        pstats.Stats(self.profile, stream=output).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        lines.append(output.getvalue().strip())
+        return '\n'.join(lines) + '\n'
+
+    def save(self, run, min_ms=0):
+        """
+        Grava os arquivos no AnalysisRun (sem chamar run.save())
+
+        Returns:
+            True se o perfil foi guardado
+        """
+        if self.snapshot is None or (run.duration_ms or 0) < min_ms:
+            return False
+        try:
+            run.profile_stats.save(f'run_{run.pk}.pstats', ContentFile(self.pstats_bytes()), save=False)
+            run.memory_report.save(
+                f'run_{run.pk}.memory.txt', ContentFile(self.memory_report(run).encode('utf-8')), save=False,
+            )
+            logger.info('Perfil da análise %s salvo em %s', run.pk, run.profile_stats.name)
+            return True
+        except Exception as e:
+            logger.warning('Erro ao salvar o perfil da análise %s: %s', run.pk, e)
+            return False
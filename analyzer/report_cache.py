@@ -0,0 +1,51 @@
+"""
+Cache dos Relatórios Renderizados
+=================================
+
+As páginas de relatório (analysis_results e print_analysis) convertiam o
+texto das recomendações em HTML (markdown_to_html, vários passes de regex) e
+recalculavam os contadores a cada visualização. O resultado agora fica no
+cache do Django, com chave derivada da avaliação:
+
+    aia-report:<parte>:<id da avaliação>:<evaluated_at>
+
+Quando generate_usability_evaluation atualiza uma avaliação, as entradas da
+versão anterior são removidas e `evaluated_at` é renovado. Assim nenhuma
+página pode servir um relatório antigo, mesmo que outro processo ainda
+tenha a entrada em seu próprio cache.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import REPORT_CACHE_REQUESTS
+
+
+REPORT_CACHE_PARTS = ('print', 'results')
+
+
+def report_cache_key(evaluation, part):
+    version = evaluation.evaluated_at.isoformat() if evaluation.evaluated_at else 'new'
+    return f'aia-report:{part}:{evaluation.pk}:{version}'
+
+
+def get_cached_report(evaluation, part, build):
+    """
+    Retorna a parte do relatório em cache ou a constrói com build()
+
+    Args:
+        part: 'print' ou 'results'
+        build: callable sem argumentos que retorna um objeto serializável (pickle)
+    """
+    key = report_cache_key(evaluation, part)
+    data = cache.get(key)
+    REPORT_CACHE_REQUESTS.inc(part=part, result='miss' if data is None else 'hit')
+    if data is None:
+        data = build()
+        cache.set(key, data, getattr(settings, 'REPORT_CACHE_TIMEOUT', 24 * 60 * 60))
+    return data
+
+
+def invalidate_report_cache(evaluation):
+    """Remove do cache todas as partes do relatório na versão atual da avaliação"""
+    cache.delete_many([report_cache_key(evaluation, part) for part in REPORT_CACHE_PARTS])
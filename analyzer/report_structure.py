@@ -0,0 +1,160 @@
+"""
+Relatório Estruturado das Avaliações
+====================================
+
+Além do texto completo em UsabilityEvaluation.recommendations, cada análise
+grava:
+
+- ReportSection: uma linha por seção do relatório (qualidade das imagens,
+  ícones, análise acadêmica, layout...), para que as páginas busquem só as
+  seções que exibem (RESULTS_SECTIONS em analysis_results, todas no
+  relatório de impressão). A seção 'recommendations' guarda apenas a lista
+  de ações, não o texto completo;
+- Finding: uma linha por problema encontrado (categoria, gravidade, imagem
+  ou tela envolvida e mensagem), para consultas em SQL entre projetos.
+
+Os problemas são montados a partir dos dados da análise (assets, análise de
+layout e de ícones), e não extraídos do texto do relatório. As duas tabelas
+são regravadas em lote (bulk_create) a cada análise.
+"""
+
+from django.db import transaction
+
+from .memory_footprint import MB
+from .models import Finding, ReportSection
+
+
+# Mesmos limites usados nas contagens de UsabilityEvaluation
+LOW_QUALITY_SCORE = 50
+OVERSIZED_BYTES = 1024 * 1024
+UNDERSIZED_PIXELS = 100
+
+# Seções exibidas na página de resultados (o relatório de impressão exibe todas)
+RESULTS_SECTIONS = ('layout', 'icon_consistency', 'recommendations')
+SECTION_TITLES = dict(ReportSection.SECTION_CHOICES)
+
+
+def _split_screen(issue):
+    """'Screen Tela1: mensagem' -> ('Tela1', 'mensagem')"""
+    if issue.startswith('Screen ') and ': ' in issue:
+        screen, message = issue[len('Screen '):].split(': ', 1)
+        return screen, message
+    return '', issue
+
+
+def collect_findings(images, layout_analysis=None, icon_analysis=None, memory_analysis=None):
+    """
+    Problemas encontrados na análise, ainda não salvos (sem avaliação associada)
+
+    Returns:
+        lista de Finding
+    """
+    from .utils import animation_issues, calculate_asset_quality_score
+
+    findings = []
+
+    for asset in images:
+        # Imagem que nenhuma tela usa: o único problema é o espaço no APK
+        if asset.is_referenced is False:
+            findings.append(Finding(
+                category='unused', severity='low', image_asset=asset,
+                message=f'{asset.name}: não é usada em nenhuma tela ({asset.file_size / 1024:.0f}KB a mais no APK)',
+            ))
+            continue
+        score = calculate_asset_quality_score(asset)
+        if score < LOW_QUALITY_SCORE:
+            findings.append(Finding(
+                category='quality', severity='critical', image_asset=asset,
+                message=f'{asset.name}: score {score:.1f}/100 (abaixo de {LOW_QUALITY_SCORE})',
+            ))
+        if asset.file_size > OVERSIZED_BYTES:
+            findings.append(Finding(
+                category='file_size', severity='high', image_asset=asset,
+                message=f'{asset.name}: {asset.file_size / OVERSIZED_BYTES:.1f}MB (acima de 1MB)',
+            ))
+        if asset.width < UNDERSIZED_PIXELS and asset.height < UNDERSIZED_PIXELS:
+            findings.append(Finding(
+                category='resolution', severity='medium', image_asset=asset,
+                message=f'{asset.name}: {asset.width}×{asset.height}px',
+            ))
+        if asset.asset_type == 'icon' and asset.width != asset.height:
+            findings.append(Finding(
+                category='material_design', severity='low', image_asset=asset,
+                message=f'{asset.name}: ícone não quadrado ({asset.width}×{asset.height}px)',
+            ))
+        issues = animation_issues(asset)
+        if issues:
+            findings.append(Finding(
+                category='animation', severity='high', image_asset=asset,
+                message=f'{asset.name}: ' + ', '.join(issues),
+            ))
+
+    if layout_analysis:
+        for issue in layout_analysis.get('layout_issues', []):
+            screen, message = _split_screen(issue)
+            findings.append(Finding(category='layout', severity='medium', screen=screen, message=message))
+        for issue in layout_analysis.get('typography_issues', []):
+            findings.append(Finding(category='typography', severity='medium', message=issue))
+        for issue in layout_analysis.get('contrast_issues', []):
+            findings.append(Finding(category='contrast', severity='high', message=issue))
+        for issue in layout_analysis.get('saturation_issues', []):
+            findings.append(Finding(category='saturation', severity='low', message=issue))
+
+    if icon_analysis and icon_analysis.get('has_style_inconsistency') and icon_analysis.get('issues'):
+        findings.append(Finding(
+            category='icon_consistency', severity='medium', message=icon_analysis['issues'][0],
+        ))
+
+    if memory_analysis:
+        screen_limit = memory_analysis['screen_budget_bytes'] / MB
+        for screen in memory_analysis['screens']:
+            if screen['over_budget']:
+                findings.append(Finding(
+                    category='memory', severity='high', screen=screen['screen'],
+                    message=f"{screen['decoded_bytes'] / MB:.1f}MB de imagens decodificadas "
+                            f"(acima de {screen_limit:g}MB)",
+                ))
+        asset_limit = memory_analysis['asset_budget_bytes'] / MB
+        for asset, cost in memory_analysis['oversized_assets']:
+            findings.append(Finding(
+                category='memory', severity='medium', image_asset=asset,
+                message=f'{asset.name}: {cost / MB:.1f}MB decodificada (acima de {asset_limit:g}MB)',
+            ))
+
+    return findings
+
+
+def save_structured_report(evaluation, sections, findings):
+    """
+    Substitui as seções e os problemas da avaliação (INSERTs em lote)
+
+    Args:
+        sections: [(chave, conteúdo), ...] na ordem do relatório; seções vazias são ignoradas
+        findings: resultado de collect_findings
+    """
+    section_rows = [
+        ReportSection(evaluation=evaluation, key=key, position=position, content=content.strip())
+        for position, (key, content) in enumerate(sections)
+        if content and content.strip()
+    ]
+    for finding in findings:
+        finding.evaluation = evaluation
+
+    with transaction.atomic():
+        evaluation.sections.all().delete()
+        evaluation.findings.all().delete()
+        ReportSection.objects.bulk_create(section_rows)
+        Finding.objects.bulk_create(findings)
+
+
+def get_report_sections(evaluation, keys=None):
+    """
+    Seções salvas de uma avaliação, opcionalmente só as chaves pedidas
+
+    Returns:
+        {chave: conteúdo} na ordem do relatório
+    """
+    sections = ReportSection.objects.filter(evaluation=evaluation)
+    if keys is not None:
+        sections = sections.filter(key__in=keys)
+    return dict(sections.order_by('position').values_list('key', 'content'))
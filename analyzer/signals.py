@@ -0,0 +1,29 @@
+"""
+Sinais que mantêm DashboardStats sincronizado com os arquivos enviados
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import AiaFile, DashboardStats
+
+
+@receiver(post_save, sender=AiaFile, dispatch_uid='dashboard_stats_file_created')
+def count_uploaded_file(sender, instance, created, raw=False, **kwargs):
+    """Contabiliza um novo arquivo .aia enviado"""
+    if created and not raw:
+        DashboardStats.apply_delta(
+            files=1,
+            analyzed_files=1 if instance.is_analyzed else 0,
+            images=instance.total_images,
+        )
+
+
+@receiver(post_delete, sender=AiaFile, dispatch_uid='dashboard_stats_file_deleted')
+def discount_deleted_file(sender, instance, **kwargs):
+    """Remove dos contadores um arquivo excluído (e suas imagens, via CASCADE)"""
+    DashboardStats.apply_delta(
+        files=-1,
+        analyzed_files=-1 if instance.is_analyzed else 0,
+        images=-instance.total_images,
+    )
@@ -0,0 +1,356 @@
+"""
+Renderizador Local de SVG para Ícones Material Design
+=====================================================
+
+Rasteriza os SVGs da biblioteca Material Design sem dependências externas
+(cairo, rsvg etc.), usando apenas Pillow. Suporta o subconjunto de SVG usado
+pelos ícones oficiais:
+
+- Elementos: path, circle, ellipse, rect, polygon, polyline
+- Comandos de path: M L H V C S Q T A Z (absolutos e relativos)
+- Atributos: fill="none", opacity / fill-opacity (ícones twotone)
+
+Curvas e arcos são aproximados por segmentos de reta, e o preenchimento usa a
+regra even-odd (furos de ícones outlined). Transformações (`transform`) não
+são suportadas, pois não aparecem nos ícones Material Design.
+
+O resultado é uma imagem em tons de cinza ('L') com a cobertura de "tinta"
+(0 = fundo, 255 = ícone), renderizada com superamostragem para antialiasing.
+"""
+
+import math
+import re
+import xml.etree.ElementTree as ET
+
+from PIL import Image, ImageChops, ImageDraw
+
+
+CURVE_SEGMENTS = 12
+
+_NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_COMMANDS = set('MmLlHhVvCcSsQqTtAaZz')
+
+
+class _PathScanner:
+    """Leitor sequencial dos dados do atributo `d`"""
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def _skip_separators(self):
+        while self.pos < len(self.data) and self.data[self.pos] in ' \t\r\n,':
+            self.pos += 1
+
+    def at_end(self):
+        self._skip_separators()
+        return self.pos >= len(self.data)
+
+    def peek_command(self):
+        self._skip_separators()
+        if self.pos < len(self.data) and self.data[self.pos] in _COMMANDS:
+            return self.data[self.pos]
+        return None
+
+    def command(self):
+        command = self.peek_command()
+        if command is None:
+            raise ValueError(f'Comando de path esperado na posição {self.pos}')
+        self.pos += 1
+        return command
+
+    def number(self):
+        self._skip_separators()
+        match = _NUMBER_RE.match(self.data, self.pos)
+        if not match:
+            raise ValueError(f'Número esperado na posição {self.pos}')
+        self.pos = match.end()
+        return float(match.group())
+
+    def flag(self):
+        # Flags de arco podem vir coladas: "a1 1 0 011 1"
+        self._skip_separators()
+        char = self.data[self.pos:self.pos + 1]
+        if char not in ('0', '1'):
+            raise ValueError(f'Flag de arco inválida na posição {self.pos}')
+        self.pos += 1
+        return char == '1'
+
+
+def _cubic(p0, p1, p2, p3):
+    points = []
+    for step in range(1, CURVE_SEGMENTS + 1):
+        t = step / CURVE_SEGMENTS
+        mt = 1 - t
+        points.append((
+            mt ** 3 * p0[0] + 3 * mt ** 2 * t * p1[0] + 3 * mt * t ** 2 * p2[0] + t ** 3 * p3[0],
+            mt ** 3 * p0[1] + 3 * mt ** 2 * t * p1[1] + 3 * mt * t ** 2 * p2[1] + t ** 3 * p3[1],
+        ))
+    return points
+
+
+def _quadratic(p0, p1, p2):
+    points = []
+    for step in range(1, CURVE_SEGMENTS + 1):
+        t = step / CURVE_SEGMENTS
+        mt = 1 - t
+        points.append((
+            mt ** 2 * p0[0] + 2 * mt * t * p1[0] + t ** 2 * p2[0],
+            mt ** 2 * p0[1] + 2 * mt * t * p1[1] + t ** 2 * p2[1],
+        ))
+    return points
+
+
+def _vector_angle(ux, uy, vx, vy):
+    return math.atan2(ux * vy - uy * vx, ux * vx + uy * vy)
+
+
+def _arc(start, rx, ry, rotation, large_arc, sweep, end):
+    """Converte um arco elíptico (SVG 1.1, apêndice F.6.5) em segmentos de reta"""
+    x1, y1 = start
+    x2, y2 = end
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0 or (x1 == x2 and y1 == y2):
+        return [end]
+
+    phi = math.radians(rotation)
+    cos_phi, sin_phi = math.cos(phi), math.sin(phi)
+    dx, dy = (x1 - x2) / 2, (y1 - y2) / 2
+    x1p = cos_phi * dx + sin_phi * dy
+    y1p = -sin_phi * dx + cos_phi * dy
+
+    # Corrige raios pequenos demais
+    scale = (x1p ** 2) / (rx ** 2) + (y1p ** 2) / (ry ** 2)
+    if scale > 1:
+        rx *= math.sqrt(scale)
+        ry *= math.sqrt(scale)
+
+    numerator = rx ** 2 * ry ** 2 - rx ** 2 * y1p ** 2 - ry ** 2 * x1p ** 2
+    denominator = rx ** 2 * y1p ** 2 + ry ** 2 * x1p ** 2
+    coefficient = math.sqrt(max(0.0, numerator / denominator)) if denominator else 0.0
+    if large_arc == sweep:
+        coefficient = -coefficient
+    cxp = coefficient * rx * y1p / ry
+    cyp = -coefficient * ry * x1p / rx
+    cx = cos_phi * cxp - sin_phi * cyp + (x1 + x2) / 2
+    cy = sin_phi * cxp + cos_phi * cyp + (y1 + y2) / 2
+
+    theta = _vector_angle(1, 0, (x1p - cxp) / rx, (y1p - cyp) / ry)
+    delta = _vector_angle(
+        (x1p - cxp) / rx, (y1p - cyp) / ry,
+        (-x1p - cxp) / rx, (-y1p - cyp) / ry,
+    )
+    if not sweep and delta > 0:
+        delta -= 2 * math.pi
+    elif sweep and delta < 0:
+        delta += 2 * math.pi
+
+    segments = max(4, int(abs(delta) / (math.pi / 2) * CURVE_SEGMENTS / 2))
+    points = []
+    for step in range(1, segments + 1):
+        angle = theta + delta * step / segments
+        points.append((
+            cx + rx * math.cos(angle) * cos_phi - ry * math.sin(angle) * sin_phi,
+            cy + rx * math.cos(angle) * sin_phi + ry * math.sin(angle) * cos_phi,
+        ))
+    points[-1] = end
+    return points
+
+
+def parse_path(data):
+    """
+    Converte o atributo `d` de um path em uma lista de subpaths (listas de pontos)
+    """
+    scanner = _PathScanner(data)
+    subpaths = []
+    current = []
+    x = y = 0.0
+    start_x = start_y = 0.0
+    last_control = None  # ponto de controle anterior (para S/T)
+    last_command = ''
+    command = None
+
+    while not scanner.at_end():
+        next_command = scanner.peek_command()
+        if next_command is not None:
+            command = scanner.command()
+        elif command is None:
+            raise ValueError('Path deve começar com um comando')
+        elif command in 'Mm':
+            # Coordenadas extras após M são tratadas como L
+            command = 'L' if command == 'M' else 'l'
+
+        relative = command.islower()
+        upper = command.upper()
+        ox, oy = (x, y) if relative else (0.0, 0.0)
+
+        if upper == 'Z':
+            if current:
+                subpaths.append(current)
+            current = []
+            x, y = start_x, start_y
+            last_control = None
+            last_command = upper
+            command = None
+            continue
+
+        if upper == 'M':
+            if len(current) > 1:
+                subpaths.append(current)
+            x, y = ox + scanner.number(), oy + scanner.number()
+            start_x, start_y = x, y
+            current = [(x, y)]
+            last_control = None
+        else:
+            if not current:
+                current = [(x, y)]
+
+            if upper == 'L':
+                x, y = ox + scanner.number(), oy + scanner.number()
+                current.append((x, y))
+                last_control = None
+            elif upper == 'H':
+                x = ox + scanner.number()
+                current.append((x, y))
+                last_control = None
+            elif upper == 'V':
+                y = oy + scanner.number()
+                current.append((x, y))
+                last_control = None
+            elif upper in 'CS':
+                if upper == 'C':
+                    c1 = (ox + scanner.number(), oy + scanner.number())
+                elif last_command in 'CS' and last_control:
+                    c1 = (2 * x - last_control[0], 2 * y - last_control[1])
+                else:
+                    c1 = (x, y)
+                c2 = (ox + scanner.number(), oy + scanner.number())
+                end = (ox + scanner.number(), oy + scanner.number())
+                current.extend(_cubic((x, y), c1, c2, end))
+                last_control = c2
+                x, y = end
+            elif upper in 'QT':
+                if upper == 'Q':
+                    c1 = (ox + scanner.number(), oy + scanner.number())
+                elif last_command in 'QT' and last_control:
+                    c1 = (2 * x - last_control[0], 2 * y - last_control[1])
+                else:
+                    c1 = (x, y)
+                end = (ox + scanner.number(), oy + scanner.number())
+                current.extend(_quadratic((x, y), c1, end))
+                last_control = c1
+                x, y = end
+            elif upper == 'A':
+                rx, ry = scanner.number(), scanner.number()
+                rotation = scanner.number()
+                large_arc, sweep = scanner.flag(), scanner.flag()
+                end = (ox + scanner.number(), oy + scanner.number())
+                current.extend(_arc((x, y), rx, ry, rotation, large_arc, sweep, end))
+                last_control = None
+                x, y = end
+
+        last_command = upper
+
+    if len(current) > 1:
+        subpaths.append(current)
+    return subpaths
+
+
+def _ellipse_points(cx, cy, rx, ry):
+    segments = CURVE_SEGMENTS * 4
+    return [
+        (cx + rx * math.cos(2 * math.pi * i / segments), cy + ry * math.sin(2 * math.pi * i / segments))
+        for i in range(segments)
+    ]
+
+
+def _float(element, name, default=0.0):
+    try:
+        return float(str(element.get(name, default)).replace('px', ''))
+    except ValueError:
+        return default
+
+
+def _style_properties(element):
+    properties = {}
+    for declaration in element.get('style', '').split(';'):
+        if ':' in declaration:
+            key, value = declaration.split(':', 1)
+            properties[key.strip()] = value.strip()
+    return properties
+
+
+def _element_shapes(element, tag):
+    """Retorna os subpaths (listas de pontos) de um elemento SVG suportado"""
+    if tag == 'path':
+        return parse_path(element.get('d', ''))
+    if tag == 'circle':
+        r = _float(element, 'r')
+        return [_ellipse_points(_float(element, 'cx'), _float(element, 'cy'), r, r)] if r > 0 else []
+    if tag == 'ellipse':
+        return [_ellipse_points(
+            _float(element, 'cx'), _float(element, 'cy'), _float(element, 'rx'), _float(element, 'ry')
+        )]
+    if tag == 'rect':
+        x, y = _float(element, 'x'), _float(element, 'y')
+        w, h = _float(element, 'width'), _float(element, 'height')
+        return [[(x, y), (x + w, y), (x + w, y + h), (x, y + h)]] if w > 0 and h > 0 else []
+    if tag in ('polygon', 'polyline'):
+        values = [float(v) for v in _NUMBER_RE.findall(element.get('points', ''))]
+        return [list(zip(values[0::2], values[1::2]))]
+    return []
+
+
+def render_svg(svg_content, size, supersample=4):
+    """
+    Rasteriza um SVG em uma imagem 'L' (size × size) com a cobertura do ícone
+
+    Args:
+        svg_content: texto ou bytes do SVG
+        size: lado da imagem final em pixels
+        supersample: fator de superamostragem para antialiasing
+    """
+    root = ET.fromstring(svg_content)
+    view_box = [float(v) for v in _NUMBER_RE.findall(root.get('viewBox', ''))]
+    if len(view_box) != 4 or view_box[2] <= 0 or view_box[3] <= 0:
+        view_box = [0.0, 0.0, _float(root, 'width', 24.0) or 24.0, _float(root, 'height', 24.0) or 24.0]
+    min_x, min_y, vb_width, vb_height = view_box
+
+    canvas_size = size * supersample
+    scale = canvas_size / max(vb_width, vb_height)
+    canvas = Image.new('L', (canvas_size, canvas_size), 0)
+
+    for element in root.iter():
+        tag = element.tag.split('}')[-1]
+        if tag not in ('path', 'circle', 'ellipse', 'rect', 'polygon', 'polyline'):
+            continue
+
+        style = _style_properties(element)
+        fill = style.get('fill', element.get('fill', ''))
+        if fill == 'none':
+            continue
+        opacity = 1.0
+        for attribute in ('opacity', 'fill-opacity'):
+            try:
+                opacity *= float(style.get(attribute, element.get(attribute, 1)))
+            except ValueError:
+                pass
+
+        # Even-odd: cada subpath inverte a cobertura da área que ocupa
+        mask = Image.new('1', canvas.size, 0)
+        for points in _element_shapes(element, tag):
+            if len(points) < 3:
+                continue
+            scaled = [((px - min_x) * scale, (py - min_y) * scale) for px, py in points]
+            layer = Image.new('1', canvas.size, 0)
+            ImageDraw.Draw(layer).polygon(scaled, fill=1)
+            mask = ImageChops.logical_xor(mask, layer)
+
+        layer = mask.convert('L')
+        if opacity < 1.0:
+            layer = layer.point(lambda value: int(value * opacity))
+        canvas = ImageChops.lighter(canvas, layer)
+
+    if supersample > 1:
+        canvas = canvas.resize((size, size), Image.Resampling.BOX)
+    return canvas
@@ -4,6 +4,114 @@ import re
 
 register = template.Library()
 
+# Emojis que, seguidos de **texto**, viram título de seção (⚠️ conta como dois caracteres)
+HEADER_EMOJIS = '📊🎯🏆🥇🥈🥉❌✅⚠️🔴💾📐🎨💡🚨'
+
+_EMOJI_HEADER_RE = re.compile(r'([' + HEADER_EMOJIS + r'])\s+\*\*(.+?)\*\*')
+_HEADER_RE = re.compile(r'(#{1,4})\s+(.+)$')
+_BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+_BULLET_RE = re.compile(r'[•\-]\s+(.+)$')
+_DOUBLE_RULE_RE = re.compile(r'═+$')
+_SINGLE_RULE_RE = re.compile(r'─+$')
+# Marcador sem conteúdo na linha: na versão em vários passes o \s+ atravessa a quebra de linha
+_DANGLING_MARKER_RE = re.compile(r'(?:#{1,4}|[•\-' + HEADER_EMOJIS + r'])\s*$')
+
+_MARKER_CHARS = frozenset('#•-═─' + HEADER_EMOJIS)
+
+
+class _NeedsMultipass(Exception):
+    """Entrada com construções que só a versão em vários passes reproduz fielmente"""
+
+
+def _render_line(line):
+    """Aplica, na mesma ordem da versão em vários passes, as conversões de uma linha"""
+    first = line[:1]
+    if first in _MARKER_CHARS:
+        if _DANGLING_MARKER_RE.match(line):
+            raise _NeedsMultipass
+        if first == '#':
+            match = _HEADER_RE.match(line)
+            if match:
+                level = len(match[1])
+                line = f'<h{level}>{match[2]}</h{level}>'
+        elif first in HEADER_EMOJIS:
+            match = _EMOJI_HEADER_RE.match(line)
+            if match:
+                line = (
+                    f'<h3><span class="emoji">{match[1]}</span> <strong>{match[2]}</strong></h3>'
+                    + line[match.end():]
+                )
+
+    if '**' in line:
+        line = _BOLD_RE.sub(r'<strong>\1</strong>', line)
+
+    if first == '•' or first == '-':
+        match = _BULLET_RE.match(line)
+        if match:
+            line = f'<li>{match[1]}</li>'
+    elif first == '═':
+        if _DOUBLE_RULE_RE.match(line):
+            line = '<hr class="double-line">'
+    elif first == '─':
+        if _SINGLE_RULE_RE.match(line):
+            line = '<hr class="single-line">'
+
+    return line.strip()
+
+
+def _render_single_pass(text):
+    """
+    Converte o texto percorrendo as linhas uma única vez
+
+    Cada linha passa só pelos padrões que podem casar com o seu primeiro
+    caractere, e a montagem de listas/parágrafos e o agrupamento de linhas em
+    branco (3 ou mais viram um único <br><br>) acontecem no mesmo laço.
+    """
+    output = []
+    in_list = False
+    blank_run = 0
+    glue = ''
+
+    for raw_line in text.split('\n'):
+        line = _render_line(raw_line)
+        if not line:
+            if in_list:
+                output.append('</ul>')
+                in_list = False
+            blank_run += 1
+            continue
+
+        if blank_run:
+            if blank_run >= 3:
+                glue = '<br><br>'
+            else:
+                output.extend(['<br>'] * blank_run)
+            blank_run = 0
+
+        if line.startswith('<li>'):
+            if not in_list:
+                output.append(glue + '<ul>')
+                glue = ''
+                in_list = True
+            output.append(line)
+            continue
+
+        if in_list:
+            output.append('</ul>')
+            in_list = False
+        if not line.startswith('<h') and not line.startswith('<hr'):
+            line = f'<p>{line}</p>'
+        output.append(glue + line)
+        glue = ''
+
+    if blank_run:
+        output.extend(['<br><br>'] if blank_run >= 3 else ['<br>'] * blank_run)
+    if in_list:
+        output.append('</ul>')
+
+    return '\n'.join(output)
+
+
 @register.filter
 def markdown_to_html(text):
     """Convert simple markdown-like text to HTML for print"""
@@ -14,6 +122,30 @@ def markdown_to_html(text):
     if isinstance(text, bytes):
         text = text.decode('utf-8')
     text = str(text)
+
+    # HTML já presente no texto interage com a limpeza final de <br>/<p>
+    if '<br>' in text or '<p>' in text or '</p>' in text:
+        return _markdown_to_html_multipass(text)
+    try:
+        return mark_safe(_render_single_pass(text))
+    except _NeedsMultipass:
+        return _markdown_to_html_multipass(text)
+
+
+def _markdown_to_html_multipass(text):
+    """
+    Implementação original (um re.sub por construção sobre o texto inteiro)
+
+    Mantida como referência para os testes de saída idêntica e para o
+    benchmark, e usada nos casos raros que a versão em passe único não cobre.
+    """
+    if not text:
+        return ""
+    
+    # Ensure text is a string and handle any encoding issues
+    if isinstance(text, bytes):
+        text = text.decode('utf-8')
+    text = str(text)
     
     # Convert headers with emojis
     text = re.sub(r'^([📊🎯🏆🥇🥈🥉❌✅⚠️🔴💾📐🎨💡🚨])\s+\*\*(.+?)\*\*', r'<h3><span class="emoji">\1</span> <strong>\2</strong></h3>', text, flags=re.MULTILINE)
@@ -1,3 +1,2032 @@
-from django.test import TestCase
+import csv
+import io
+import shutil
+import tempfile
+import zipfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, models
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import AiaFile, BatchJob, DashboardStats, ImageAsset, UsabilityEvaluation
+
+
+def create_analyzed_file(image_count):
+    """Cria um AiaFile analisado com image_count assets variados"""
+    aia_file = AiaFile.objects.create(name='Projeto Teste', file='aia_files/GPS_1.aia', is_analyzed=True)
+    ratings = ['low', 'medium', 'high', 'excellent']
+    types = ['icon', 'background', 'button', 'image', 'other']
+    for i in range(image_count):
+        ImageAsset.objects.create(
+            aia_file=aia_file,
+            name=f'imagem_{i}.png',
+            original_path=f'assets/imagem_{i}.png',
+            extracted_file=f'extracted_images/imagem_{i}.png',
+            width=48 + i,
+            height=48 if i % 3 else 200,
+            file_size=2048 * (i + 1),
+            format='PNG',
+            quality_score=40 + i % 60,
+            quality_rating=ratings[i % len(ratings)],
+            asset_type=types[i % len(types)],
+        )
+    UsabilityEvaluation.objects.create(aia_file=aia_file, recommendations='• Teste')
+    return aia_file
+
+
+class LazyImportTests(TestCase):
+    """Dependências pesadas só são importadas no primeiro uso"""
+
+    def test_views_import_leaves_heavy_modules_unloaded(self):
+        import json
+        import os
+        import subprocess
+        import sys
+
+        code = (
+            'import json, sys, django; django.setup(); import analyzer.views; '
+            'print(json.dumps([name for name in ("colour", "google.generativeai", "analyzer.ai_feedback", '
+            '"analyzer.gemini_ai") if name in sys.modules]))'
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='aia_analyzer.settings')
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True, timeout=120,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout.strip().splitlines()[-1]), [])
+
+    def test_worker_boot_matches_committed_baseline(self):
+        from .management.commands.benchmark_imports import DEFAULT_BASELINE
+
+        # Só os módulos pesados são comparados aqui; o tempo depende da máquina (ver README)
+        self.assertTrue(DEFAULT_BASELINE.exists())
+        call_command('benchmark_imports', runs=1, max_regression=1000, stdout=StringIO())
+
+    def test_missing_module_logs_install_hint(self):
+        from .lazy_imports import LazyModule
+
+        module = LazyModule('modulo_que_nao_existe', install_hint='Instale: pip install modulo-que-nao-existe')
+        self.assertFalse(module.is_available())
+        with self.assertLogs('analyzer.lazy_imports', 'WARNING') as logs:
+            self.assertIsNone(module.try_load())
+        self.assertEqual(
+            [record.getMessage() for record in logs.records], ['Instale: pip install modulo-que-nao-existe'],
+        )
+        # A falha fica memorizada: o aviso não se repete e o erro é o mesmo
+        with self.assertRaises(ImportError), self.assertNoLogs('analyzer.lazy_imports'):
+            module.anything
+        self.assertFalse(module.is_loaded)
+        self.assertFalse(module.is_available())
+
+        json_module = LazyModule('json')
+        self.assertFalse(json_module.is_loaded)
+        self.assertEqual(json_module.dumps([1]), '[1]')
+        self.assertTrue(json_module.is_loaded)
+
+
+class MaterialIconsWarmupTests(TestCase):
+    """Pré-carregamento dos ícones na inicialização (AnalyzerConfig.ready)"""
+
+    def setUp(self):
+        import threading
+
+        from . import utils
+
+        # Estado global dos ícones isolado por teste
+        patcher = mock.patch.multiple(
+            utils, MATERIAL_ICONS_DB={}, MATERIAL_ICONS_READY=threading.Event(),
+            _MATERIAL_ICONS_LOCK=threading.Lock(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def warmup_mode(self, argv, run_main=None, setting='sync'):
+        import os
+        import sys
+
+        from django.apps import apps
+
+        environ = {key: value for key, value in os.environ.items() if key != 'RUN_MAIN'}
+        if run_main is not None:
+            environ['RUN_MAIN'] = run_main
+        with mock.patch.object(sys, 'argv', argv), mock.patch.dict(os.environ, environ, clear=True), \
+                override_settings(MATERIAL_ICONS_WARMUP=setting):
+            return apps.get_app_config('analyzer')._material_icons_warmup_mode()
+
+    def test_warmup_mode_selection(self):
+        # Comandos de gerenciamento não carregam os ícones
+        self.assertIsNone(self.warmup_mode(['manage.py', 'migrate']))
+        self.assertIsNone(self.warmup_mode(['manage.py']))
+        self.assertIsNone(self.warmup_mode(['/usr/bin/django-admin', 'shell']))
+        # runserver: só o processo filho do autoreloader (ou --noreload) atende requisições
+        self.assertIsNone(self.warmup_mode(['manage.py', 'runserver']))
+        self.assertIsNone(self.warmup_mode(['manage.py', 'runserver'], run_main='false'))
+        self.assertEqual(self.warmup_mode(['manage.py', 'runserver'], run_main='true'), 'sync')
+        self.assertEqual(self.warmup_mode(['manage.py', 'runserver', '--noreload']), 'sync')
+        # Servidores WSGI/ASGI seguem settings.MATERIAL_ICONS_WARMUP
+        self.assertEqual(self.warmup_mode(['gunicorn', 'aia_analyzer.wsgi']), 'sync')
+        self.assertEqual(self.warmup_mode(['gunicorn', 'aia_analyzer.wsgi'], setting='background'), 'background')
+        self.assertIsNone(self.warmup_mode(['gunicorn', 'aia_analyzer.wsgi'], setting='off'))
+
+    def test_ready_runs_selected_warmup(self):
+        from django.apps import apps
+
+        config = apps.get_app_config('analyzer')
+        for mode, background, frozen in [(None, None, False), ('background', True, False), ('sync', False, True)]:
+            with mock.patch.object(config, '_material_icons_warmup_mode', return_value=mode), \
+                    mock.patch('analyzer.utils.warmup_material_icons') as warmup, \
+                    mock.patch('analyzer.apps.gc.freeze') as freeze:
+                config.ready()
+            if background is None:
+                self.assertFalse(warmup.called)
+            else:
+                warmup.assert_called_once_with(background=background)
+            self.assertEqual(freeze.called, frozen)
+
+    def test_requests_wait_for_background_warmup(self):
+        import threading
+
+        from . import utils
+
+        release = threading.Event()
+
+        def slow_catalog():
+            release.wait(10)
+            utils.MATERIAL_ICONS_DB = {'action': {'home': {'filled': {'path': 'home.svg'}}}}
+            return True
+
+        results = []
+        with mock.patch.object(utils, 'load_icons_catalog', side_effect=slow_catalog) as load_catalog, \
+                mock.patch('analyzer.material_icons_search.get_search_index') as build_index:
+            warmup = utils.warmup_material_icons(background=True)
+            self.assertEqual(warmup.name, 'material-icons-warmup')
+            request = threading.Thread(target=lambda: results.append(utils.ensure_material_icons_loaded()))
+            request.start()
+            request.join(0.2)
+            # A requisição aguarda o warmup em vez de carregar os ícones de novo
+            self.assertTrue(request.is_alive())
+            self.assertFalse(utils.is_material_icons_ready())
+            release.set()
+            warmup.join(10)
+            request.join(10)
+
+        self.assertEqual(results, [True])
+        self.assertTrue(utils.is_material_icons_ready())
+        self.assertEqual(load_catalog.call_count, 1)
+        build_index.assert_called_once_with()
+        # Já pronto: novo warmup não faz nada
+        self.assertIsNone(utils.warmup_material_icons(background=True))
+
+    def test_fork_resets_lock_and_partial_load(self):
+        import os
+
+        from . import utils
+
+        # Fork durante o warmup: lock adquirido e carregamento parcial
+        utils._MATERIAL_ICONS_LOCK.acquire()
+        utils.MATERIAL_ICONS_DB = {'action': {}}
+        utils._reset_material_icons_lock_after_fork()
+        self.assertFalse(utils._MATERIAL_ICONS_LOCK.locked())
+        self.assertEqual(utils.MATERIAL_ICONS_DB, {})
+
+        # Fork depois do warmup: os ícones já carregados são mantidos
+        loaded = {'action': {'home': {}}}
+        utils.MATERIAL_ICONS_DB = loaded
+        utils.MATERIAL_ICONS_READY.set()
+        utils._reset_material_icons_lock_after_fork()
+        self.assertIs(utils.MATERIAL_ICONS_DB, loaded)
+
+        if not hasattr(os, 'fork'):
+            return
+        # Processo filho real: o hook de register_at_fork libera o lock herdado
+        utils.MATERIAL_ICONS_READY.clear()
+        utils._MATERIAL_ICONS_LOCK.acquire()
+        with mock.patch.object(utils, 'load_icons_catalog', return_value=False), \
+                mock.patch.object(utils, 'load_icons_cache', return_value=False), \
+                mock.patch.object(utils, 'load_material_icons'):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    ok = not utils._MATERIAL_ICONS_LOCK.locked() and utils.ensure_material_icons_loaded() is False
+                    os._exit(0 if ok and utils.is_material_icons_ready() else 1)
+                except BaseException:
+                    os._exit(2)
+            _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+
+class ReportQueryCountTests(TestCase):
+    """As páginas de relatório devem usar um número constante de consultas"""
+
+    def count_queries(self, url_name, image_count):
+        aia_file = create_analyzed_file(image_count)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse(url_name, args=[aia_file.pk]))
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_analysis_results_query_count_is_constant(self):
+        self.assertEqual(
+            self.count_queries('analysis_results', 3),
+            self.count_queries('analysis_results', 30),
+        )
+
+    def test_print_analysis_query_count_is_constant(self):
+        self.assertEqual(
+            self.count_queries('print_analysis', 3),
+            self.count_queries('print_analysis', 30),
+        )
+
+    def test_print_analysis_counts(self):
+        aia_file = create_analyzed_file(10)
+        UsabilityEvaluation.objects.filter(aia_file=aia_file).update(recommendations='')
+        response = self.client.get(reverse('print_analysis', args=[aia_file.pk]))
+        images = list(aia_file.images.all())
+        self.assertEqual(response.context['total_images'], 10)
+        self.assertEqual(response.context['total_icons'], sum(i.asset_type == 'icon' for i in images))
+        self.assertEqual(response.context['low_quality_count'], sum(i.quality_rating == 'low' for i in images))
+        irregular = sum(1 for i in images if i.aspect_ratio < 0.8 or i.aspect_ratio > 1.25)
+        self.assertIn(f'proporções de {irregular} imagem(ns)', response.context['report_sections'][0]['html'])
+
+    def test_usability_evaluation_query_count_is_constant(self):
+        from .utils import generate_usability_evaluation
+
+        def count(image_count):
+            aia_file = create_analyzed_file(image_count)
+            with CaptureQueriesContext(connection) as context:
+                generate_usability_evaluation(aia_file)
+            return len(context.captured_queries)
+
+        self.assertEqual(count(3), count(30))
+
+
+class DashboardStatsTests(TestCase):
+    """Os contadores materializados devem acompanhar envio, análise e exclusão"""
+
+    def assertStatsMatchTables(self):
+        stats = DashboardStats.current()
+        computed = DashboardStats.compute()
+        self.assertEqual(
+            {field: getattr(stats, field) for field in computed},
+            computed,
+        )
+
+    def test_stats_follow_upload_analysis_and_delete(self):
+        aia_file = AiaFile.objects.create(name='Novo', file='aia_files/GPS_1.aia')
+        self.assertStatsMatchTables()
+
+        # Simula a conclusão de uma análise com 4 imagens
+        for i in range(4):
+            ImageAsset.objects.create(
+                aia_file=aia_file, name=f'i{i}.png', original_path=f'assets/i{i}.png',
+                extracted_file=f'extracted_images/i{i}.png', width=48, height=48,
+                file_size=1024, format='PNG',
+            )
+        aia_file.total_images = 4
+        aia_file.is_analyzed = True
+        aia_file.save()
+        DashboardStats.record_analysis(aia_file, was_analyzed=False, previous_images=0)
+        self.assertStatsMatchTables()
+
+        # Reanálise com menos imagens
+        aia_file.images.filter(name='i3.png').delete()
+        aia_file.total_images = 3
+        aia_file.save()
+        DashboardStats.record_analysis(aia_file, was_analyzed=True, previous_images=4)
+        self.assertStatsMatchTables()
+
+        aia_file.delete()
+        self.assertStatsMatchTables()
+
+    def test_failed_reanalysis_keeps_previous_images(self):
+        from . import utils
+        from .batch import create_aia_files
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        path = Path(settings.BASE_DIR) / 'media' / 'aia_files' / 'presidentsQuiz_1.aia'
+        with override_settings(MEDIA_ROOT=media_root):
+            aia_file = create_aia_files([(path.name, path.read_bytes())])[0]
+            utils.analyze_aia_file(aia_file)
+            images = set(aia_file.images.values_list('pk', flat=True))
+            self.assertTrue(images)
+
+            # Falha depois de processar as imagens e antes de gravar o resultado
+            with mock.patch.object(utils, 'analyze_memory_footprint', side_effect=RuntimeError('falhou')):
+                with self.assertRaises(RuntimeError):
+                    utils.analyze_aia_file(aia_file)
+        self.assertTrue(images <= set(aia_file.images.values_list('pk', flat=True)))
+        self.assertEqual(DashboardStats.current().total_images, AiaFile.objects.get(pk=aia_file.pk).total_images)
+
+    def test_dashboard_does_not_scan_tables(self):
+        create_analyzed_file(5)
+        DashboardStats.rebuild()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_images'], 5)
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        self.assertNotIn('COUNT(', sql.upper())
+        self.assertEqual(len(context.captured_queries), 3)
+
+
+class QueryIndexTests(TestCase):
+    """As consultas principais devem usar os índices compostos (EXPLAIN QUERY PLAN)"""
+
+    def test_hot_queries_use_indexes(self):
+        output = StringIO()
+        call_command('benchmark_db_indexes', assets=2000, files=40, repeat=1, stdout=output)
+        self.assertIn('Todas as consultas usam os índices esperados', output.getvalue())
+        # Os dados sintéticos são desfeitos ao final
+        self.assertFalse(AiaFile.objects.filter(name__startswith='bench_').exists())
+
+
+class FileListPaginationTests(TestCase):
+    """Lista de arquivos paginada por cursor em (uploaded_at, id)"""
+
+    def create_files(self, count):
+        files = [
+            AiaFile.objects.create(name=f'Projeto {i}', file='aia_files/GPS_1.aia', is_analyzed=True)
+            for i in range(count)
+        ]
+        # Metade com o mesmo uploaded_at para exercitar o desempate pelo id
+        AiaFile.objects.filter(pk__in=[f.pk for f in files[::2]]).update(uploaded_at=files[0].uploaded_at)
+        for aia_file in files:
+            UsabilityEvaluation.objects.create(aia_file=aia_file, overall_usability_score=50)
+        return files
+
+    def test_pages_cover_every_file_once_in_order(self):
+        self.create_files(57)
+        seen = []
+        cursor = ''
+        while True:
+            data = self.client.get(reverse('api_file_list'), {'after': cursor, 'limit': 10}).json()
+            seen.extend(item['id'] for item in data['files'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        expected = list(AiaFile.objects.order_by('-uploaded_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+        # Voltar uma página a partir da segunda devolve a primeira
+        first = self.client.get(reverse('api_file_list'), {'limit': 10}).json()
+        second = self.client.get(reverse('api_file_list'), {'after': first['next_cursor'], 'limit': 10}).json()
+        back = self.client.get(reverse('api_file_list'), {'before': second['previous_cursor'], 'limit': 10}).json()
+        self.assertEqual([f['id'] for f in back['files']], [f['id'] for f in first['files']])
+        self.assertIsNone(back['previous_cursor'])
+
+    def test_file_list_query_count_is_constant(self):
+        def count():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(reverse('file_list'))
+            self.assertEqual(response.status_code, 200)
+            return len(context.captured_queries)
+
+        self.create_files(3)
+        few = count()
+        self.create_files(30)
+        self.assertEqual(few, count())
+
+    def test_invalid_cursor_starts_from_first_page(self):
+        self.create_files(3)
+        response = self.client.get(reverse('file_list'), {'after': 'inválido'})
+        self.assertEqual(len(response.context['files']), 3)
+
+
+class BatchAnalysisTests(TestCase):
+    """Upload e análise em lote com planilha de notas"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        self.aia_bytes = (Path(settings.BASE_DIR) / 'media' / 'aia_files' / 'GPS_1.aia').read_bytes()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def make_zip(self, names):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for name in names:
+                archive.writestr(name, self.aia_bytes)
+            archive.writestr('__MACOSX/._turma_a.aia', b'')
+            archive.writestr('leia-me.txt', b'ignorado')
+        return buffer.getvalue()
+
+    def test_batch_upload_accepts_zip_and_loose_files(self):
+        uploads = [
+            SimpleUploadedFile('turma.zip', self.make_zip(['turma_a.aia', 'pasta/turma_b.aia'])),
+            SimpleUploadedFile('aluno_c.aia', self.aia_bytes),
+        ]
+        response = self.client.post(reverse('upload_batch'), {'files': uploads})
+
+        names = list(AiaFile.objects.order_by('pk').values_list('name', flat=True))
+        self.assertCountEqual(names, ['Turma A', 'Turma B', 'Aluno C'])
+        ids = list(AiaFile.objects.order_by('pk').values_list('pk', flat=True))
+        # A análise não roda no processo web: os projetos ficam na fila
+        self.assertEqual(
+            list(BatchJob.objects.order_by('pk').values_list('aia_file_id', 'status')), [(pk, 'queued') for pk in ids],
+        )
+        self.assertRedirects(response, f"{reverse('batch_status')}?ids={','.join(map(str, ids))}")
+
+    def test_zip_limits_are_checked_before_extraction(self):
+        from . import batch
+
+        with mock.patch.object(batch, 'MAX_AIA_BYTES', len(self.aia_bytes) - 1):
+            response = self.client.post(
+                reverse('upload_batch'), {'files': [SimpleUploadedFile('turma.zip', self.make_zip(['a.aia']))]},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('recusado', str(list(response.context['messages'])[0]))
+        self.assertFalse(BatchJob.objects.exists())
+        self.assertFalse(AiaFile.objects.exists())
+
+        archive = zipfile.ZipFile(io.BytesIO(self.make_zip(['a.aia', 'b.aia', 'c.aia'])))
+        with mock.patch.object(batch, 'MAX_ZIP_MEMBERS', 2), \
+                mock.patch.object(archive, 'read', wraps=archive.read) as read:
+            with self.assertRaises(batch.ZipLimitError):
+                list(batch.iter_zip_members(archive))
+        self.assertFalse(read.called)
+
+        with mock.patch.object(batch, 'MAX_ZIP_TOTAL_BYTES', 2 * len(self.aia_bytes)):
+            with self.assertRaises(batch.ZipLimitError):
+                list(batch.iter_zip_members(archive))
+        self.assertEqual(len(list(batch.iter_zip_members(archive))), 3)
+
+    def test_batch_upload_rejects_other_extensions(self):
+        response = self.client.post(
+            reverse('upload_batch'), {'files': [SimpleUploadedFile('notas.pdf', b'%PDF')]}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors)
+        self.assertFalse(AiaFile.objects.exists())
+
+    def test_analyze_batch_writes_grade_sheet(self):
+        source_dir = Path(self.media_root) / 'turma'
+        source_dir.mkdir()
+        (source_dir / 'aluno_1.aia').write_bytes(self.aia_bytes)
+        (source_dir / 'lote.zip').write_bytes(self.make_zip(['aluno_2.aia']))
+        output = Path(self.media_root) / 'notas.csv'
+
+        call_command('analyze_batch', str(source_dir), workers=1, output=str(output), stdout=StringIO())
+
+        with open(output, encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(sorted(row['name'] for row in rows), ['Aluno 1', 'Aluno 2'])
+        self.assertTrue(all(row['status'] == 'ok' for row in rows))
+        self.assertTrue(all(row['overall_usability_score'] for row in rows))
+
+        ids = ','.join(row['id'] for row in rows)
+        response = self.client.get(reverse('batch_status'), {'ids': ids, 'format': 'json'})
+        self.assertEqual([row['name'] for row in response.json()], [row['name'] for row in rows])
+        self.assertEqual(self.client.get(reverse('batch_status'), {'ids': ids}).status_code, 200)
+
+    def test_analyze_batch_validates_every_zip_before_registering(self):
+        from . import batch
+
+        source_dir = Path(self.media_root) / 'turma'
+        source_dir.mkdir()
+        (source_dir / 'a_lote.zip').write_bytes(self.make_zip(['aluno_1.aia']))
+        (source_dir / 'b_lote.zip').write_bytes(self.make_zip(['aluno_2.aia', 'aluno_3.aia', 'aluno_4.aia']))
+        (source_dir / 'c_lote.zip').write_bytes(b'nao zip')
+        output = Path(self.media_root) / 'notas.csv'
+
+        with mock.patch.object(batch, 'MAX_ZIP_MEMBERS', 2):
+            with self.assertRaisesMessage(CommandError, 'b_lote.zip'):
+                call_command('analyze_batch', str(source_dir), workers=1, output=str(output), stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('analyze_batch', str(source_dir), workers=1, output=str(output), stdout=StringIO())
+        self.assertFalse(AiaFile.objects.exists())
+        self.assertFalse(output.exists())
+
+    def test_grade_sheet_uses_most_recent_job(self):
+        import datetime
+
+        from django.utils import timezone
+
+        from .batch import grade_sheet_rows
+
+        aia_file = AiaFile.objects.create(name='reenviado', file=SimpleUploadedFile('reenviado.aia', b'x'))
+        now = timezone.now()
+        BatchJob.objects.create(aia_file=aia_file, status='error', error='falhou', queued_at=now)
+        BatchJob.objects.create(
+            aia_file=aia_file, status='queued', queued_at=now - datetime.timedelta(hours=1),
+        )
+
+        self.assertEqual(grade_sheet_rows([aia_file.pk])[0]['status'], 'error')
+
+    def test_queue_records_results_and_recovers_stalled_jobs(self):
+        import datetime
+
+        from django.utils import timezone
+
+        from .batch import process_queue, requeue_stalled
+
+        ok, broken, stalled, exhausted = (
+            AiaFile.objects.create(name=name, file=SimpleUploadedFile(f'{name}.aia', content))
+            for name, content in [('ok', self.aia_bytes), ('quebrado', b'nao zip'), ('parado', self.aia_bytes),
+                                  ('esgotado', self.aia_bytes)]
+        )
+        long_ago = timezone.now() - datetime.timedelta(hours=2)
+        BatchJob.objects.create(aia_file=ok)
+        BatchJob.objects.create(aia_file=broken)
+        BatchJob.objects.create(aia_file=stalled, status='running', started_at=long_ago, attempts=1)
+        BatchJob.objects.create(aia_file=exhausted, status='running', started_at=long_ago, attempts=2)
+
+        self.assertEqual(requeue_stalled(), (1, 1))
+        call_command('process_batch_queue', workers=1, stdout=StringIO())
+
+        jobs = {job.aia_file_id: job for job in BatchJob.objects.all()}
+        self.assertEqual(jobs[ok.pk].status, 'ok')
+        self.assertEqual((jobs[stalled.pk].status, jobs[stalled.pk].attempts), ('ok', 2))
+        self.assertEqual(jobs[broken.pk].status, 'error')
+        self.assertTrue(jobs[broken.pk].error)
+        self.assertEqual(jobs[exhausted.pk].status, 'error')
+        self.assertIn('interrompida', jobs[exhausted.pk].error)
+        self.assertEqual(process_queue(max_workers=1), {})
+
+        response = self.client.get(reverse('batch_status'), {'ids': f'{broken.pk},{ok.pk}', 'format': 'json'})
+        rows = {row['id']: row for row in response.json()}
+        self.assertEqual(rows[broken.pk]['status'], 'error')
+        self.assertEqual(rows[ok.pk]['status'], 'ok')
+        self.assertContains(self.client.get(reverse('batch_status'), {'ids': broken.pk}), 'Erro')
+
+
+class ImageSimilarityIndexTests(TestCase):
+    """Índice de hashes perceptuais para imagens repetidas entre projetos"""
+
+    def make_image(self, size=64):
+        from PIL import Image, ImageDraw
+        img = Image.new('RGB', (size, size), 'white')
+        draw = ImageDraw.Draw(img)
+        draw.ellipse((size * 0.1, size * 0.2, size * 0.6, size * 0.9), fill='navy')
+        draw.rectangle((size * 0.55, size * 0.05, size * 0.95, size * 0.45), fill='orange')
+        return img
+
+    def create_asset(self, aia_file, name, img):
+        from .image_similarity import set_perceptual_hash
+        asset = ImageAsset(
+            aia_file=aia_file, name=name, original_path=f'assets/{name}',
+            extracted_file=f'extracted_images/{name}', width=img.width, height=img.height,
+            file_size=1024, format='PNG',
+        )
+        set_perceptual_hash(asset, img)
+        asset.save()
+        return asset
+
+    def test_finds_resized_copies_in_other_projects(self):
+        from PIL import ImageOps
+        from .image_similarity import find_similar_assets, group_by_project
+
+        original = self.make_image(64)
+        project_a = AiaFile.objects.create(name='Aluno A', file='aia_files/GPS_1.aia')
+        project_b = AiaFile.objects.create(name='Aluno B', file='aia_files/GPS_1.aia')
+        project_c = AiaFile.objects.create(name='Aluno C', file='aia_files/GPS_1.aia')
+
+        asset = self.create_asset(project_a, 'logo.png', original)
+        self.create_asset(project_a, 'logo_copia.png', original)  # mesmo projeto: ignorado
+        copy = self.create_asset(project_b, 'logo.png', original.resize((200, 200)))
+        self.create_asset(project_c, 'outra.png', ImageOps.mirror(original))
+
+        results = find_similar_assets(asset)
+        self.assertEqual([item['asset'].pk for item in results], [copy.pk])
+        self.assertLessEqual(results[0]['distance'], 6)
+        self.assertEqual([group['aia_file'].pk for group in group_by_project(results)], [project_b.pk])
+
+        response = self.client.get(reverse('image_detail', args=[asset.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Aluno B')
+
+    def test_chunk_neighbors_cover_pigeonhole_radius(self):
+        from .image_similarity import chunk_neighbors, hamming_distance, split_hash
+
+        self.assertEqual(len(chunk_neighbors(0xBEEF, 1)), 17)
+        value = 0x0123456789ABCDEF
+        near = value ^ (1 << 3) ^ (1 << 20) ^ (1 << 37) ^ (1 << 50) ^ (1 << 51) ^ (1 << 60) ^ (1 << 63)
+        self.assertEqual(hamming_distance(value, near), 7)
+        # Com d = 7 e 4 blocos, algum bloco difere em no máximo 1 bit
+        self.assertTrue(any(
+            b in chunk_neighbors(a, 1) for a, b in zip(split_hash(value), split_hash(near))
+        ))
+
+    def test_undecodable_image_is_kept_without_hash(self):
+        from .utils import process_image_file
+
+        buffer = io.BytesIO()
+        self.make_image(64).save(buffer, 'PNG')
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        path = Path(temp_dir) / 'cortada.png'
+        path.write_bytes(buffer.getvalue()[:len(buffer.getvalue()) // 2])  # cabeçalho íntegro, corpo truncado
+
+        project = AiaFile.objects.create(name='Aluno A', file='aia_files/GPS_1.aia')
+        with override_settings(MEDIA_ROOT=temp_dir):
+            asset = process_image_file(str(path), 'cortada.png', project, 'assets/cortada.png')
+        self.assertIsNotNone(asset)
+        self.assertEqual((asset.width, asset.height), (64, 64))
+        self.assertEqual(asset.perceptual_hash, '')
+        self.assertIsNone(asset.phash_0)
+        self.assertTrue(ImageAsset.objects.filter(pk=asset.pk).exists())
+
+
+class MaterialIconsScannerTests(TestCase):
+    """Varredura paralela e incremental dos SVGs do Material Design"""
+
+    SVG = (
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" width="24" height="24">'
+        '<path d="M0 0h{}v{}H0z"/></svg>'
+    )
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.source = self.temp_dir / 'src'
+        self.svgs = {}
+        for category, icon, style, side in [
+            ('action', 'home', 'materialicons', 10), ('action', 'home', 'materialiconsoutlined', 12),
+            ('action', 'search', 'materialicons', 14), ('navigation', 'menu', 'materialiconsround', 16),
+        ]:
+            path = self.source / category / icon / style / '24px.svg'
+            path.parent.mkdir(parents=True)
+            path.write_text(self.SVG.format(side, side), encoding='utf-8')
+            self.svgs[category, icon, style] = path
+
+    def test_scan_reparses_only_changed_svgs(self):
+        import os
+
+        from . import material_icons_scanner
+        from .material_icons_scanner import scan_icon_category
+
+        category = str(self.source / 'action')
+        name, icons, stats = scan_icon_category(category)
+        self.assertEqual(name, 'action')
+        self.assertEqual(sorted(icons['home']), ['filled', 'outlined'])
+        self.assertEqual(stats, {'parsed': 3, 'reused': 0, 'errors': 0})
+
+        touched = self.svgs['action', 'home', 'materialiconsoutlined']
+        touched.write_text(self.SVG.format(20, 20), encoding='utf-8')
+        os.utime(touched, (1, 1))
+        with mock.patch.object(material_icons_scanner, 'open', create=True, wraps=open) as opened:
+            _, rescanned, stats = scan_icon_category(category, icons)
+        self.assertEqual(stats, {'parsed': 1, 'reused': 2, 'errors': 0})
+        self.assertEqual([call.args[0] for call in opened.call_args_list], [str(touched)])
+        self.assertNotEqual(rescanned['home']['outlined']['hash'], icons['home']['outlined']['hash'])
+        self.assertIs(rescanned['home']['filled'], icons['home']['filled'])
+
+    def test_hash_matches_previous_cache_format(self):
+        import hashlib
+
+        from .material_icons_scanner import scan_icon_category
+
+        path = self.svgs['navigation', 'menu', 'materialiconsround']
+        path.write_bytes(self.SVG.format(8, 8).replace('><', '>\r\n<').encode('utf-8'))
+        _, icons, _ = scan_icon_category(str(self.source / 'navigation'))
+        # Mesmo digest das versões anteriores: md5(read_text().encode())
+        expected = hashlib.md5(path.read_text(encoding='utf-8').encode()).hexdigest()
+        self.assertEqual(icons['menu']['round']['hash'], expected)
+
+    def test_load_material_icons_incremental_and_force_reload(self):
+        import os
+        import threading
+
+        from . import material_icons_scanner, utils
+
+        parse = mock.patch.object(
+            material_icons_scanner, 'parse_svg_info', wraps=material_icons_scanner.parse_svg_info,
+        )
+        with mock.patch.multiple(
+            utils, ICONS_SOURCE_PATH=self.source, ICONS_CACHE_PATH=self.temp_dir / 'cache.json',
+            ICONS_CATALOG_PATH=self.temp_dir / 'catalog.bin', MATERIAL_ICONS_DB={},
+            MATERIAL_ICONS_READY=threading.Event(),
+        ):
+            self.assertEqual(utils.load_material_icons(max_workers=1), {'parsed': 4, 'reused': 0, 'errors': 0})
+            self.assertEqual(utils.MATERIAL_ICONS_DB['navigation']['menu']['round']['viewBox'], '0 0 24 24')
+
+            touched = self.svgs['action', 'search', 'materialicons']
+            os.utime(touched, (1, 1))
+            with parse as parse_svg_info:
+                self.assertEqual(utils.load_material_icons(max_workers=1), {'parsed': 1, 'reused': 3, 'errors': 0})
+            self.assertEqual(parse_svg_info.call_count, 1)
+
+            with parse as parse_svg_info:
+                self.assertEqual(
+                    utils.load_material_icons(force_reload=True, max_workers=1),
+                    {'parsed': 4, 'reused': 0, 'errors': 0},
+                )
+            self.assertEqual(parse_svg_info.call_count, 4)
+            utils.MATERIAL_ICONS_DB.close()
+
+
+class MaterialIconsCatalogTests(TestCase):
+    """Catálogo binário dos ícones Material Design compartilhado via mmap"""
+
+    ICONS = {
+        'navigation': {
+            'menu': {'filled': {'path': '/icons/menu.svg', 'hash': 'aa'}},
+            'arrow_back': {'sharp': {'path': '/icons/arrow_sharp.svg'}, 'filled': {'path': '/icons/arrow.svg'}},
+        },
+        'action': {
+            'home': {'outlined': {'path': '/icons/home_o.svg', 'width': 24}, 'filled': {'path': '/icons/home.svg'}},
+            'ícone_ação': {'round': {'path': '/ícones/ação.svg', 'viewBox': '0 0 24 24'}},
+        },
+        'vazia': {},
+    }
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+    def open(self, icons_db):
+        from .material_icons_catalog import build_catalog, open_catalog
+
+        path = self.temp_dir / 'catalog.bin'
+        build_catalog(icons_db, path)
+        catalog = open_catalog(path)
+        self.addCleanup(catalog.close)
+        return catalog
+
+    def test_round_trip_mapping_interface(self):
+        catalog = self.open(self.ICONS)
+
+        self.assertEqual(len(catalog), 3)
+        self.assertEqual((catalog.icon_count, catalog.style_count), (4, 6))
+        # Cada nível fica ordenado pelos bytes UTF-8 do nome
+        self.assertEqual(list(catalog), ['action', 'navigation', 'vazia'])
+        self.assertEqual(list(catalog['action']), ['home', 'ícone_ação'])
+        self.assertEqual(list(catalog['navigation']['arrow_back']), ['filled', 'sharp'])
+        self.assertEqual(list(catalog.iter_icon_names())[:2], [('action', 'home'), ('action', 'ícone_ação')])
+
+        self.assertEqual(catalog['action']['home']['outlined'], {'path': '/icons/home_o.svg', 'width': 24})
+        self.assertEqual(catalog['action']['ícone_ação']['round']['path'], '/ícones/ação.svg')
+        self.assertEqual(len(catalog['action']['home']), 2)
+        self.assertEqual(len(catalog['vazia']), 0)
+        self.assertEqual(
+            {category: {name: dict(styles) for name, styles in icons.items()} for category, icons in catalog.items()},
+            self.ICONS,
+        )
+
+        self.assertIn('navigation', catalog)
+        self.assertIn('menu', catalog['navigation'])
+        self.assertNotIn('menu', catalog['action'])
+        self.assertNotIn(42, catalog)
+        self.assertIsNone(catalog.get('toggle'))
+        self.assertEqual(catalog['action'].get('home', {}).get('round', 'nenhum'), 'nenhum')
+        for lookup in (lambda: catalog['toggle'], lambda: catalog['action']['menu'],
+                       lambda: catalog['action']['home']['sharp']):
+            with self.assertRaises(KeyError):
+                lookup()
+
+    def test_empty_and_invalid_files(self):
+        from .material_icons_catalog import open_catalog
+
+        catalog = self.open({})
+        self.assertEqual((len(catalog), list(catalog)), (0, []))
+        self.assertNotIn('action', catalog)
+
+        invalid = self.temp_dir / 'invalido.bin'
+        invalid.write_bytes(b'NAOCATAL' + bytes(16))
+        with self.assertRaises(ValueError):
+            open_catalog(invalid)
+
+    def test_ensure_loaded_falls_back_when_catalog_is_stale_or_missing(self):
+        import json
+        import os
+        import threading
+
+        from . import utils
+        from .material_icons_catalog import MaterialIconsCatalog, build_catalog
+
+        cache_path = self.temp_dir / 'cache.json'
+        catalog_path = self.temp_dir / 'catalog.bin'
+
+        def ensure_loaded():
+            with mock.patch.multiple(
+                utils, ICONS_CACHE_PATH=cache_path, ICONS_CATALOG_PATH=catalog_path,
+                MATERIAL_ICONS_DB={}, MATERIAL_ICONS_READY=threading.Event(),
+            ), mock.patch.object(utils, 'load_material_icons') as load_svgs:
+                loaded = utils.ensure_material_icons_loaded()
+                self.assertTrue(utils.MATERIAL_ICONS_READY.is_set())
+                self.assertEqual(loaded, bool(utils.MATERIAL_ICONS_DB))
+                return utils.MATERIAL_ICONS_DB, load_svgs.called
+
+        # Sem catálogo: lê o cache JSON e publica o catálogo
+        cache_path.write_text(json.dumps({'action': {'home': {'filled': {'path': 'novo.svg'}}}}), encoding='utf-8')
+        db, loaded_svgs = ensure_loaded()
+        self.assertFalse(loaded_svgs)
+        self.assertIsInstance(db, MaterialIconsCatalog)
+        self.assertEqual(db['action']['home']['filled']['path'], 'novo.svg')
+        db.close()
+
+        # Catálogo atualizado: é mapeado diretamente
+        with mock.patch.object(utils, 'read_icons_cache') as read_cache:
+            db, _ = ensure_loaded()
+        self.assertFalse(read_cache.called)
+        self.assertEqual(db['action']['home']['filled']['path'], 'novo.svg')
+        db.close()
+
+        # Catálogo mais antigo que o cache JSON: é ignorado e regenerado a partir do cache
+        build_catalog({'action': {'home': {'filled': {'path': 'antigo.svg'}}}}, catalog_path)
+        os.utime(catalog_path, (1, 1))
+        db, loaded_svgs = ensure_loaded()
+        self.assertFalse(loaded_svgs)
+        self.assertEqual(db['action']['home']['filled']['path'], 'novo.svg')
+        db.close()
+
+        # Sem catálogo nem cache: processa os SVGs
+        catalog_path.unlink()
+        cache_path.unlink()
+        db, loaded_svgs = ensure_loaded()
+        self.assertTrue(loaded_svgs)
+        self.assertEqual(db, {})
+
+
+class MaterialIconsAtlasTests(TestCase):
+    """Renderizador de SVG e atlas rasterizado para a comparação visual dos ícones"""
+
+    SQUARE = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24"><path d="M4 4h16v16H4z"/></svg>'
+    FRAME = (
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24">'
+        '<path d="M4 4h16v16H4zM8 8v8h8V8z"/></svg>'
+    )
+    CIRCLE = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24"><circle cx="12" cy="12" r="8"/></svg>'
+    TRIANGLE = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24"><path d="M12 3L21 20H3z"/></svg>'
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+    def icons_db(self, **svgs):
+        db = {'test': {}}
+        for name, content in svgs.items():
+            path = self.temp_dir / f'{name}.svg'
+            path.write_text(content, encoding='utf-8')
+            db['test'][name] = {'filled': {'path': str(path)}}
+        return db
+
+    def test_render_svg_pixels(self):
+        from .svg_raster import render_svg
+
+        square = render_svg(self.SQUARE, 24, supersample=1)
+        self.assertEqual(square.size, (24, 24))
+        self.assertEqual(square.getpixel((12, 12)), 255)
+        self.assertEqual(square.getpixel((2, 2)), 0)
+        self.assertEqual((square.getpixel((4, 4)), square.getpixel((19, 19))), (255, 255))
+        self.assertEqual((square.getpixel((3, 12)), square.getpixel((21, 21))), (0, 0))
+
+        # Even-odd: o subpath interno abre um furo
+        frame = render_svg(self.FRAME, 24, supersample=1)
+        self.assertEqual(frame.getpixel((5, 5)), 255)
+        self.assertEqual(frame.getpixel((12, 12)), 0)
+
+        circle = render_svg(self.CIRCLE, 48)
+        self.assertEqual(circle.getpixel((24, 24)), 255)
+        # r = 8 de 24 → 16px de 48px: topo em y = 8, canto do quadrado circunscrito vazio
+        self.assertEqual(circle.getpixel((24, 10)), 255)
+        self.assertEqual(circle.getpixel((24, 6)), 0)
+        self.assertEqual(circle.getpixel((9, 9)), 0)
+
+    def test_compare_ranks_icon_itself_first(self):
+        from PIL import Image
+
+        from .material_icons_atlas import IconAtlas, build_atlas
+        from .svg_raster import render_svg
+
+        output = self.temp_dir / 'atlas'
+        result = build_atlas(
+            self.icons_db(square=self.SQUARE, frame=self.FRAME, circle=self.CIRCLE, triangle=self.TRIANGLE),
+            output_dir=output, sizes=(24,), max_workers=1,
+        )
+        self.assertEqual((result['icons'], result['missing'], result['failed']), (4, 0, []))
+
+        atlas = IconAtlas(output, 24)
+        for name, svg in [('circle', self.CIRCLE), ('triangle', self.TRIANGLE), ('frame', self.FRAME)]:
+            # Ícone do aluno: preto sobre fundo transparente, em outro tamanho
+            img = Image.new('RGBA', (96, 96), (0, 0, 0, 0))
+            img.putalpha(render_svg(svg, 96))
+            for metric in ('ncc', 'ssim'):
+                best = atlas.compare(img, metric=metric, top_k=2)
+                self.assertEqual(best[0][1:], ('test', name, 'filled'), metric)
+                self.assertGreater(best[0][0], best[1][0])
+        self.assertEqual(sorted(path.name for path in output.iterdir() if path.suffix == '.tmp'), [])
+
+    def test_get_atlas_uses_sizes_of_last_build(self):
+        from . import material_icons_atlas
+        from .material_icons_atlas import build_atlas, get_atlas
+
+        output = self.temp_dir / 'atlas'
+        self.addCleanup(material_icons_atlas._loaded_atlases.clear)
+        build_atlas(
+            self.icons_db(square=self.SQUARE, frame=self.FRAME, circle=self.CIRCLE, triangle=self.TRIANGLE),
+            output_dir=output, sizes=(24, 48), max_workers=1,
+        )
+        self.assertEqual((get_atlas(directory=output).size, len(get_atlas(directory=output))), (48, 4))
+        stale = self.temp_dir / 'atlas_48_antigo.npy'
+        shutil.copy(output / 'atlas_48.npy', stale)
+
+        # Novo build só em 24px com menos ícones: os arquivos de 48px saem de cena
+        build_atlas(self.icons_db(circle=self.CIRCLE), output_dir=output, sizes=(24,), max_workers=1)
+        self.assertFalse((output / 'atlas_48.npy').exists())
+        self.assertFalse((output / 'stats_48.npy').exists())
+        self.assertEqual((get_atlas(directory=output).size, len(get_atlas(directory=output))), (24, 1))
+
+        # Mesmo com um atlas de 48px antigo no diretório, vale o index.json
+        material_icons_atlas._loaded_atlases.clear()
+        shutil.copy(stale, output / 'atlas_48.npy')
+        self.assertEqual(get_atlas(directory=output).size, 24)
+
+    def test_empty_or_failed_build_leaves_no_temp_files(self):
+        from . import material_icons_atlas
+        from .material_icons_atlas import EmptyAtlasError, build_atlas
+
+        output = self.temp_dir / 'atlas'
+        with self.assertRaises(EmptyAtlasError):
+            build_atlas({'test': {'home': {'filled': {'path': str(self.temp_dir / 'nao_existe.svg')}}}}, output)
+        self.assertEqual(list(output.iterdir()), [])
+
+        with mock.patch.object(material_icons_atlas, '_rasterize_chunk', side_effect=MemoryError):
+            with self.assertRaises(MemoryError):
+                build_atlas(self.icons_db(square=self.SQUARE), output, sizes=(24, 48), max_workers=1)
+        self.assertEqual(list(output.iterdir()), [])
+
+        with mock.patch('analyzer.utils.ensure_material_icons_loaded', return_value=True), \
+                mock.patch('analyzer.utils.MATERIAL_ICONS_DB', {'test': {'home': {'filled': {'path': ''}}}}), \
+                mock.patch.object(material_icons_atlas, 'ATLAS_DIR', output):
+            with self.assertRaisesMessage(CommandError, 'Nenhum SVG encontrado'):
+                call_command('build_material_icons_atlas', stdout=StringIO())
+
+
+class MaterialIconsSearchTests(TestCase):
+    """Busca por prefixo, aproximada e com filtro de estilo nos ícones Material Design"""
+
+    ICONS = {
+        'action': {
+            'home': {'filled': {}, 'outlined': {}},
+            'settings': {'filled': {}, 'round': {}},
+            'account_circle': {'filled': {}, 'outlined': {}},
+        },
+        'device': {
+            'wifi_off': {'filled': {}},
+            'signal_wifi_off': {'filled': {}, 'sharp': {}},
+        },
+        'navigation': {
+            'arrow_back': {'filled': {}, 'outlined': {}},
+            'home_work': {'outlined': {}},
+        },
+    }
+
+    def setUp(self):
+        from .material_icons_search import MaterialIconsSearchIndex
+        self.index = MaterialIconsSearchIndex(self.ICONS)
+        patcher = mock.patch('analyzer.views.get_search_index', return_value=self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def names(self, query, **filters):
+        return [icon['name'] for icon in self.index.search(query, **filters)]
+
+    def test_ranking_prefix_fuzzy_and_filters(self):
+        self.assertEqual(self.names('home'), ['home', 'home_work'])
+        self.assertEqual(self.names('sett'), ['settings'])
+        self.assertEqual(self.names('settngs'), ['settings'])
+        self.assertEqual(self.names('acount circle'), ['account_circle'])
+        self.assertEqual(self.names('wifi off'), ['wifi_off', 'signal_wifi_off'])
+        self.assertEqual(self.names('home', style='filled'), ['home'])
+        self.assertEqual(self.names('off', category='device', style='sharp'), ['signal_wifi_off'])
+        self.assertEqual(self.names('navigation'), ['home_work', 'arrow_back'])
+        self.assertEqual(self.names('zzzz'), [])
+
+    def test_api_pagination_and_conditional_get(self):
+        url = reverse('api_material_icons_search')
+        response = self.client.get(url, {'q': 'o', 'page_size': 1})
+        data = response.json()
+        self.assertEqual(len(data['icons']), 1)
+        self.assertTrue(data['has_next'])
+        self.assertIn('max-age=3600', response['Cache-Control'])
+
+        second = self.client.get(url, {'q': 'o', 'page_size': 1, 'page': 2}).json()
+        self.assertFalse({i['name'] for i in second['icons']} & {i['name'] for i in data['icons']})
+
+        cached = self.client.get(url, {'q': 'o', 'page_size': 1}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertIn('public', cached['Cache-Control'])
+        self.assertEqual(self.client.get(url).json(), {'icons': []})
+
+    def test_unavailable_index_is_not_cached(self):
+        with mock.patch('analyzer.views.get_search_index', return_value=None):
+            response = self.client.get(reverse('api_material_icons_search'), {'q': 'home'})
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('no-store', response['Cache-Control'])
+        self.assertNotIn('public', response['Cache-Control'])
+
+    def test_long_queries_are_rejected_or_skip_fuzzy(self):
+        from .material_icons_search import MAX_QUERY_LENGTH, MAX_TERM_LENGTH, _deletions
+
+        url = reverse('api_material_icons_search')
+        rejected = self.client.get(url, {'q': 'a' * (MAX_QUERY_LENGTH + 1)})
+        self.assertEqual(rejected.status_code, 400)
+        self.assertIn('no-store', rejected['Cache-Control'])
+        self.assertEqual(self.client.get(url, {'q': 'b' * (MAX_TERM_LENGTH + 1)}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'q': 'home ' * 10}).status_code, 200)
+
+        # Termo maior que qualquer token + distância: nenhuma deleção é gerada
+        with mock.patch('analyzer.material_icons_search._deletions', wraps=_deletions) as deletions:
+            self.assertEqual(self.names('x' * MAX_TERM_LENGTH), [])
+            self.assertEqual(self.names('settingsx'), ['settings'])
+        self.assertEqual(deletions.call_count, 1)
+
+
+class ReportCacheTests(TestCase):
+    """Relatórios renderizados em cache, invalidados pela reanálise"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_print_report_is_cached_until_reevaluation(self):
+        from .utils import generate_usability_evaluation
+
+        aia_file = create_analyzed_file(6)
+        url = reverse('print_analysis', args=[aia_file.pk])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertContains(response, 'Teste')
+        self.assertFalse(any('COUNT(' in query['sql'].upper() for query in context.captured_queries))
+
+        evaluation = aia_file.evaluation
+        previous_version = evaluation.evaluated_at
+        generate_usability_evaluation(aia_file)
+        evaluation.refresh_from_db()
+        self.assertGreater(evaluation.evaluated_at, previous_version)
+
+        response = self.client.get(url)
+        self.assertNotContains(response, '<li>Teste</li>')
+        self.assertContains(response, 'Contexto Detectado')
+
+    def test_reanalysis_without_images_updates_evaluation(self):
+        from django.core.cache import cache
+
+        from .report_cache import report_cache_key
+        from .utils import generate_usability_evaluation
+
+        aia_file = create_analyzed_file(3)
+        evaluation = aia_file.evaluation
+        UsabilityEvaluation.objects.filter(pk=evaluation.pk).update(overall_usability_score=40)
+        evaluation.refresh_from_db()
+        previous_version = evaluation.evaluated_at
+        url = reverse('print_analysis', args=[aia_file.pk])
+        self.assertContains(self.client.get(url), 'Teste')
+        self.assertIsNotNone(cache.get(report_cache_key(evaluation, 'print')))
+
+        # O projeto perdeu todas as imagens: a avaliação existente é atualizada
+        aia_file.images.all().delete()
+        generate_usability_evaluation(aia_file)
+        self.assertIsNone(cache.get(report_cache_key(evaluation, 'print')))
+
+        evaluation.refresh_from_db()
+        self.assertEqual(UsabilityEvaluation.objects.filter(aia_file=aia_file).count(), 1)
+        self.assertGreater(evaluation.evaluated_at, previous_version)
+        self.assertEqual(evaluation.overall_usability_score, 100)
+        self.assertIn('Projeto sem assets visuais', evaluation.recommendations)
+        self.assertContains(self.client.get(url), 'Projeto sem assets visuais')
+
+    def test_results_recommendations_are_escaped_and_cached(self):
+        aia_file = create_analyzed_file(2)
+        UsabilityEvaluation.objects.filter(aia_file=aia_file).update(recommendations='<b>atenção</b>')
+        response = self.client.get(reverse('analysis_results', args=[aia_file.pk]))
+        self.assertContains(response, '&lt;b&gt;atenção&lt;/b&gt;')
+
+
+class MarkdownRendererTests(TestCase):
+    """markdown_to_html em passe único produz exatamente o HTML da versão em vários passes"""
+
+    GOLDEN_DIR = Path(__file__).resolve().parent / 'testdata' / 'reports'
+
+    def test_golden_reports(self):
+        from .templatetags.report_filters import markdown_to_html
+
+        sources = sorted(self.GOLDEN_DIR.glob('*.txt'))
+        self.assertTrue(sources)
+        for source in sources:
+            with self.subTest(report=source.name):
+                text = source.read_text(encoding='utf-8')
+                expected = source.with_suffix('.html').read_text(encoding='utf-8')
+                self.assertEqual(str(markdown_to_html(text)), expected)
+
+    def test_matches_multipass_on_edge_cases(self):
+        from .templatetags.report_filters import _markdown_to_html_multipass, markdown_to_html
+
+        cases = [
+            '# Título\n## Seção **forte**\n#### Sub\n##### não é título',
+            '📊 **Resumo** resto **b**\n⚠️ **Aviso**\n⚠ **Aviso**\n🚨  **x***',
+            '• item\n- **item**\n-sem espaço\n  - recuado\ntexto\n• outro',
+            '═════\n─────\n═ x\n---',
+            'a\n\n\nb\n\n\n\n\n• c\n\n\n',
+            '• lista\n\n\n\nfim\n\n',
+            '\n\n\n',
+            '#\nlinha seguinte\n-\n• \n📊\n**negrito**',
+            '<p></p>\n<br>\n<br>\n<br>\n<li>cru</li>\n<hr>\n<h2>cru</h2>',
+            'linha\r\n# título\r\n- item\r\n',
+        ]
+        for text in cases:
+            with self.subTest(text=text):
+                self.assertEqual(str(markdown_to_html(text)), str(_markdown_to_html_multipass(text)))
+
+    def test_matches_multipass_on_generated_report(self):
+        from .templatetags.report_filters import _markdown_to_html_multipass, markdown_to_html
+        from .utils import generate_usability_evaluation
+
+        aia_file = create_analyzed_file(6)
+        generate_usability_evaluation(aia_file)
+        text = UsabilityEvaluation.objects.get(aia_file=aia_file).recommendations
+        self.assertEqual(str(markdown_to_html(text)), str(_markdown_to_html_multipass(text)))
+
+
+class StructuredReportTests(TestCase):
+    """Seções e problemas da avaliação gravados em tabelas próprias"""
+
+    def test_evaluation_writes_sections_and_findings(self):
+        from .utils import generate_usability_evaluation
+
+        aia_file = create_analyzed_file(6)
+        layout_analysis = {
+            'screens_analyzed': 1,
+            'layout_issues': ['Screen Screen1: Falta de margens adequadas nas laterais'],
+            'contrast_issues': ["🔴 **Contraste insuficiente:** Componente 'Label1'"],
+            'has_margin_issues': True,
+            'has_contrast_issues': True,
+        }
+        generate_usability_evaluation(aia_file, layout_analysis=layout_analysis)
+        evaluation = UsabilityEvaluation.objects.get(aia_file=aia_file)
+
+        keys = list(evaluation.sections.values_list('key', flat=True))
+        self.assertEqual(keys[-1], 'recommendations')
+        self.assertIn('academic', keys)
+        self.assertIn('layout', keys)
+
+        from .report_structure import get_report_sections
+        self.assertEqual(
+            get_report_sections(evaluation, ['recommendations']),
+            {'recommendations': evaluation.recommendations.strip()},
+        )
+
+        images = list(aia_file.images.all())
+        self.assertEqual(
+            evaluation.findings.filter(category='resolution').count(),
+            sum(1 for i in images if i.width < 100 and i.height < 100),
+        )
+        layout = evaluation.findings.get(category='layout')
+        self.assertEqual(layout.screen, 'Screen1')
+        self.assertEqual(evaluation.findings.filter(category='contrast', severity='high').count(), 1)
+
+        # Reanálise substitui (não acumula) as linhas
+        total = evaluation.findings.count()
+        generate_usability_evaluation(aia_file, layout_analysis=layout_analysis)
+        self.assertEqual(evaluation.findings.count(), total)
+        self.assertEqual(evaluation.sections.count(), len(keys))
+
+    def test_api_findings_filters_across_projects(self):
+        from .utils import generate_usability_evaluation
+
+        layout_analysis = {'screens_analyzed': 1, 'contrast_issues': ['Contraste insuficiente']}
+        for _ in range(2):
+            generate_usability_evaluation(create_analyzed_file(2), layout_analysis=layout_analysis)
+
+        response = self.client.get(reverse('api_findings'), {'category': 'contrast', 'since': '2000-01-01'})
+        data = response.json()['findings']
+        self.assertEqual(len(data), 2)
+        self.assertEqual({item['category'] for item in data}, {'contrast'})
+        self.assertEqual(len({item['project']['id'] for item in data}), 2)
+
+        response = self.client.get(reverse('api_findings'), {'category': 'contrast', 'until': '2000-01-01'})
+        self.assertEqual(response.json()['findings'], [])
+        self.assertEqual(self.client.get(reverse('api_findings'), {'since': 'ontem'}).status_code, 400)
+
+    def test_build_structured_reports_command(self):
+        aia_file = create_analyzed_file(3)
+        call_command('build_structured_reports', stdout=StringIO())
+        evaluation = aia_file.evaluation
+        # Só a lista de ações, recalculada (não o texto completo salvo na avaliação)
+        content = evaluation.sections.get(key='recommendations').content
+        self.assertNotEqual(content, evaluation.recommendations)
+        self.assertIn('Contexto Detectado', content)
+
+    def test_report_pages_read_only_their_sections(self):
+        from .utils import generate_usability_evaluation
+
+        aia_file = create_analyzed_file(4)
+        layout_analysis = {'screens_analyzed': 1, 'layout_issues': ['Screen Screen1: Falta de margens adequadas']}
+        generate_usability_evaluation(aia_file, layout_analysis=layout_analysis)
+        evaluation = aia_file.evaluation
+        sections = dict(evaluation.sections.values_list('key', 'content'))
+        # A seção de recomendações não repete as outras seções
+        self.assertNotIn(sections['layout'], sections['recommendations'])
+        self.assertNotIn(sections['images'], sections['recommendations'])
+
+        blob_column = '"analyzer_usabilityevaluation"."recommendations"'
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('analysis_results', args=[aia_file.pk]))
+        self.assertFalse(any(blob_column in query['sql'] for query in context.captured_queries))
+        self.assertEqual(
+            [section['key'] for section in response.context['report_sections']], ['layout', 'recommendations'],
+        )
+        self.assertContains(response, 'Falta de margens adequadas')
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('print_analysis', args=[aia_file.pk]))
+        self.assertFalse(any(blob_column in query['sql'] for query in context.captured_queries))
+        self.assertEqual(
+            [section['key'] for section in response.context['report_sections']], list(sections),
+        )
+
+
+class AnalysisBenchmarkTests(TestCase):
+    """Benchmark de ponta a ponta com baseline em JSON"""
+
+    def setUp(self):
+        self.workdir = Path(tempfile.mkdtemp())
+        self.corpus = self.workdir / 'corpus'
+        self.corpus.mkdir()
+        shutil.copy(Path(settings.BASE_DIR) / 'media' / 'aia_files' / 'presidentsQuiz_1.aia', self.corpus)
+        self.baseline = self.workdir / 'baseline.json'
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def run_benchmark(self, **options):
+        call_command(
+            'benchmark_analysis', corpus=str(self.corpus), baseline=str(self.baseline),
+            use_current_db=True, stdout=StringIO(), **options
+        )
+
+    def test_baseline_round_trip_and_query_regression(self):
+        import json
+
+        self.run_benchmark(save_baseline=True)
+        result = json.loads(self.baseline.read_text(encoding='utf-8'))
+        stages = result['projects']['presidentsQuiz_1.aia']['stages']
+        self.assertEqual(set(stages), {'extraction', 'layout', 'images', 'memory', 'icon_consistency', 'report', 'total'})
+        self.assertGreater(stages['images']['queries'], 0)
+        self.assertGreater(stages['total']['wall_ms'], 0)
+        # Os dados da análise são desfeitos ao final
+        self.assertFalse(AiaFile.objects.exists())
+
+        self.run_benchmark(max_regression=1000)
+
+        stages['report']['queries'] -= 1
+        self.baseline.write_text(json.dumps(result), encoding='utf-8')
+        with self.assertRaises(CommandError):
+            self.run_benchmark(max_regression=1000)
+
+    def test_committed_baseline_has_no_query_regression(self):
+        from .management.commands.benchmark_analysis import DEFAULT_BASELINE
+
+        # Consultas SQL são determinísticas: a baseline do repositório vale em qualquer máquina
+        # (o tempo depende da máquina e fica para a execução manual, ver README)
+        self.assertTrue(DEFAULT_BASELINE.exists())
+        call_command(
+            'benchmark_analysis', corpus=str(self.corpus), baseline=str(DEFAULT_BASELINE),
+            use_current_db=True, max_regression=1000, stdout=StringIO(),
+        )
+
+    def test_compare_ignores_small_time_differences(self):
+        from .management.commands.benchmark_analysis import compare_results
+
+        def result(wall_ms):
+            return {'totals': {'total': {'wall_ms': wall_ms, 'cpu_ms': wall_ms, 'queries': 10}}, 'projects': {}}
+
+        self.assertEqual(compare_results(result(30), result(10)), [])
+        self.assertEqual(len(compare_results(result(500), result(100))), 2)
+
+
+class AnalysisTimingTests(TestCase):
+    """Tempo por etapa registrado em AnalysisRun e exibido em file_detail"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def analyze(self, filename='presidentsQuiz_1.aia'):
+        from .batch import create_aia_files
+        from .utils import analyze_aia_file
+
+        path = Path(settings.BASE_DIR) / 'media' / 'aia_files' / filename
+        aia_file = create_aia_files([(path.name, path.read_bytes())])[0]
+        return aia_file, analyze_aia_file(aia_file)
+
+    def test_analysis_run_records_stage_timings(self):
+        aia_file, run = self.analyze()
+        self.assertEqual(run.status, 'ok')
+        self.assertGreater(run.duration_ms, 0)
+        for path in ('extraction', 'layout', 'layout/scm_parse', 'images', 'images/decode_hash', 'report'):
+            self.assertIn(path, run.timings)
+        self.assertEqual(run.timings['images']['count'], aia_file.total_images)
+
+        response = self.client.get(reverse('file_detail', args=[aia_file.pk]))
+        self.assertContains(response, 'Tempo da Última Análise')
+        self.assertContains(response, 'decode_hash')
+
+    @override_settings(ANALYSIS_TIMING_ENABLED=False)
+    def test_timing_disabled(self):
+        from .timing import current_trace, span
+
+        self.assertIsNone(current_trace())
+        with span('sem_trace') as null_span:
+            self.assertIs(span('outro'), null_span)
+
+        aia_file, run = self.analyze()
+        self.assertEqual(run.timings, {})
+        self.assertEqual(run.status, 'ok')
+        self.assertContains(self.client.get(reverse('file_detail', args=[aia_file.pk])), 'desabilitada')
+
+    def test_nested_spans_and_rows(self):
+        from .timing import record_trace, span, timed, timing_rows
+
+        @timed('child')
+        def child():
+            with span('leaf'):
+                pass
+
+        with record_trace(enabled=True) as trace:
+            with span('parent'):
+                child()
+                child()
+            with span('other'):
+                pass
+
+        timings = trace.as_dict()
+        self.assertEqual(timings['parent/child']['count'], 2)
+        self.assertEqual(timings['parent/child/leaf']['count'], 2)
+        rows = timing_rows(timings)
+        self.assertEqual([row['path'] for row in rows], ['parent', 'parent/child', 'parent/child/leaf', 'other'])
+        self.assertEqual([row['depth'] for row in rows], [0, 1, 2, 0])
+
+
+class MetricsTests(TestCase):
+    """Registro de métricas e endpoint /metrics (formato texto do Prometheus)"""
+
+    def setUp(self):
+        from .metrics import reset_metrics
+
+        self.metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.metrics_dir, ignore_errors=True)
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+
+    def test_histogram_and_counter_text_format(self):
+        from .metrics import GEMINI_ERRORS, GEMINI_REQUEST_DURATION, render_metrics
+
+        GEMINI_REQUEST_DURATION.observe(0.3, call='context')
+        GEMINI_REQUEST_DURATION.observe(3, call='context')
+        GEMINI_ERRORS.inc(call='image')
+        text = render_metrics()
+
+        self.assertIn('# TYPE aia_gemini_request_seconds histogram', text)
+        self.assertIn('aia_gemini_request_seconds_bucket{call="context",le="0.25"} 0.0', text)
+        self.assertIn('aia_gemini_request_seconds_bucket{call="context",le="0.5"} 1.0', text)
+        self.assertIn('aia_gemini_request_seconds_bucket{call="context",le="+Inf"} 2.0', text)
+        self.assertIn('aia_gemini_request_seconds_sum{call="context"} 3.3', text)
+        self.assertIn('aia_gemini_request_seconds_count{call="context"} 2.0', text)
+        self.assertIn('aia_gemini_errors_total{call="image"} 1.0', text)
+        with self.assertRaises(ValueError):
+            GEMINI_ERRORS.inc(model='x')
+
+    def test_multiprocess_values_are_summed(self):
+        import multiprocessing
+
+        from .metrics import BATCH_QUEUE_DEPTH, HTTP_REQUESTS, render_metrics
+
+        def worker():
+            HTTP_REQUESTS.inc(2, view='dashboard', method='GET', status=200)
+            BATCH_QUEUE_DEPTH.inc(5)
+
+        with override_settings(METRICS_MULTIPROC_DIR=self.metrics_dir):
+            HTTP_REQUESTS.inc(view='dashboard', method='GET', status=200)
+            BATCH_QUEUE_DEPTH.inc(1)
+            process = multiprocessing.get_context('fork').Process(target=worker)
+            process.start()
+            process.join()
+            text = render_metrics()
+
+        self.assertEqual(len(list(Path(self.metrics_dir).glob('metrics_*.db'))), 2)
+        self.assertIn('aia_http_requests_total{view="dashboard",method="GET",status="200"} 3.0', text)
+        # Gauge: o processo filho já terminou, só conta o valor do processo atual
+        self.assertIn('aia_batch_queue_depth 1.0', text)
+
+    def test_analysis_and_views_are_recorded(self):
+        from .batch import create_aia_files
+        from .utils import analyze_aia_file
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        path = Path(settings.BASE_DIR) / 'media' / 'aia_files' / 'presidentsQuiz_1.aia'
+        with override_settings(MEDIA_ROOT=media_root):
+            aia_file = create_aia_files([(path.name, path.read_bytes())])[0]
+            analyze_aia_file(aia_file)
+            self.client.get(reverse('analysis_results', args=[aia_file.pk]))
+            self.client.get(reverse('analysis_results', args=[aia_file.pk]))
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertIn('aia_analysis_duration_seconds_count{status="ok"} 1.0', text)
+        aia_file.refresh_from_db()
+        self.assertIn(f'aia_project_assets_sum {aia_file.total_images}.0', text)
+        self.assertIn('aia_analysis_stage_seconds_count{stage="images"} 1.0', text)
+        self.assertIn('aia_report_cache_requests_total{part="results",result="hit"} 1.0', text)
+        self.assertIn('aia_http_requests_total{view="analysis_results",method="GET",status="200"} 2.0', text)
+        self.assertIn('aia_analyses_in_progress 0.0', text)
+
+    @override_settings(METRICS_TOKEN='segredo')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer segredo')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_metrics_disabled(self):
+        from .metrics import HTTP_REQUESTS
+
+        HTTP_REQUESTS.inc(view='dashboard', method='GET', status=200)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+
+class LoggingTests(TestCase):
+    """Logs da análise: limite de erros repetidos, JSON e id da análise"""
+
+    def make_record(self, created, msg='Erro ao processar a imagem %s: %s', lineno=10):
+        import logging
+
+        record = logging.LogRecord('analyzer.utils', logging.WARNING, 'utils.py', lineno, msg, ('a.png', 'x'), None)
+        record.created = created
+        return record
+
+    def test_rate_limit_suppresses_repeated_errors(self):
+        from .logs import RateLimitFilter
+
+        rate_limit = RateLimitFilter(window=60, burst=2)
+        passed = [rate_limit.filter(self.make_record(1000 + i)) for i in range(5)]
+        self.assertEqual(passed, [True, True, False, False, False])
+        # Outro ponto do código não é afetado
+        self.assertTrue(rate_limit.filter(self.make_record(1001, lineno=20)))
+
+        record = self.make_record(1061)
+        self.assertTrue(rate_limit.filter(record))
+        self.assertIn('+3 mensagem(ns) repetida(s) suprimida(s)', record.getMessage())
+        self.assertTrue(record.getMessage().startswith('Erro ao processar a imagem a.png: x'))
+
+    def test_json_formatter_includes_analysis_context(self):
+        import json
+
+        from .logs import AnalysisContextFilter, JsonFormatter, analysis_log_context
+
+        context_filter = AnalysisContextFilter()
+        with analysis_log_context(12, 34):
+            record = self.make_record(1000)
+            context_filter.filter(record)
+        data = json.loads(JsonFormatter().format(record))
+        self.assertEqual(data['message'], 'Erro ao processar a imagem a.png: x')
+        self.assertEqual((data['analysis_id'], data['aia_file_id']), (12, 34))
+        self.assertEqual(data['level'], 'WARNING')
+
+        record = self.make_record(1000)
+        context_filter.filter(record)
+        self.assertNotIn('analysis_id', json.loads(JsonFormatter().format(record)))
+        self.assertEqual(record.analysis_tag, '')
+
+    def test_analysis_errors_are_logged_with_run_id(self):
+        import logging
+
+        from . import utils
+        from .batch import create_aia_files
+        from .logs import AnalysisContextFilter
+
+        class Capture(logging.Handler):
+            def __init__(self):
+                super().__init__()
+                self.records = []
+
+            def emit(self, record):
+                self.records.append(record)
+
+        capture = Capture()
+        capture.addFilter(AnalysisContextFilter())
+        logger = logging.getLogger('analyzer')
+        logger.addHandler(capture)
+        self.addCleanup(logger.removeHandler, capture)
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        path = Path(settings.BASE_DIR) / 'media' / 'aia_files' / 'presidentsQuiz_1.aia'
+        with override_settings(MEDIA_ROOT=media_root), \
+                mock.patch.object(utils, 'set_perceptual_hash', side_effect=ValueError('falha simulada')):
+            aia_file = create_aia_files([(path.name, path.read_bytes())])[0]
+            run = utils.analyze_aia_file(aia_file)
+
+        errors = [r for r in capture.records if 'falha simulada' in r.getMessage()]
+        self.assertTrue(errors)
+        self.assertEqual({(r.analysis_id, r.aia_file_id) for r in errors}, {(run.pk, aia_file.pk)})
+
+
+class AnalysisProfilingTests(TestCase):
+    """Perfil opcional de CPU/memória (cProfile + tracemalloc) baixado pelo admin"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.profile_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.profile_root, ignore_errors=True)
+        self.override = override_settings(MEDIA_ROOT=self.media_root, ANALYSIS_PROFILE_ROOT=self.profile_root)
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+
+        from .batch import create_aia_files
+
+        path = Path(settings.BASE_DIR) / 'media' / 'aia_files' / 'presidentsQuiz_1.aia'
+        self.aia_file = create_aia_files([(path.name, path.read_bytes())])[0]
+
+    def login(self, is_staff):
+        from django.contrib.auth.models import User
+
+        user = User.objects.create_user('usuario', password='senha', is_staff=is_staff, is_superuser=is_staff)
+        self.client.force_login(user)
+
+    def test_staff_profile_is_saved_and_downloadable(self):
+        import pstats
+
+        self.login(is_staff=True)
+        self.client.post(reverse('analyze_file', args=[self.aia_file.pk]) + '?profile=1')
+
+        run = self.aia_file.analysis_runs.get()
+        self.assertEqual(run.status, 'ok')
+        self.assertTrue(run.profile_stats.name.startswith(f'{self.aia_file.pk}/run_{run.pk}'))
+        self.assertTrue(run.profile_stats.path.startswith(self.profile_root))
+        stats = pstats.Stats(run.profile_stats.path)
+        self.assertTrue(any(name == '_analyze_aia_file' for _, _, name in stats.stats))
+        report = Path(run.memory_report.path).read_text(encoding='utf-8')
+        self.assertIn('Pico de memória rastreada', report)
+        self.assertIn('Top 40 alocações por linha', report)
+
+        response = self.client.get(reverse('admin:analyzer_analysisrun_change', args=[run.pk]))
+        self.assertContains(response, 'Baixar .pstats')
+        response = self.client.get(reverse('admin:analyzer_analysisrun_profile', args=[run.pk, 'pstats']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), Path(run.profile_stats.path).read_bytes())
+        response = self.client.get(reverse('admin:analyzer_analysisrun_profile', args=[run.pk, 'outro']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_profile_parameter_requires_staff(self):
+        self.login(is_staff=False)
+        self.client.post(reverse('analyze_file', args=[self.aia_file.pk]) + '?profile=1')
+        run = self.aia_file.analysis_runs.get()
+        self.assertEqual(run.status, 'ok')
+        self.assertFalse(run.profile_stats)
+        self.assertEqual(list(Path(self.profile_root).iterdir()), [])
+
+    def test_settings_flag_keeps_only_slow_analyses(self):
+        from .utils import analyze_aia_file
+
+        with override_settings(ANALYSIS_PROFILING=True, ANALYSIS_PROFILE_MIN_MS=10 ** 9):
+            self.assertFalse(analyze_aia_file(self.aia_file).profile_stats)
+        with override_settings(ANALYSIS_PROFILING=True, ANALYSIS_PROFILE_MIN_MS=0):
+            self.assertTrue(analyze_aia_file(self.aia_file).profile_stats)
+
+    def test_overlapping_profiles_and_profiler_errors_do_not_break_analysis(self):
+        import tracemalloc
+
+        from .metrics import ANALYSES_IN_PROGRESS
+        from .profiling import AnalysisProfiler
+        from .utils import analyze_aia_file
+
+        first, second = AnalysisProfiler(), AnalysisProfiler()
+        self.assertTrue(first.start())
+        self.assertFalse(second.start())
+        # Análise concorrente com perfil pedido roda sem perfil
+        run = analyze_aia_file(self.aia_file, profile=True)
+        self.assertEqual(run.status, 'ok')
+        self.assertFalse(run.profile_stats)
+        second.stop()
+        self.assertTrue(tracemalloc.is_tracing())
+        first.stop()
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreater(first.peak_bytes, 0)
+
+        with mock.patch('analyzer.profiling.tracemalloc.take_snapshot', side_effect=RuntimeError('falhou')), \
+                mock.patch.object(ANALYSES_IN_PROGRESS, 'dec', wraps=ANALYSES_IN_PROGRESS.dec) as dec:
+            run = analyze_aia_file(self.aia_file, profile=True)
+        run.refresh_from_db()
+        self.assertEqual(run.status, 'ok')
+        self.assertIsNotNone(run.duration_ms)
+        self.assertFalse(run.profile_stats)
+        dec.assert_called_once()
+        self.assertFalse(tracemalloc.is_tracing())
+        # O lock foi liberado: a próxima análise volta a ser perfilada
+        profiler = AnalysisProfiler()
+        self.assertTrue(profiler.start())
+        profiler.stop()
+
+
+class ImageProbeTests(TestCase):
+    """Formato e dimensões lidos do cabeçalho, iguais aos do PIL"""
+
+    def corpus_images(self):
+        for path in sorted((Path(settings.BASE_DIR) / 'media' / 'aia_files').glob('*.aia')):
+            with zipfile.ZipFile(path) as archive:
+                for name in archive.namelist():
+                    if name.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp')):
+                        yield name, archive.read(name)
+
+    def test_probe_matches_pil(self):
+        from PIL import Image
+
+        from .image_probe import probe_image
+
+        samples = list(self.corpus_images())
+        for fmt, mode, options in [
+            ('PNG', 'RGBA', {}), ('JPEG', 'RGB', {'progressive': True, 'icc_profile': b'x' * 70000}),
+            ('GIF', 'P', {}), ('BMP', 'RGB', {}), ('WEBP', 'RGB', {}), ('WEBP', 'RGBA', {'lossless': True}),
+        ]:
+            buffer = io.BytesIO()
+            Image.new(mode, (123, 45)).save(buffer, fmt, **options)
+            samples.append((f'sintetica.{fmt}', buffer.getvalue()))
+
+        self.assertGreater(len(samples), 100)
+        for name, data in samples:
+            with Image.open(io.BytesIO(data)) as img:
+                expected = (img.format, img.size)
+            info = probe_image(data)
+            self.assertIsNotNone(info, name)
+            self.assertEqual((info.format, info.size), expected, name)
+
+    def test_unknown_or_truncated_headers(self):
+        from .image_probe import probe_image
+
+        self.assertIsNone(probe_image(b'nao e imagem'))
+        self.assertIsNone(probe_image(b'\x89PNG\r\n\x1a\n\x00\x00'))
+        self.assertIsNone(probe_image(b'\xff\xd8\xff\xe0\x00\x10JFIF'))
+        self.assertIsNone(probe_image(b''))
+
+    def test_analysis_decodes_each_image_once(self):
+        from . import utils
+        from .batch import create_aia_files
+        from .image_loading import thumbnail_cache
+
+        thumbnail_cache.clear()
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        path = Path(settings.BASE_DIR) / 'media' / 'aia_files' / 'presidentsQuiz_1.aia'
+        with override_settings(MEDIA_ROOT=media_root), \
+                mock.patch.object(utils.Image, 'open', wraps=utils.Image.open) as image_open:
+            aia_file = create_aia_files([(path.name, path.read_bytes())])[0]
+            utils.analyze_aia_file(aia_file)
+            asset = aia_file.images.first()
+            self.assertEqual(asset.file_size, asset.extracted_file.size)
+
+        # Uma abertura por imagem (hash perceptual); metadados e busca de ícones não decodificam
+        self.assertEqual(image_open.call_count, aia_file.total_images)
+
+
+class ReducedImageLoadingTests(TestCase):
+    """Versões reduzidas das imagens para as análises de pixels, com cache por conteúdo"""
+
+    def setUp(self):
+        from .image_loading import thumbnail_cache
+
+        thumbnail_cache.clear()
+        self.addCleanup(thumbnail_cache.clear)
+
+    def encode(self, img, fmt, **options):
+        buffer = io.BytesIO()
+        img.save(buffer, fmt, **options)
+        return buffer.getvalue()
+
+    def test_large_jpeg_uses_draft(self):
+        from PIL import Image, JpegImagePlugin
+
+        from .image_loading import load_reduced
+
+        data = self.encode(Image.new('RGB', (2000, 1500), (200, 30, 30)), 'JPEG')
+        jpeg_draft = JpegImagePlugin.JpegImageFile.draft
+        with mock.patch.object(JpegImagePlugin.JpegImageFile, 'draft', autospec=True, side_effect=jpeg_draft) as draft:
+            img = load_reduced(data, 128)
+        self.assertTrue(draft.called)
+        self.assertEqual(img.size, (128, 96))
+        self.assertEqual(img.mode, 'RGB')
+
+    def test_palette_transparency_and_small_images(self):
+        from PIL import Image
+
+        from .image_loading import load_reduced
+
+        palette = Image.new('P', (300, 300), 0)
+        data = self.encode(palette, 'PNG', transparency=0)
+        self.assertEqual(load_reduced(data, 128).mode, 'RGBA')
+        self.assertEqual(load_reduced(data, 128).size, (128, 128))
+
+        small = self.encode(Image.new('L', (20, 10)), 'PNG')
+        self.assertEqual(load_reduced(small, 128).size, (20, 10))  # nunca amplia
+
+    def test_cache_is_keyed_by_content(self):
+        from PIL import Image
+
+        from .image_loading import load_reduced, thumbnail_cache
+
+        data = self.encode(Image.new('RGB', (500, 500), (0, 0, 255)), 'PNG')
+        first = load_reduced(data, 128)
+        self.assertIs(load_reduced(bytes(data), 128), first)
+        self.assertIsNot(load_reduced(data, 64), first)
+        self.assertEqual((thumbnail_cache.hits, thumbnail_cache.misses), (1, 2))
+
+    def test_perceptual_hash_close_to_full_decode(self):
+        from PIL import Image
+
+        from .image_loading import HASH_MAX_SIZE, load_reduced
+        from .image_similarity import dhash, hamming_distance
+
+        compared = 0
+        for name, data in ImageProbeTests.corpus_images(self):
+            with Image.open(io.BytesIO(data)) as img:
+                if max(img.size) <= HASH_MAX_SIZE:
+                    continue
+                full = dhash(img)
+            self.assertLessEqual(hamming_distance(full, dhash(load_reduced(data, HASH_MAX_SIZE))), 2, name)
+            compared += 1
+        self.assertGreater(compared, 50)
+
+    def test_icon_lookup_skips_catalog_for_non_standard_sizes(self):
+        from . import utils
+
+        catalog = mock.MagicMock()
+        catalog.items.return_value = iter([('action', {'home': {'filled': {}, 'outlined': {}}})])
+        with mock.patch.object(utils, 'MATERIAL_ICONS_DB', catalog):
+            self.assertIsNone(utils.identify_material_icon(ImageAsset(name='a.png', format='PNG', width=50, height=50)))
+            self.assertFalse(catalog.items.called)
+            self.assertEqual(
+                utils.identify_material_icon(ImageAsset(name='b.png', format='PNG', width=48, height=48)), 'filled',
+            )
+
+
+class GifFrameAnalysisTests(TestCase):
+    """Quadros de GIFs animados lidos da estrutura de blocos, sem decodificar"""
+
+    def animated_gif(self, frames, size=(64, 48), duration=40):
+        from PIL import Image
+
+        images = [Image.new('RGB', size, (i % 256, 255 - i % 256, i // 256 * 64)) for i in range(frames)]
+        buffer = io.BytesIO()
+        images[0].save(buffer, 'GIF', save_all=True, append_images=images[1:], duration=duration, loop=0)
+        return buffer.getvalue()
+
+    def test_frames_and_duration_match_pil(self):
+        from PIL import Image
+
+        from .gif_frames import analyze_gif, iter_gif_frames
+
+        data = self.animated_gif(200)
+        with Image.open(io.BytesIO(data)) as img:
+            expected_frames = img.n_frames
+
+        stats = analyze_gif(data)
+        self.assertEqual(stats['frame_count'], expected_frames)
+        self.assertEqual(stats['frame_count'], 200)
+        self.assertEqual(stats['duration_ms'], 200 * 40)
+        self.assertEqual(stats['fps'], 25.0)
+        self.assertEqual(stats['loop_count'], 0)
+        self.assertEqual(stats['decoded_frame_bytes'], 64 * 48 * 4)
+        self.assertEqual(stats['decoded_bytes_all_frames'], 200 * 64 * 48 * 4)
+        self.assertFalse(stats['truncated'])
+        self.assertEqual([frame.index for frame in iter_gif_frames(io.BytesIO(data))], list(range(200)))
+
+    def test_static_zero_delay_and_truncated_gifs(self):
+        from .gif_frames import GifFormatError, analyze_gif
+
+        static = analyze_gif(self.animated_gif(1))
+        self.assertEqual((static['frame_count'], static['duration_ms'], static['fps']), (1, 0, 0))
+
+        # Atraso 0 é reproduzido como 100 ms
+        self.assertEqual(analyze_gif(self.animated_gif(3, duration=0))['duration_ms'], 300)
+
+        data = self.animated_gif(10)
+        truncated = analyze_gif(data[:len(data) // 2])
+        self.assertTrue(truncated['truncated'])
+        self.assertLess(truncated['frame_count'], 10)
+
+        with self.assertRaises(GifFormatError):
+            analyze_gif(b'\x89PNG\r\n\x1a\n')
+
+    @override_settings(GIF_MAX_FRAMES=100, GIF_MAX_DECODED_MB=32)
+    def test_heavy_animation_is_penalized_and_reported(self):
+        from .gif_frames import analyze_gif
+        from .report_structure import collect_findings
+        from .utils import calculate_asset_quality_score, set_animation_stats
+
+        data = self.animated_gif(200)
+        static = ImageAsset(name='estatico.gif', format='GIF', width=64, height=48, file_size=len(data))
+        animated = ImageAsset(name='animado.gif', format='GIF', width=64, height=48, file_size=len(data))
+        set_animation_stats(animated, analyze_gif(data))
+
+        self.assertEqual(animated.frame_count, 200)
+        self.assertEqual(animated.animation_duration_ms, 8000)
+        self.assertEqual(calculate_asset_quality_score(static) - calculate_asset_quality_score(animated), 15)
+
+        findings = [f for f in collect_findings([static, animated]) if f.category == 'animation']
+        self.assertEqual(len(findings), 1)
+        self.assertIs(findings[0].image_asset, animated)
+        self.assertIn('200 quadros', findings[0].message)
+
+        with override_settings(GIF_MAX_FRAMES=500):
+            self.assertEqual(calculate_asset_quality_score(animated), calculate_asset_quality_score(static))
+
+    def test_animation_within_budget_scores_like_static_file(self):
+        from .gif_frames import analyze_gif
+        from .utils import calculate_asset_quality_score, set_animation_stats
+
+        # Só os limites de quadros/memória penalizam animações: o bpp é o do arquivo inteiro
+        data = self.animated_gif(60, size=(256, 256))
+        animated = ImageAsset(name='animado.gif', format='GIF', width=256, height=256, file_size=len(data))
+        set_animation_stats(animated, analyze_gif(data))
+        static = ImageAsset(name='estatico.gif', format='GIF', width=256, height=256, file_size=len(data))
+
+        self.assertEqual(animated.frame_count, 60)
+        self.assertEqual(animated.bytes_per_pixel, static.bytes_per_pixel)
+        self.assertEqual(calculate_asset_quality_score(animated), calculate_asset_quality_score(static))
+
+
+class MemoryFootprintTests(TestCase):
+    """Memória estimada dos bitmaps decodificados em cada tela"""
+
+    screen = {'Properties': {
+        '$Name': 'Screen1', '$Type': 'Form', 'BackgroundImage': 'fundo.jpg', 'Icon': 'icone.png',
+        '$Components': [
+            {'$Name': 'Image1', '$Type': 'Image', 'Picture': 'foto.png'},
+            {'$Name': 'Arranjo', '$Type': 'HorizontalArrangement', '$Components': [
+                {'$Name': 'Button1', '$Type': 'Button', 'Image': 'foto.png', 'Text': 'OK'},
+                {'$Name': 'Button2', '$Type': 'Button', 'Image': 'sumiu.png'},
+            ]},
+        ],
+    }}
+
+    def assets(self):
+        return [
+            ImageAsset(name='fundo.jpg', format='JPEG', width=3000, height=4000, file_size=900000),
+            ImageAsset(name='foto.png', format='PNG', width=100, height=50, file_size=4000),
+            ImageAsset(name='icone.png', format='PNG', width=512, height=512, file_size=9000),
+        ]
+
+    asset_names = frozenset({'fundo.jpg', 'foto.png', 'icone.png', 'sumiu.png'})
+
+    def test_only_displayed_images_count(self):
+        from .asset_graph import collect_designer_references
+        from .memory_footprint import displayed_images
+
+        references = displayed_images(collect_designer_references('Screen1', self.screen, self.asset_names))
+        self.assertEqual(
+            [(r.component, r.property, r.asset) for r in references],
+            [('Screen1', 'BackgroundImage', 'fundo.jpg'), ('Image1', 'Picture', 'foto.png'),
+             ('Button1', 'Image', 'foto.png'), ('Button2', 'Image', 'sumiu.png')],
+        )
+
+    @override_settings(SCREEN_BITMAP_BUDGET_MB=24, ASSET_BITMAP_BUDGET_MB=8)
+    def test_peak_per_screen_and_budgets(self):
+        from .asset_graph import collect_designer_references
+        from .memory_footprint import analyze_memory_footprint
+        from .report_structure import collect_findings
+
+        references = collect_designer_references('Screen1', self.screen, self.asset_names)
+        references += collect_designer_references(
+            'Screen2', {'Properties': {'$Name': 'Screen2', '$Type': 'Form'}}, self.asset_names,
+        )
+        memory = analyze_memory_footprint(references, self.assets())
+
+        # O ícone do app não é exibido; foto.png conta uma vez, embora usada duas vezes
+        self.assertEqual(memory['peak_screen'], 'Screen1')
+        self.assertEqual(memory['peak_bytes'], 3000 * 4000 * 4 + 100 * 50 * 4)
+        self.assertEqual([s['screen'] for s in memory['screens']], ['Screen1'])
+        self.assertTrue(memory['screens'][0]['over_budget'])
+        self.assertEqual([r.asset for r in memory['unresolved']], ['sumiu.png'])
+        self.assertEqual([asset.name for asset, _ in memory['oversized_assets']], ['fundo.jpg'])
+
+        findings = [f for f in collect_findings([], memory_analysis=memory) if f.category == 'memory']
+        self.assertEqual([(f.severity, f.screen) for f in findings], [('high', 'Screen1'), ('medium', '')])
+
+        with override_settings(SCREEN_BITMAP_BUDGET_MB=64):
+            self.assertFalse(analyze_memory_footprint(references, self.assets())['screens'][0]['over_budget'])
+
+    def test_analysis_writes_performance_section(self):
+        from . import utils
+        from .batch import create_aia_files
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        path = Path(settings.BASE_DIR) / 'media' / 'aia_files' / 'presidentsQuiz_1.aia'
+        with override_settings(MEDIA_ROOT=media_root):
+            aia_file = create_aia_files([(path.name, path.read_bytes())])[0]
+            run = utils.analyze_aia_file(aia_file)
+
+        self.assertIn('memory', run.timings)
+        content = aia_file.evaluation.sections.get(key='performance').content
+        self.assertIn('Screen1', content)
+
+
+class AssetReferenceGraphTests(TestCase):
+    """Grafo de referências dos assets (Designer e blocos) e seu uso no score"""
+
+    def test_designer_and_block_references(self):
+        from .asset_graph import collect_block_references, collect_designer_references, group_by_asset
+
+        asset_names = frozenset({'gato.png', 'fundo.png', 'miau.mp3', 'a&b.png'})
+        screen = {'Properties': {
+            '$Name': 'Screen1', '$Type': 'Form', 'BackgroundImage': 'fundo.png', 'Title': 'gato.png?',
+            '$Components': [
+                {'$Name': 'Som', '$Type': 'Sound', 'Source': 'miau.mp3'},
+                {'$Name': 'Foto', '$Type': 'Image', 'Picture': 'gato.png'},
+            ],
+        }}
+        blocks = (
+            '<xml><block type="text"><field name="TEXT">gato.png</field></block>'
+            '<block type="text"><field name="TEXT">gato.png</field></block>'
+            '<block type="text"><field name="TEXT">a&amp;b.png</field></block>'
+            '<block type="text"><field name="TEXT">outro.png</field></block></xml>'
+        )
+        uses = collect_designer_references('Screen1', screen, asset_names)
+        self.assertEqual(
+            [(u.component, u.component_type, u.property, u.asset) for u in uses],
+            [('Screen1', 'Form', 'BackgroundImage', 'fundo.png'), ('Som', 'Sound', 'Source', 'miau.mp3'),
+             ('Foto', 'Image', 'Picture', 'gato.png')],
+        )
+        block_uses = collect_block_references('Screen1', blocks, asset_names)
+        self.assertEqual([(u.asset, u.source) for u in block_uses], [('gato.png', 'blocks'), ('a&b.png', 'blocks')])
+
+        graph = group_by_asset(uses + block_uses)
+        self.assertEqual(len(graph['gato.png']), 2)
+        self.assertNotIn('outro.png', graph)
+
+    def test_asset_type_from_usage(self):
+        from .asset_graph import AssetUse, usage_asset_type
+
+        def use(component_type, prop, source='designer'):
+            return AssetUse('Screen1', 'C', component_type, prop, 'x.png', source)
+
+        self.assertEqual(usage_asset_type([use('Form', 'Icon'), use('Image', 'Picture')], 512, 512), 'icon')
+        self.assertEqual(usage_asset_type([use('Canvas', 'BackgroundImage')], 64, 64), 'background')
+        self.assertEqual(usage_asset_type([use('Button', 'Image')], 48, 48), 'icon')
+        self.assertEqual(usage_asset_type([use('Button', 'Image')], 300, 80), 'button')
+        self.assertEqual(usage_asset_type([use('Image', 'Picture')], 48, 48), 'image')
+        self.assertIsNone(usage_asset_type([use('', '', 'blocks')], 48, 48))
+        self.assertIsNone(usage_asset_type([], 48, 48))
+
+    def test_unused_assets_are_flagged_and_left_out_of_scores(self):
+        from .report_structure import collect_findings
+        from .utils import calculate_asset_quality_score, calculate_overall_scores
+
+        used = ImageAsset(name='usada.png', format='PNG', width=512, height=512, file_size=300000, is_referenced=True)
+        unused = ImageAsset(name='sobra.png', format='PNG', width=20, height=20, file_size=40000, is_referenced=False)
+        legacy = ImageAsset(name='antiga.png', format='PNG', width=512, height=512, file_size=300000)
+
+        scores = calculate_overall_scores([used, unused])
+        self.assertEqual(scores['overall_score'], calculate_asset_quality_score(used))
+        self.assertEqual(calculate_overall_scores([unused])['overall_score'], calculate_asset_quality_score(unused))
+        self.assertEqual(calculate_overall_scores([used, legacy])['overall_score'], calculate_asset_quality_score(used))
+
+        findings = collect_findings([used, unused])
+        self.assertEqual([(f.category, f.image_asset) for f in findings if f.image_asset is unused], [('unused', unused)])
+
+    def test_analysis_stores_graph(self):
+        from . import utils
+        from .batch import create_aia_files
+        from .models import AssetReference
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        path = Path(settings.BASE_DIR) / 'media' / 'aia_files' / 'presidentsQuiz_1.aia'
+        with override_settings(MEDIA_ROOT=media_root):
+            aia_file = create_aia_files([(path.name, path.read_bytes())])[0]
+            utils.analyze_aia_file(aia_file)
+            references = AssetReference.objects.filter(aia_file=aia_file)
+            self.assertTrue(references.exists())
+            self.assertFalse(references.filter(image_asset__isnull=False).exclude(
+                image_asset__name=models.F('asset_name')).exists())
+            for asset in aia_file.images.all():
+                self.assertEqual(asset.is_referenced, asset.references.exists(), asset.name)
+
+            # Reanálise substitui o grafo
+            total = references.count()
+            utils.analyze_aia_file(aia_file)
+            self.assertEqual(AssetReference.objects.filter(aia_file=aia_file).count(), total)
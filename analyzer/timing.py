@@ -0,0 +1,181 @@
+"""
+Tempo por Etapa da Análise (spans)
+==================================
+
+API mínima para medir onde o tempo de uma análise é gasto (extração do ZIP,
+decodificação das imagens, cópia para media, busca de ícones Material Design,
+leitura dos .scm, análise de cores, relatório, Gemini...).
+
+    with record_trace() as trace:          # ativa a medição (ex.: analyze_aia_file)
+        with span('extraction'):
+            ...
+        process_image_file(...)            # decorada com @timed('images')
+
+    trace.as_dict()
+    # {'extraction': {'ms': 12.3, 'count': 1}, 'images': {...}, 'images/decode': {...}}
+
+Os spans aninhados formam caminhos ("report/recommendations/gemini") e
+chamadas repetidas com o mesmo caminho são somadas (count indica quantas).
+
+Sem um trace ativo, `span()` devolve um objeto nulo compartilhado e `@timed`
+chama a função diretamente: o custo é uma leitura de ContextVar.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+_current_trace = ContextVar('analysis_trace', default=None)
+
+
+def is_timing_enabled():
+    return bool(getattr(settings, 'ANALYSIS_TIMING_ENABLED', True))
+
+
+class Trace:
+    """Tempos acumulados de uma análise, por caminho de span"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = {}
+        self._stack = []
+
+    def _enter(self, name):
+        self._stack.append(name)
+        return '/'.join(self._stack)
+
+    def _exit(self, path, seconds):
+        self._stack.pop()
+        entry = self.spans.get(path)
+        if entry is None:
+            self.spans[path] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    @property
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def as_dict(self):
+        """{caminho: {'ms', 'count'}} na ordem em que cada span apareceu pela primeira vez"""
+        return {
+            path: {'ms': round(seconds * 1000, 2), 'count': count}
+            for path, (seconds, count) in self.spans.items()
+        }
+
+
+class _Span:
+    __slots__ = ('trace', 'name', 'path', 'started')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.path = self.trace._enter(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace._exit(self.path, time.perf_counter() - self.started)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Mede o bloco `with span(nome):` no trace ativo (nada faz se não houver trace)"""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, name)
+
+
+def timed(name):
+    """Decorador: mede cada chamada da função como um span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            with _Span(trace, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def record_trace(enabled=None):
+    """
+    Ativa a medição no contexto atual
+
+    Yields:
+        Trace, ou None se a medição estiver desabilitada (ANALYSIS_TIMING_ENABLED)
+    """
+    if enabled is None:
+        enabled = is_timing_enabled()
+    if not enabled:
+        yield None
+        return
+
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def timing_rows(timings, total_ms=None):
+    """
+    Linhas para exibição: [{'name', 'path', 'depth', 'ms', 'count', 'percent'}, ...]
+
+    Args:
+        timings: resultado de Trace.as_dict()
+        total_ms: base do percentual (padrão: soma dos spans de primeiro nível)
+    """
+    if total_ms is None:
+        total_ms = sum(entry['ms'] for path, entry in timings.items() if '/' not in path)
+    rows = []
+    for path in sorted(timings, key=_tree_order(timings)):
+        entry = timings[path]
+        rows.append({
+            'name': path.rsplit('/', 1)[-1],
+            'path': path,
+            'depth': path.count('/'),
+            'ms': entry['ms'],
+            'count': entry['count'],
+            'percent': round(100 * entry['ms'] / total_ms, 1) if total_ms else 0,
+        })
+    return rows
+
+
+def _tree_order(timings):
+    """Chave de ordenação que mantém cada span logo abaixo do seu pai"""
+    position = {path: index for index, path in enumerate(timings)}
+
+    def key(path):
+        parts = path.split('/')
+        return [position.get('/'.join(parts[:i + 1]), len(position)) for i in range(len(parts))]
+    return key
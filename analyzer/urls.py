@@ -4,6 +4,8 @@ from . import views
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('upload/', views.upload_file, name='upload_file'),
+    path('upload/batch/', views.upload_batch, name='upload_batch'),
+    path('batch/', views.batch_status, name='batch_status'),
     path('files/', views.AiaFileListView.as_view(), name='file_list'),
     path('files/<int:pk>/', views.file_detail, name='file_detail'),
     path('files/<int:pk>/analyze/', views.analyze_file, name='analyze_file'),
@@ -11,5 +13,8 @@ urlpatterns = [
     path('files/<int:pk>/print/', views.print_analysis, name='print_analysis'),
     path('images/<int:pk>/', views.image_detail, name='image_detail'),
     path('images/<int:image_id>/material-design/', views.material_design_analysis, name='material_design_analysis'),
+    path('api/files/', views.api_file_list, name='api_file_list'),
+    path('api/findings/', views.api_findings, name='api_findings'),
     path('api/material-icons/search/', views.api_material_icons_search, name='api_material_icons_search'),
+    path('metrics', views.metrics, name='metrics'),
 ]
@@ -1,56 +1,91 @@
+import io
+import logging
 import zipfile
 import os
 import tempfile
 from PIL import Image
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
+from django.db import transaction
 from django.utils import timezone
-from .models import AiaFile, ImageAsset, UsabilityEvaluation
+from .models import AiaFile, AnalysisRun, AssetReference, ImageAsset, UsabilityEvaluation, DashboardStats
 import shutil
-import xml.etree.ElementTree as ET
 from pathlib import Path
-import hashlib
 import json
 import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from .lazy_imports import LazyModule
+from .material_icons_scanner import scan_icon_category
+from .material_icons_catalog import build_catalog, open_catalog
+from .asset_graph import (
+    ASSETS_DIR, collect_block_references, collect_designer_references, group_by_asset, list_asset_names,
+    usage_asset_type,
+)
+from .gif_frames import analyze_gif
+from .image_loading import ATLAS_MAX_SIZE, HASH_MAX_SIZE, load_reduced, load_reduced_file
+from .image_probe import ImageInfo, probe_image
+from .image_similarity import set_perceptual_hash
+from .logs import analysis_log_context
+from .memory_footprint import analyze_memory_footprint, generate_performance_report
+from .metrics import ANALYSES_IN_PROGRESS, record_analysis_run
+from .profiling import AnalysisProfiler, is_profiling_enabled
+from .report_cache import invalidate_report_cache
+from .report_structure import collect_findings, save_structured_report
+from .timing import record_trace, span, timed
+
+logger = logging.getLogger(__name__)
+
+# Dependências pesadas são carregadas apenas no primeiro uso (ver lazy_imports.py)
+# Sistema de IA para feedback inteligente (depende de numpy)
+ai_feedback = LazyModule(
+    '.ai_feedback', package=__package__,
+    install_hint="Sistema de IA não disponível. Usando feedback básico."
+)
+
+# Gemini AI para análise avançada (google.generativeai, grpc, protobuf)
+gemini_ai = LazyModule(
+    '.gemini_ai', package=__package__,
+    install_hint="Gemini AI não disponível. Instale: pip install google-generativeai"
+)
+
+# Atlas rasterizado dos ícones Material Design (depende de numpy)
+icon_atlas = LazyModule('.material_icons_atlas', package=__package__)
+
+# Bibliotecas de análise de cor
+wcag_contrast_ratio = LazyModule('wcag_contrast_ratio')
+colour = LazyModule('colour')
+
+
+def is_color_analysis_available():
+    """Verifica se as bibliotecas de análise de cor estão instaladas (sem importá-las)"""
+    return wcag_contrast_ratio.is_available() and colour.is_available()
+
+
+def is_gemini_enabled():
+    """Gemini só é carregado quando há API key configurada"""
+    return bool(getattr(settings, 'GEMINI_ANALYSIS_ENABLED', False)) and gemini_ai.is_available()
 
-# Importar sistema de IA para feedback inteligente
-try:
-    from .ai_feedback import generate_ai_enhanced_feedback, enhance_existing_recommendations
-    AI_FEEDBACK_AVAILABLE = True
-except ImportError:
-    AI_FEEDBACK_AVAILABLE = False
-    print("⚠️ Sistema de IA não disponível. Usando feedback básico.")
-
-# Importar Gemini AI para análise avançada
-try:
-    from .gemini_ai import analyze_with_gemini_ai, GeminiAnalyzer
-    GEMINI_AI_AVAILABLE = True
-except ImportError:
-    GEMINI_AI_AVAILABLE = False
-    print("⚠️ Gemini AI não disponível. Instale: pip install google-generativeai")
-
-try:
-    import wcag_contrast_ratio
-    import colour
-    COLOR_ANALYSIS_AVAILABLE = True
-except ImportError:
-    COLOR_ANALYSIS_AVAILABLE = False
-    print("⚠️ Bibliotecas de análise de cor não disponíveis. Instale: pip install wcag-contrast-ratio colour-science")
 
 # Dicionário global para armazenar os ícones do Material Design
 MATERIAL_ICONS_DB = {}
 
-# Configurações dos ícones Material Design
-MATERIAL_ICON_STYLES = {
-    'materialicons': 'filled',
-    'materialiconsoutlined': 'outlined', 
-    'materialiconsround': 'round',
-    'materialiconssharp': 'sharp',
-    'materialiconstwotone': 'twotone'
-}
+# SVGs da biblioteca Material Design (source/src/categoria/icone/estilo/arquivo.svg)
+ICONS_SOURCE_PATH = Path(__file__).parent.parent / 'source' / 'src'
+# Cache em disco dos ícones e campos persistidos de cada estilo
+ICONS_CACHE_PATH = Path(__file__).parent.parent / 'material_icons_cache.json'
+# Catálogo binário mapeado em memória (mmap) e compartilhado entre workers
+ICONS_CATALOG_PATH = Path(__file__).parent.parent / 'material_icons_catalog.bin'
+ICON_CACHE_FIELDS = ('path', 'viewBox', 'width', 'height', 'hash', 'mtime', 'size')
 
+# Sinaliza quando MATERIAL_ICONS_DB está pronto para consulta (ver warmup_material_icons)
+MATERIAL_ICONS_READY = threading.Event()
+_MATERIAL_ICONS_LOCK = threading.Lock()
 
-def load_material_icons():
+
+def load_material_icons(force_reload=False, max_workers=None):
     """
     Carrega todos os ícones do Material Design da estrutura source/src/
     
@@ -60,111 +95,62 @@ def load_material_icons():
     Exemplo:
     source/src/action/home/materialicons/24px.svg
     source/src/action/home/materialiconsoutlined/24px.svg
+    
+    As categorias são processadas em paralelo (um processo por categoria) e,
+    a menos que force_reload=True, SVGs cujo mtime/tamanho não mudaram desde o
+    último cache são reaproveitados sem nova leitura.
+    
+    Args:
+        force_reload: ignora o cache anterior e reprocessa todos os SVGs
+        max_workers: número de processos (None = número de CPUs, 1 = serial)
     """
     global MATERIAL_ICONS_DB
     
-    # Caminho para os ícones (relativo ao diretório do projeto)
-    base_path = Path(__file__).parent.parent / 'source' / 'src'
+    base_path = ICONS_SOURCE_PATH
     
     if not base_path.exists():
-        print(f"⚠️  Diretório de ícones não encontrado: {base_path}")
+        logger.warning('Diretório de ícones não encontrado: %s', base_path)
         return
     
-    icon_count = 0
-    category_count = 0
+    previous_db = {} if force_reload else read_icons_cache()
+    category_paths = sorted(str(path) for path in base_path.iterdir() if path.is_dir())
+    
+    new_db = {}
+    totals = {'parsed': 0, 'reused': 0, 'errors': 0}
     
     try:
-        # Percorre todas as categorias
-        for category_path in base_path.iterdir():
-            if not category_path.is_dir():
-                continue
-                
-            category_name = category_path.name
-            category_count += 1
-            
-            # Percorre todos os ícones na categoria
-            for icon_path in category_path.iterdir():
-                if not icon_path.is_dir():
-                    continue
-                    
-                icon_name = icon_path.name
-                
-                # Inicializa entrada para o ícone se não existir
-                if category_name not in MATERIAL_ICONS_DB:
-                    MATERIAL_ICONS_DB[category_name] = {}
-                    
-                if icon_name not in MATERIAL_ICONS_DB[category_name]:
-                    MATERIAL_ICONS_DB[category_name][icon_name] = {}
-                
-                # Percorre todos os estilos do ícone
-                for style_path in icon_path.iterdir():
-                    if not style_path.is_dir():
-                        continue
-                        
-                    style_dir_name = style_path.name
-                    style_name = MATERIAL_ICON_STYLES.get(style_dir_name, style_dir_name)
-                    
-                    # Procura arquivo SVG no diretório do estilo
-                    svg_files = list(style_path.glob('*.svg'))
-                    
-                    if svg_files:
-                        svg_file = svg_files[0]  # Pega o primeiro arquivo SVG encontrado
-                        
-                        try:
-                            # Lê e processa o arquivo SVG
-                            svg_content = svg_file.read_text(encoding='utf-8')
-                            
-                            # Extrai informações básicas do SVG
-                            svg_info = parse_svg_info(svg_content)
-                            
-                            # Armazena as informações do ícone
-                            MATERIAL_ICONS_DB[category_name][icon_name][style_name] = {
-                                'path': str(svg_file),
-                                'content': svg_content,
-                                'viewBox': svg_info.get('viewBox', '0 0 24 24'),
-                                'width': svg_info.get('width', '24'),
-                                'height': svg_info.get('height', '24'),
-                                'hash': hashlib.md5(svg_content.encode()).hexdigest()
-                            }
-                            
-                            icon_count += 1
-                            
-                        except Exception as e:
-                            print(f"⚠️  Erro ao processar {svg_file}: {e}")
-                            continue
+        jobs = [
+            (category_path, previous_db.get(os.path.basename(category_path)))
+            for category_path in category_paths
+        ]
         
-        print(f"✅ Material Icons carregados: {icon_count} ícones em {category_count} categorias")
-        
-        # Salva cache dos ícones carregados
-        save_icons_cache()
-        
-    except Exception as e:
-        print(f"❌ Erro ao carregar Material Icons: {e}")
-
-
-def parse_svg_info(svg_content):
-    """
-    Extrai informações básicas de um arquivo SVG
-    """
-    try:
-        root = ET.fromstring(svg_content)
+        if max_workers == 1 or len(jobs) <= 1:
+            results = [scan_icon_category(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(scan_icon_category, *zip(*jobs)))
         
-        # Remove namespace se presente
-        if root.tag.startswith('{'):
-            root.tag = root.tag.split('}')[1]
+        for category_name, icons, stats in results:
+            new_db[category_name] = icons
+            for key in totals:
+                totals[key] += stats[key]
         
-        info = {}
+        MATERIAL_ICONS_DB = new_db
         
-        # Extrai atributos principais
-        info['viewBox'] = root.get('viewBox', '0 0 24 24')
-        info['width'] = root.get('width', '24')
-        info['height'] = root.get('height', '24')
+        icon_count = totals['parsed'] + totals['reused']
+        logger.info(
+            'Material Icons carregados: %d ícones em %d categorias (%d processados, %d reaproveitados do cache)',
+            icon_count, len(new_db), totals['parsed'], totals['reused'],
+        )
         
-        return info
+        # Salva cache dos ícones carregados e passa a servir o catálogo compartilhado
+        save_icons_cache()
+        publish_icons_catalog()
         
-    except ET.ParseError as e:
-        print(f"⚠️  Erro ao fazer parse do SVG: {e}")
-        return {'viewBox': '0 0 24 24', 'width': '24', 'height': '24'}
+    except Exception as e:
+        logger.exception('Erro ao carregar Material Icons: %s', e)
+    
+    return totals
 
 
 def save_icons_cache():
@@ -172,9 +158,9 @@ def save_icons_cache():
     Salva cache dos ícones carregados para acelerar próximas execuções
     """
     try:
-        cache_path = Path(__file__).parent.parent / 'material_icons_cache.json'
+        cache_path = ICONS_CACHE_PATH
         
-        # Prepara dados para serialização (remove conteúdo SVG para reduzir tamanho)
+        # Prepara dados para serialização (mtime/size permitem a reconstrução incremental)
         cache_data = {}
         for category, icons in MATERIAL_ICONS_DB.items():
             cache_data[category] = {}
@@ -182,63 +168,193 @@ def save_icons_cache():
                 cache_data[category][icon_name] = {}
                 for style_name, info in styles.items():
                     cache_data[category][icon_name][style_name] = {
-                        'path': info['path'],
-                        'viewBox': info['viewBox'],
-                        'width': info['width'],
-                        'height': info['height'],
-                        'hash': info['hash']
+                        key: info[key] for key in ICON_CACHE_FIELDS if key in info
                     }
         
-        with open(cache_path, 'w', encoding='utf-8') as f:
+        # Escreve em arquivo temporário e substitui de forma atômica
+        tmp_path = cache_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(cache_data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
             
-        print(f"💾 Cache salvo em: {cache_path}")
+        logger.info('Cache de ícones salvo em: %s', cache_path)
         
     except Exception as e:
-        print(f"⚠️  Erro ao salvar cache: {e}")
+        logger.warning('Erro ao salvar cache de ícones: %s', e)
+
+
+def read_icons_cache():
+    """
+    Lê o cache de ícones do disco sem alterar MATERIAL_ICONS_DB
+    """
+    try:
+        if not ICONS_CACHE_PATH.exists():
+            return {}
+        with open(ICONS_CACHE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning('Erro ao carregar cache de ícones: %s', e)
+        return {}
 
 
 def load_icons_cache():
     """
     Carrega cache dos ícones se disponível
     """
+    cache_data = read_icons_cache()
+    if not cache_data:
+        return False
+    
+    global MATERIAL_ICONS_DB
+    MATERIAL_ICONS_DB = cache_data
+    
+    # Conta ícones carregados
+    icon_count = sum(len(styles) for icons in MATERIAL_ICONS_DB.values() for styles in icons.values())
+    logger.info('Cache de ícones carregado: %d ícones', icon_count)
+    
+    publish_icons_catalog()
+    return True
+
+
+def is_shared_catalog_enabled():
+    """Catálogo mmap compartilhado entre workers (settings.MATERIAL_ICONS_SHARED_CATALOG)"""
+    return bool(getattr(settings, 'MATERIAL_ICONS_SHARED_CATALOG', True))
+
+
+def publish_icons_catalog():
+    """
+    Grava MATERIAL_ICONS_DB no catálogo binário e passa a servi-lo via mmap
+    
+    Depois disso MATERIAL_ICONS_DB é um MaterialIconsCatalog (Mapping somente
+    leitura) cujas páginas são compartilhadas por todos os processos.
+    """
+    global MATERIAL_ICONS_DB
+    
+    if not is_shared_catalog_enabled() or not MATERIAL_ICONS_DB:
+        return False
+    
     try:
-        cache_path = Path(__file__).parent.parent / 'material_icons_cache.json'
-        
-        if not cache_path.exists():
-            return False
-            
-        with open(cache_path, 'r', encoding='utf-8') as f:
-            cache_data = json.load(f)
-        
-        global MATERIAL_ICONS_DB
-        MATERIAL_ICONS_DB = cache_data
-        
-        # Conta ícones carregados
-        icon_count = sum(len(styles) for icons in MATERIAL_ICONS_DB.values() for styles in icons.values())
-        print(f"💾 Cache carregado: {icon_count} ícones")
-        
+        build_catalog(MATERIAL_ICONS_DB, ICONS_CATALOG_PATH)
+        MATERIAL_ICONS_DB = open_catalog(ICONS_CATALOG_PATH)
         return True
+    except Exception as e:
+        logger.warning('Erro ao gerar catálogo compartilhado: %s', e)
+        return False
+
+
+def load_icons_catalog():
+    """
+    Mapeia o catálogo binário se ele existir e estiver atualizado em relação ao cache JSON
+    """
+    global MATERIAL_ICONS_DB
+    
+    if not is_shared_catalog_enabled() or not ICONS_CATALOG_PATH.exists():
+        return False
+    
+    try:
+        if (ICONS_CACHE_PATH.exists() and
+                ICONS_CACHE_PATH.stat().st_mtime > ICONS_CATALOG_PATH.stat().st_mtime):
+            return False  # cache JSON mais novo: o catálogo será regenerado
         
+        MATERIAL_ICONS_DB = open_catalog(ICONS_CATALOG_PATH)
+        logger.info('Catálogo compartilhado mapeado: %d ícones', MATERIAL_ICONS_DB.style_count)
+        return True
     except Exception as e:
-        print(f"⚠️  Erro ao carregar cache: {e}")
+        logger.warning('Erro ao mapear catálogo compartilhado: %s', e)
         return False
 
 
+def ensure_material_icons_loaded():
+    """
+    Garante que MATERIAL_ICONS_DB esteja carregado
+    (catálogo mmap, cache JSON ou diretório source/src, nessa ordem)
+    
+    Seguro para múltiplas threads: se o warmup em segundo plano estiver em andamento,
+    a chamada aguarda sua conclusão em vez de carregar os ícones novamente.
+    """
+    if MATERIAL_ICONS_READY.is_set():
+        return bool(MATERIAL_ICONS_DB)
+    
+    with _MATERIAL_ICONS_LOCK:
+        if not MATERIAL_ICONS_DB:
+            if not load_icons_catalog() and not load_icons_cache():
+                load_material_icons()
+        MATERIAL_ICONS_READY.set()
+    
+    return bool(MATERIAL_ICONS_DB)
+
+
+def is_material_icons_ready():
+    """Indica se o banco de ícones Material Design já foi carregado"""
+    return MATERIAL_ICONS_READY.is_set()
+
+
+def warmup_material_icons(background=False):
+    """
+    Pré-carrega MATERIAL_ICONS_DB na inicialização do worker (AnalyzerConfig.ready)
+    
+    - background=False: carrega de forma síncrona. Com servidores prefork
+      (ex.: gunicorn --preload) o carregamento acontece no processo mestre,
+      antes do fork, e as páginas de memória são compartilhadas (copy-on-write)
+      entre os workers.
+    - background=True: carrega em uma thread daemon, sem atrasar a inicialização.
+      Requisições que precisarem dos ícones antes do fim aguardam o carregamento.
+    """
+    if MATERIAL_ICONS_READY.is_set():
+        return None
+    
+    if background:
+        thread = threading.Thread(
+            target=_warmup_material_icons,
+            name='material-icons-warmup',
+            daemon=True,
+        )
+        thread.start()
+        return thread
+    
+    _warmup_material_icons()
+    return None
+
+
+def _warmup_material_icons():
+    """Carrega os ícones e constrói o índice de busca usado pela API de type-ahead"""
+    if ensure_material_icons_loaded():
+        from .material_icons_search import get_search_index
+        get_search_index()
+
+
+def _reset_material_icons_lock_after_fork():
+    """
+    Após um fork, o lock pode ter sido copiado no estado "adquirido" por uma
+    thread de warmup que não existe no processo filho. Recria o lock e, se os
+    ícones ainda não estavam prontos, deixa o carregamento para o primeiro uso.
+    """
+    global _MATERIAL_ICONS_LOCK, MATERIAL_ICONS_DB
+    _MATERIAL_ICONS_LOCK = threading.Lock()
+    if not MATERIAL_ICONS_READY.is_set():
+        # Descarta um carregamento parcial interrompido pelo fork
+        MATERIAL_ICONS_DB = {}
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_material_icons_lock_after_fork)
+
+
 def find_similar_material_icon(image_asset, similarity_threshold=0.8):
     """
     Encontra ícones do Material Design similares a um ícone do app
     """
-    if not MATERIAL_ICONS_DB:
-        if not load_icons_cache():
-            load_material_icons()
+    ensure_material_icons_loaded()
     
     if not MATERIAL_ICONS_DB:
         return None
     
-    # Para demonstração, vamos usar características básicas
-    # Em uma implementação real, você usaria comparação visual mais sofisticada
+    # Comparação visual com o atlas rasterizado, quando disponível
+    visual_results = find_visually_similar_material_icons(image_asset, similarity_threshold)
+    if visual_results:
+        return visual_results
     
+    # Sem atlas (ou sem correspondência visual): busca pelo nome do arquivo
     results = []
     icon_name_lower = image_asset.name.lower()
     
@@ -264,6 +380,48 @@ def find_similar_material_icon(image_asset, similarity_threshold=0.8):
     return results[:5]  # Retorna top 5 matches
 
 
+def find_visually_similar_material_icons(image_asset, similarity_threshold=0.8, top_k=5):
+    """
+    Compara os pixels do ícone com o atlas rasterizado do Material Design
+    (gerado por `manage.py build_material_icons_atlas`) usando NCC
+    
+    Retorna [] se o atlas não foi gerado, numpy não está instalado ou a
+    imagem não pode ser lida.
+    """
+    if not icon_atlas.is_available():
+        return []
+    
+    try:
+        atlas = icon_atlas.get_atlas()
+        if atlas is None or not image_asset.extracted_file:
+            return []
+        
+        img = load_reduced_file(image_asset.extracted_file.path, ATLAS_MAX_SIZE)
+        matches = atlas.compare(img, metric='ncc', top_k=top_k)
+    except Exception as e:
+        logger.warning('Erro na comparação visual de %s: %s', image_asset.name, e)
+        return []
+    
+    results = []
+    for score, category, icon_name, style_name in matches:
+        if score < similarity_threshold:
+            continue
+        try:
+            info = MATERIAL_ICONS_DB[category][icon_name][style_name]
+        except KeyError:
+            continue  # atlas gerado a partir de um catálogo diferente
+        results.append({
+            'category': category,
+            'name': icon_name,
+            'style': style_name,
+            'similarity': round(score, 3),
+            'path': info['path'],
+            'hash': info['hash']
+        })
+    
+    return results
+
+
 def analyze_icon_against_material_design(image_asset):
     """
     Analisa um ícone do app contra os padrões do Material Design
@@ -272,9 +430,7 @@ def analyze_icon_against_material_design(image_asset):
         return None
     
     # Carrega ícones se necessário
-    if not MATERIAL_ICONS_DB:
-        if not load_icons_cache():
-            load_material_icons()
+    ensure_material_icons_loaded()
     
     analysis = {
         'follows_material_guidelines': False,
@@ -319,28 +475,83 @@ def analyze_icon_against_material_design(image_asset):
     return analysis
 
 
-def analyze_aia_file(aia_file):
+def analyze_aia_file(aia_file, profile=None):
     """
     Extract and analyze images from an .aia file
     .aia files are ZIP archives containing App Inventor project files
+    
+    Cada execução é registrada em AnalysisRun, com o tempo de cada etapa,
+    e nas métricas de /metrics (analyzer/metrics.py). Os logs emitidos durante
+    a análise levam o id do AnalysisRun (analyzer/logs.py).
+    
+    Args:
+        profile: True grava o perfil de CPU/memória desta análise no AnalysisRun;
+                 None segue settings.ANALYSIS_PROFILING (ver profiling.py)
     """
+    run = AnalysisRun.objects.create(aia_file=aia_file)
+    started = time.perf_counter()
+    ANALYSES_IN_PROGRESS.inc()
+    
+    if profile is None and is_profiling_enabled():
+        profiler, profile_min_ms = AnalysisProfiler(), getattr(settings, 'ANALYSIS_PROFILE_MIN_MS', 0)
+    elif profile:
+        profiler, profile_min_ms = AnalysisProfiler(), 0
+    else:
+        profiler = None
+    
+    with analysis_log_context(run.pk, aia_file.pk), record_trace() as trace:
+        try:
+            if profiler is not None and not profiler.start():
+                profiler = None  # outra análise já está sendo perfilada
+            _analyze_aia_file(aia_file)
+        except Exception as e:
+            run.status = 'error'
+            run.error = str(e)
+            raise
+        else:
+            run.status = 'ok'
+        finally:
+            if profiler is not None:
+                profiler.stop()
+            ANALYSES_IN_PROGRESS.dec()
+            run.duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            run.timings = trace.as_dict() if trace is not None else {}
+            update_fields = ['status', 'error', 'duration_ms', 'timings']
+            if profiler is not None and profiler.save(run, profile_min_ms):
+                update_fields += ['profile_stats', 'memory_report']
+            run.save(update_fields=update_fields)
+            record_analysis_run(run, aia_file)
+    
+    return run
+
+
+def _analyze_aia_file(aia_file):
+    """Etapas da análise (ver analyze_aia_file)"""
     
     # Create temporary directory for extraction
     with tempfile.TemporaryDirectory() as temp_dir:
         # Extract .aia file (it's a ZIP)
-        with zipfile.ZipFile(aia_file.file.path, 'r') as zip_ref:
+        with span('extraction'), zipfile.ZipFile(aia_file.file.path, 'r') as zip_ref:
             zip_ref.extractall(temp_dir)
         
         # Find and process images
         image_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp']
         image_count = 0
         icon_count = 0
+        assets = []
+        
+        # Estado anterior, usado para atualizar as estatísticas do dashboard
+        was_analyzed = aia_file.is_analyzed
+        previous_images = aia_file.total_images
         
-        # Clear existing images for this file
-        aia_file.images.all().delete()
+        # Imagens da análise anterior: só são excluídas junto com a gravação do novo
+        # resultado, para que uma falha no meio não deixe os contadores divergentes
+        previous_assets = list(aia_file.images.values_list('pk', flat=True))
         
         # Analyze layout and spacing from .scm files
+        # (na mesma passada: grafo de referências dos assets, ver asset_graph.py)
         layout_analysis = analyze_layout_and_spacing(temp_dir)
+        asset_uses = group_by_asset(layout_analysis['asset_references'])
         
         # Walk through extracted files
         for root, dirs, files in os.walk(temp_dir):
@@ -350,92 +561,168 @@ def analyze_aia_file(aia_file):
                 
                 if file_ext in image_extensions:
                     try:
+                        relative_path = os.path.relpath(file_path, temp_dir)
+                        # Referências só valem para a pasta assets/ (a única que os componentes acessam)
+                        in_assets = os.path.dirname(relative_path) == ASSETS_DIR
+                        uses = asset_uses.get(file, []) if in_assets else None
+                        
                         # Process the image
                         image_asset = process_image_file(
                             file_path, 
                             file, 
                             aia_file, 
-                            os.path.relpath(file_path, temp_dir)
+                            relative_path,
+                            uses,
                         )
                         
                         if image_asset:
                             image_count += 1
-                            if is_icon(file, image_asset):
+                            assets.append(image_asset)
+                            if is_icon(file, image_asset, uses):
                                 icon_count += 1
                                 image_asset.asset_type = 'icon'
                                 image_asset.save()
                     
                     except Exception as e:
-                        print(f"Error processing image {file}: {str(e)}")
+                        logger.warning('Erro ao processar a imagem %s: %s', file, e)
                         continue
         
+        # Memória dos bitmaps de cada tela: referências dos .scm × dimensões das imagens
+        memory_analysis = analyze_memory_footprint(layout_analysis['asset_references'], assets)
+        
         # Update file analysis status
         aia_file.total_images = image_count
         aia_file.total_icons = icon_count
         aia_file.is_analyzed = True
         aia_file.analysis_completed_at = timezone.now()
-        aia_file.save()
+        with span('save'), transaction.atomic():
+            with span('cleanup'):
+                ImageAsset.objects.filter(pk__in=previous_assets).delete()
+                aia_file.asset_references.all().delete()
+            aia_file.save()
+            DashboardStats.record_analysis(aia_file, was_analyzed, previous_images)
+            save_asset_references(aia_file, layout_analysis['asset_references'], assets)
         
         # Tarefa 4.1: Analisar consistência de estilo dos ícones Material Design
         icon_analysis = analyze_icon_style_consistency(aia_file)
         
         # Generate usability evaluation with layout analysis and icon analysis
-        generate_usability_evaluation(aia_file, layout_analysis, icon_analysis)
+        generate_usability_evaluation(aia_file, layout_analysis, icon_analysis, memory_analysis)
 
 
-def process_image_file(file_path, filename, aia_file, relative_path):
-    """Process a single image file and create ImageAsset record"""
+@timed('images')
+def process_image_file(file_path, filename, aia_file, relative_path, uses=None):
+    """
+    Process a single image file and create ImageAsset record
+    
+    Args:
+        uses: AssetUse que apontam para a imagem (asset_graph.py); None se o uso
+              não é conhecido (imagem fora de assets/)
+    """
     
     try:
-        with Image.open(file_path) as img:
-            # Get image properties
-            width, height = img.size
-            format_name = img.format or 'UNKNOWN'
-            file_size = os.path.getsize(file_path)
-            
-            # Create ImageAsset record
-            image_asset = ImageAsset(
-                aia_file=aia_file,
-                name=filename,
-                original_path=relative_path,
-                width=width,
-                height=height,
-                file_size=file_size,
-                format=format_name
-            )
-            
-            # Copy image to media directory
+        # Formato e dimensões lidos do cabeçalho (image_probe.py), sem decodificar a imagem
+        with span('probe'):
             with open(file_path, 'rb') as f:
-                image_content = ContentFile(f.read())
-                image_asset.extracted_file.save(
-                    f"{aia_file.id}_{filename}",
-                    image_content,
-                    save=False
-                )
-            
-            # Analyze image quality
-            analyze_image_quality(image_asset, img)
-            
-            # Determine asset type
-            image_asset.asset_type = determine_asset_type(filename, width, height)
-            
-            # Tarefa 4.1: Verificar se é um ícone Material Design e identificar estilo
-            if image_asset.asset_type == 'icon':
+                data = f.read()
+            info = probe_image(data)
+            if info is None:
+                # Formato sem leitura de cabeçalho: o PIL identifica (abertura preguiçosa)
+                with Image.open(io.BytesIO(data)) as img:
+                    info = ImageInfo(img.format or 'UNKNOWN', *img.size)
+        
+        # Create ImageAsset record
+        image_asset = ImageAsset(
+            aia_file=aia_file,
+            name=filename,
+            original_path=relative_path,
+            width=info.width,
+            height=info.height,
+            file_size=len(data),
+            format=info.format
+        )
+        
+        # GIFs: quadros e duração lidos da estrutura de blocos, sem decodificar
+        if info.format == 'GIF':
+            with span('gif_frames'):
+                set_animation_stats(image_asset, analyze_gif(data))
+        
+        # Copy image to media directory
+        with span('media_copy'):
+            image_asset.extracted_file.save(
+                f"{aia_file.id}_{filename}",
+                ContentFile(data),
+                save=False
+            )
+        
+        # Analyze image quality
+        with span('quality'):
+            analyze_image_quality(image_asset, info)
+        
+        # Hash perceptual para o índice de imagens repetidas entre projetos
+        # (única etapa que precisa dos pixels: decodifica só uma versão reduzida).
+        # Imagem com o corpo corrompido (ex.: PNG truncado) fica sem hash, mas é analisada
+        try:
+            with span('decode_hash'):
+                set_perceptual_hash(image_asset, load_reduced(data, HASH_MAX_SIZE))
+        except Exception as e:
+            logger.warning('Hash perceptual de %s não calculado: %s', filename, e)
+        
+        # Tipo pelo uso real nas telas; sem uso no Designer, estimado pelo nome e tamanho
+        if uses is not None:
+            image_asset.is_referenced = bool(uses)
+        image_asset.asset_type = (
+            usage_asset_type(uses or [], info.width, info.height)
+            or determine_asset_type(filename, info.width, info.height)
+        )
+        
+        # Tarefa 4.1: Verificar se é um ícone Material Design e identificar estilo
+        if image_asset.asset_type == 'icon':
+            with span('material_lookup'):
                 material_style = identify_material_icon(image_asset)
-                if material_style:
-                    image_asset.is_material_icon = True
-                    image_asset.material_icon_style = material_style
-                else:
-                    image_asset.is_material_icon = False
-            
+            if material_style:
+                image_asset.is_material_icon = True
+                image_asset.material_icon_style = material_style
+            else:
+                image_asset.is_material_icon = False
+        
+        with span('save'):
             image_asset.save()
-            return image_asset
+        return image_asset
             
     except Exception as e:
-        print(f"Error processing image {filename}: {str(e)}")
+        logger.warning('Erro ao processar a imagem %s: %s', filename, e)
         return None
 
 
+def set_animation_stats(image_asset, stats):
+    """Copia as métricas de analyze_gif para o asset (GIFs de um quadro ficam como estáticos)"""
+    image_asset.frame_count = max(stats['frame_count'], 1)
+    if stats['frame_count'] > 1:
+        image_asset.animation_duration_ms = stats['duration_ms']
+        image_asset.animation_decoded_bytes = stats['decoded_bytes_all_frames']
+
+
+def animation_issues(asset):
+    """
+    Motivos pelos quais uma animação deve engasgar no aparelho
+
+    Returns:
+        lista de mensagens (vazia para imagens estáticas ou animações leves)
+    """
+    if asset.frame_count <= 1:
+        return []
+    issues = []
+    max_frames = getattr(settings, 'GIF_MAX_FRAMES', 100)
+    if asset.frame_count > max_frames:
+        issues.append(f'{asset.frame_count} quadros (acima de {max_frames})')
+    max_decoded_mb = getattr(settings, 'GIF_MAX_DECODED_MB', 32)
+    decoded_mb = (asset.animation_decoded_bytes or 0) / 1024 / 1024
+    if decoded_mb > max_decoded_mb:
+        issues.append(f'{decoded_mb:.1f}MB decodificados (acima de {max_decoded_mb:g}MB)')
+    return issues
+
+
 def calculate_asset_quality_score(asset):
     """
     Calcula uma pontuação de qualidade de 0 a 100 para um único asset (imagem ou ícone).
@@ -505,7 +792,10 @@ def calculate_asset_quality_score(asset):
         # Se não for um ícone, este critério não se aplica, então damos os pontos
         score += 10
 
-    return min(round(score), max_score)  # Garante que a nota não passe de 100
+    # Penalidade: animações com quadros ou memória acima dos limites (GIF_MAX_*)
+    score -= 15 * len(animation_issues(asset))
+
+    return max(0, min(round(score), max_score))  # Garante que a nota fique entre 0 e 100
 
 
 def calculate_overall_scores(assets):
@@ -520,6 +810,10 @@ def calculate_overall_scores(assets):
             "icon_quality_score": 100,
         }
     
+    # Assets que nenhuma tela usa só aumentam o APK: ficam fora das médias
+    # (e viram um problema 'unused' no relatório)
+    assets = [asset for asset in assets if asset.is_referenced is not False] or assets
+    
     # Separa assets por tipo
     image_assets = [asset for asset in assets if asset.asset_type in ['image', 'background', 'button', 'other']]
     icon_assets = [asset for asset in assets if asset.asset_type == 'icon']
@@ -608,44 +902,74 @@ def determine_asset_type(filename, width, height):
     return 'image'
 
 
-def is_icon(filename, image_asset):
+def is_icon(filename, image_asset, uses=None):
     """Determine if an image is likely an icon"""
+    # Usada no Designer: o tipo já veio do uso (usage_asset_type), sem estimativa por tamanho
+    if uses and usage_asset_type(uses, image_asset.width, image_asset.height) is not None:
+        return image_asset.asset_type == 'icon'
     return image_asset.asset_type == 'icon' or \
            (image_asset.width <= 128 and image_asset.height <= 128)
 
 
-def generate_usability_evaluation(aia_file, layout_analysis=None, icon_analysis=None):
+def save_asset_references(aia_file, references, assets):
+    """Grava o grafo de referências (AssetReference), ligando cada uso ao seu ImageAsset"""
+    by_name = {asset.name: asset for asset in assets if asset.original_path.startswith(ASSETS_DIR + os.sep)}
+    AssetReference.objects.bulk_create([
+        AssetReference(
+            aia_file=aia_file,
+            image_asset=by_name.get(use.asset),
+            asset_name=use.asset,
+            screen=use.screen,
+            component=use.component,
+            component_type=use.component_type,
+            property=use.property,
+            source=use.source,
+        )
+        for use in references
+    ])
+
+
+NO_ASSETS_RECOMMENDATION = '• ✨ Projeto sem assets visuais - nenhum problema detectado.'
+
+
+@timed('report')
+def generate_usability_evaluation(aia_file, layout_analysis=None, icon_analysis=None, memory_analysis=None):
     """Generate comprehensive usability evaluation for the app using new granular scoring"""
     
-    images = aia_file.images.all()
+    # Uma única consulta: as métricas abaixo são calculadas em memória
+    images = list(aia_file.images.all())
     
-    if not images.exists():
+    if not images:
         # Se não há imagens, cria avaliação com scores máximos
-        recommendations = ['• ✨ Projeto sem assets visuais - nenhum problema detectado.']
+        recommendations = [NO_ASSETS_RECOMMENDATION]
+        
+        sections = []
         
         # Adicionar recomendações de layout se disponível
         if layout_analysis:
             layout_recommendations = generate_layout_recommendations(layout_analysis)
             recommendations.extend(layout_recommendations)
+            sections.append(('layout', '\n'.join(layout_recommendations)))
         
         # Adicionar recomendações de ícones se disponível
         if icon_analysis and icon_analysis.get('issues'):
             recommendations.append('\n🎨 **Análise de Ícones Material Design:**')
             recommendations.extend(icon_analysis['issues'])
-        
-        evaluation, created = UsabilityEvaluation.objects.get_or_create(
-            aia_file=aia_file,
-            defaults={
-                'image_quality_score': 100,
-                'icon_quality_score': 100,
-                'overall_usability_score': 100,
-                'high_quality_images_count': 0,
-                'low_quality_images_count': 0,
-                'oversized_images_count': 0,
-                'undersized_images_count': 0,
-                'recommendations': '\n'.join(recommendations),
-            }
-        )
+            sections.append(('icon_consistency', '\n'.join(icon_analysis['issues'])))
+        
+        evaluation = save_usability_evaluation(aia_file, {
+            'image_quality_score': 100,
+            'icon_quality_score': 100,
+            'overall_usability_score': 100,
+            'high_quality_images_count': 0,
+            'low_quality_images_count': 0,
+            'oversized_images_count': 0,
+            'undersized_images_count': 0,
+            'recommendations': '\n'.join(recommendations),
+        })
+        # Só o resumo: layout e ícones já estão nas próprias seções
+        sections.append(('recommendations', NO_ASSETS_RECOMMENDATION))
+        save_structured_report(evaluation, sections, collect_findings([], layout_analysis, icon_analysis))
         return
     
     # Calcula scores usando a nova lógica granular
@@ -659,62 +983,115 @@ def generate_usability_evaluation(aia_file, layout_analysis=None, icon_analysis=
         scores['overall_score'] = (scores['image_quality_score'] + scores['icon_quality_score']) / 2
     
     # Calculate detailed metrics
-    total_images = images.count()
-    high_quality_count = images.filter(quality_rating__in=['high', 'excellent']).count()
-    low_quality_count = images.filter(quality_rating='low').count()
-    oversized_count = images.filter(file_size__gt=1024*1024).count()  # > 1MB
-    undersized_count = images.filter(width__lt=100, height__lt=100).count()
+    total_images = len(images)
+    high_quality_count = sum(1 for image in images if image.quality_rating in ('high', 'excellent'))
+    low_quality_count = sum(1 for image in images if image.quality_rating == 'low')
+    oversized_count = sum(1 for image in images if image.file_size > 1024*1024)  # > 1MB
+    undersized_count = sum(1 for image in images if image.width < 100 and image.height < 100)
     
     # Generate comprehensive usability report
-    recommendations = generate_comprehensive_usability_report(aia_file, images, scores, layout_analysis, icon_analysis)
+    with span('text'):
+        sections = generate_analysis_sections(images, scores, layout_analysis, icon_analysis, memory_analysis)
+        recommendations = generate_comprehensive_usability_report(
+            aia_file, images, scores, layout_analysis, icon_analysis, analysis_sections=sections
+        )
     
     # Adicionar recomendações de layout se disponível
     if layout_analysis:
         layout_recommendations = generate_layout_recommendations(layout_analysis)
         if layout_recommendations:
             recommendations += '\n\n🏗️ **Análise de Layout e Interface:**\n' + '\n'.join(layout_recommendations)
+            sections.append(('layout', '\n'.join(layout_recommendations)))
     
     # Adicionar recomendações de ícones se disponível
     if icon_analysis and icon_analysis.get('issues'):
         recommendations += '\n\n🎨 **Análise de Consistência de Ícones:**\n' + '\n'.join(icon_analysis['issues'])
+        sections.append(('icon_consistency', '\n'.join(icon_analysis['issues'])))
     
     # === ADICIONAR ANÁLISE DA IA ===
-    enhanced_recs = generate_detailed_recommendations(aia_file, images, scores)
+    with span('recommendations'):
+        enhanced_recs = generate_detailed_recommendations(aia_file, images, scores)
     if enhanced_recs and enhanced_recs != '\n'.join([]):
         recommendations = enhanced_recs
     
     # Create or update evaluation
-    evaluation, created = UsabilityEvaluation.objects.get_or_create(
-        aia_file=aia_file,
-        defaults={
-            'image_quality_score': scores['image_quality_score'],
-            'icon_quality_score': scores['icon_quality_score'],
-            'overall_usability_score': scores['overall_score'],
-            'high_quality_images_count': high_quality_count,
-            'low_quality_images_count': low_quality_count,
-            'oversized_images_count': oversized_count,
-            'undersized_images_count': undersized_count,
-            'recommendations': recommendations,
-        }
-    )
+    evaluation = save_usability_evaluation(aia_file, {
+        'image_quality_score': scores['image_quality_score'],
+        'icon_quality_score': scores['icon_quality_score'],
+        'overall_usability_score': scores['overall_score'],
+        'high_quality_images_count': high_quality_count,
+        'low_quality_images_count': low_quality_count,
+        'oversized_images_count': oversized_count,
+        'undersized_images_count': undersized_count,
+        'recommendations': recommendations,
+    })
+    
+    # Seções e problemas em tabelas próprias (consultas por seção e entre projetos).
+    # A seção de recomendações guarda só a lista de ações, não o relatório inteiro
+    sections.append(('recommendations', enhanced_recs))
+    with span('structured'):
+        save_structured_report(
+            evaluation, sections, collect_findings(images, layout_analysis, icon_analysis, memory_analysis),
+        )
+
+
+def save_usability_evaluation(aia_file, fields):
+    """
+    Cria ou atualiza a UsabilityEvaluation do projeto com os campos calculados
     
+    Na reanálise, a avaliação existente recebe os novos valores e um novo
+    evaluated_at, e o HTML renderizado da versão anterior é descartado.
+    """
+    evaluation, created = UsabilityEvaluation.objects.get_or_create(aia_file=aia_file, defaults=fields)
     if not created:
-        # Update existing evaluation
-        evaluation.image_quality_score = scores['image_quality_score']
-        evaluation.icon_quality_score = scores['icon_quality_score']
-        evaluation.overall_usability_score = scores['overall_score']
-        evaluation.high_quality_images_count = high_quality_count
-        evaluation.low_quality_images_count = low_quality_count
-        evaluation.oversized_images_count = oversized_count
-        evaluation.undersized_images_count = undersized_count
-        evaluation.recommendations = recommendations
+        for field, value in fields.items():
+            setattr(evaluation, field, value)
+        # Nova versão do relatório: descarta o HTML renderizado da anterior
+        invalidate_report_cache(evaluation)
+        evaluation.evaluated_at = timezone.now()
         evaluation.save()
+    return evaluation
+
+
+def generate_analysis_sections(images, scores, layout_analysis=None, icon_analysis=None, memory_analysis=None):
+    """
+    Seções de análise por categoria (imagens, ícones, análise acadêmica e desempenho)
+    
+    Returns:
+        [(chave, texto), ...] na ordem do relatório, apenas as seções aplicáveis
+    """
+    sections = []
+    
+    # Análise de Imagens
+    image_assets = [asset for asset in images if asset.asset_type in ['image', 'background', 'button', 'other']]
+    if image_assets:
+        sections.append(('images', generate_image_quality_analysis(image_assets, scores['image_quality_score'])))
+    
+    # Análise de Ícones
+    icon_assets = [asset for asset in images if asset.asset_type == 'icon']
+    if icon_assets:
+        sections.append(('icons', generate_icon_quality_analysis(icon_assets, scores['icon_quality_score'], icon_analysis)))
+    
+    # === ANÁLISE ACADÊMICA (LAYOUT, TIPOGRAFIA, CORES) ===
+    if layout_analysis:
+        sections.append(('academic', generate_academic_analysis_report(layout_analysis)))
+    
+    # Memória de imagens por tela (memory_footprint.py) e assets sem uso
+    unused_assets = [asset for asset in images if asset.is_referenced is False]
+    if (memory_analysis and memory_analysis['screens']) or unused_assets:
+        sections.append(('performance', generate_performance_report(memory_analysis, unused_assets)))
+    
+    return sections
 
 
-def generate_comprehensive_usability_report(aia_file, images, scores, layout_analysis=None, icon_analysis=None):
+def generate_comprehensive_usability_report(aia_file, images, scores, layout_analysis=None, icon_analysis=None,
+                                            analysis_sections=None):
     """
     Gera um relatório completo de análise de usabilidade explicando cada pontuação
     e critério de avaliação utilizado
+    
+    Args:
+        analysis_sections: resultado de generate_analysis_sections, se já calculado
     """
     report_sections = []
     
@@ -723,7 +1100,7 @@ def generate_comprehensive_usability_report(aia_file, images, scores, layout_ana
 📊 **RELATÓRIO DE ANÁLISE DE USABILIDADE**
 Arquivo: {aia_file.name}
 Data da Análise: {timezone.now().strftime('%d/%m/%Y às %H:%M')}
-Total de Assets Analisados: {images.count() if hasattr(images, 'count') else len(images)}
+Total de Assets Analisados: {len(images)}
 
 ═══════════════════════════════════════════════════════════════
 """)
@@ -758,30 +1135,20 @@ Total de Assets Analisados: {images.count() if hasattr(images, 'count') else len
 """)
 
     # === ANÁLISE DETALHADA POR CATEGORIA ===
-    
-    # Análise de Imagens
-    image_assets = [asset for asset in images if asset.asset_type in ['image', 'background', 'button', 'other']]
-    if image_assets:
-        report_sections.append(generate_image_quality_analysis(image_assets, scores['image_quality_score']))
-    
-    # Análise de Ícones
-    icon_assets = [asset for asset in images if asset.asset_type == 'icon']
-    if icon_assets:
-        report_sections.append(generate_icon_quality_analysis(icon_assets, scores['icon_quality_score'], icon_analysis))
-    
-    # === ANÁLISE ACADÊMICA (LAYOUT, TIPOGRAFIA, CORES) ===
-    if layout_analysis:
-        report_sections.append(generate_academic_analysis_report(layout_analysis))
+    if analysis_sections is None:
+        analysis_sections = generate_analysis_sections(images, scores, layout_analysis, icon_analysis)
+    report_sections.extend(text for _, text in analysis_sections)
     
     # === RECOMENDAÇÕES ESPECÍFICAS ===
     # Gerar recomendações inteligentes com IA
-    if AI_FEEDBACK_AVAILABLE:
+    if ai_feedback.try_load() is not None:
         # Usar sistema de IA para feedback contextual e personalizado
         try:
             project_name = aia_file.name if hasattr(aia_file, 'name') else ""
-            recommendations = generate_ai_enhanced_feedback(aia_file, images, scores, project_name)
+            with span('ai_feedback'):
+                recommendations = ai_feedback.generate_ai_enhanced_feedback(aia_file, images, scores, project_name)
         except Exception as e:
-            print(f"⚠️ Erro no sistema de IA: {e}. Usando feedback básico.")
+            logger.warning('Erro no sistema de IA: %s. Usando feedback básico.', e)
             recommendations = generate_detailed_recommendations(aia_file, images, scores)
     else:
         # Usar sistema básico de recomendações
@@ -798,7 +1165,7 @@ Total de Assets Analisados: {images.count() if hasattr(images, 'count') else len
 ═══════════════════════════════════════════════════════════════
 
 ✅ **RESUMO EXECUTIVO:**
-Este relatório avaliou {images.count() if hasattr(images, 'count') else len(images)} asset(s) usando critérios acadêmicos baseados em:
+Este relatório avaliou {len(images)} asset(s) usando critérios acadêmicos baseados em:
 • Resolução e otimização de arquivos (40% da nota)
 • Proporções adequadas para dispositivos móveis (30% da nota)  
 • Consistência visual e padrões de design (30% da nota)
@@ -1062,10 +1429,10 @@ def generate_detailed_recommendations(aia_file, images, scores):
         recommendations.append("✨ **Perfeito!** Nenhum problema detectado nos assets visuais.")
     
     # Tentar primeiro análise com Gemini AI (mais avançada)
-    if GEMINI_AI_AVAILABLE:
+    if is_gemini_enabled() and gemini_ai.try_load() is not None:
         try:
             project_name = aia_file.name if hasattr(aia_file, 'name') else ""
-            gemini_result = analyze_with_gemini_ai(aia_file, images, scores, project_name)
+            gemini_result = gemini_ai.analyze_with_gemini_ai(aia_file, images, scores, project_name)
             
             if gemini_result.get('ai_powered', False):
                 # COMBINAR recomendações tradicionais COM análise da IA
@@ -1126,22 +1493,24 @@ def generate_detailed_recommendations(aia_file, images, scores):
                 return '\n'.join(enhanced_recs)
                 
         except Exception as e:
-            print(f"⚠️ Erro na análise Gemini AI: {e}")
+            logger.warning('Erro na análise Gemini AI: %s', e)
     
     # Fallback para IA básica se Gemini não funcionar
-    if AI_FEEDBACK_AVAILABLE:
+    if ai_feedback.try_load() is not None:
         try:
             project_name = aia_file.name if hasattr(aia_file, 'name') else ""
-            enhanced_recommendations = enhance_existing_recommendations(
-                recommendations, aia_file, images, scores
-            )
+            with span('ai_feedback'):
+                enhanced_recommendations = ai_feedback.enhance_existing_recommendations(
+                    recommendations, aia_file, images, scores
+                )
             return '\n'.join(enhanced_recommendations)
         except Exception as e:
-            print(f"⚠️ Erro ao aprimorar recomendações com IA: {e}")
+            logger.warning('Erro ao aprimorar recomendações com IA: %s', e)
     
     return '\n'.join(recommendations)
 
 
+@timed('layout')
 def analyze_layout_and_spacing(temp_dir):
     """
     Analisa layout e espaçamento de todos os screens do App Inventor
@@ -1151,6 +1520,8 @@ def analyze_layout_and_spacing(temp_dir):
     typography_issues = []
     screens_analyzed = 0
     all_components = []  # Para análise de tipografia
+    asset_names = list_asset_names(temp_dir)
+    asset_references = []  # Grafo de referências dos assets (asset_graph.py)
     
     # Encontrar todos os arquivos .scm
     for root, dirs, files in os.walk(temp_dir):
@@ -1160,13 +1531,19 @@ def analyze_layout_and_spacing(temp_dir):
                 screen_name = os.path.splitext(file)[0]
                 
                 try:
-                    screen_data = parse_scm_file(file_path)
+                    with span('scm_parse'):
+                        screen_data = parse_scm_file(file_path)
                     if screen_data:
                         screens_analyzed += 1
                         
                         # Coletar todos os componentes para análise de tipografia
                         components = extract_all_components(screen_data)
                         all_components.extend(components)
+                        asset_references.extend(collect_designer_references(screen_name, screen_data, asset_names))
+                        blocks_path = os.path.join(root, screen_name + '.bky')
+                        if asset_names and os.path.exists(blocks_path):
+                            with open(blocks_path, 'r', encoding='utf-8', errors='replace') as f:
+                                asset_references.extend(collect_block_references(screen_name, f.read(), asset_names))
                         
                         # Verificar margens da tela
                         if not check_screen_margins(screen_data):
@@ -1177,20 +1554,24 @@ def analyze_layout_and_spacing(temp_dir):
                             layout_issues.append(f"Screen {screen_name}: Espaçamento inadequado entre elementos")
                             
                 except Exception as e:
-                    print(f"Erro ao analisar {file}: {str(e)}")
+                    logger.warning('Erro ao analisar %s: %s', file, e)
                     continue
     
     # Análise de tipografia em todos os componentes
-    typography_analysis = analyze_typography(all_components)
+    with span('typography'):
+        typography_analysis = analyze_typography(all_components)
     
     # Análise de cores em todos os componentes
-    color_analysis = analyze_colors(all_components)
+    with span('colors'):
+        color_analysis = analyze_colors(all_components)
     
     return {
         'screens_analyzed': screens_analyzed,
         'layout_issues': layout_issues,
         'typography_issues': typography_analysis.get('issues', []),
         'color_issues': color_analysis.get('issues', []),
+        'contrast_issues': color_analysis.get('contrast_issues', []),
+        'saturation_issues': color_analysis.get('saturation_issues', []),
         'has_margin_issues': any('margens' in issue for issue in layout_issues),
         'has_spacing_issues': any('espaçamento' in issue for issue in layout_issues),
         'has_font_issues': typography_analysis.get('has_font_issues', False),
@@ -1198,7 +1579,8 @@ def analyze_layout_and_spacing(temp_dir):
         'has_contrast_issues': color_analysis.get('has_contrast_issues', False),
         'has_saturation_issues': color_analysis.get('has_saturation_issues', False),
         'typography_stats': typography_analysis.get('stats', {}),
-        'color_stats': color_analysis.get('stats', {})
+        'color_stats': color_analysis.get('stats', {}),
+        'asset_references': asset_references,
     }
 
 
@@ -1221,7 +1603,7 @@ def parse_scm_file(file_path):
         return json.loads(json_content)
         
     except Exception as e:
-        print(f"Erro ao parsear arquivo SCM {file_path}: {str(e)}")
+        logger.warning('Erro ao parsear arquivo SCM %s: %s', file_path, e)
         return None
 
 
@@ -1266,7 +1648,7 @@ def check_screen_margins(screen_data):
         return False
         
     except Exception as e:
-        print(f"Erro ao verificar margens: {str(e)}")
+        logger.warning('Erro ao verificar margens: %s', e)
         return True  # Em caso de erro, não penalizar
 
 
@@ -1367,7 +1749,7 @@ def check_element_spacing(screen_data):
         return spacing_found >= (required_spacers * 0.5)
         
     except Exception as e:
-        print(f"Erro ao verificar espaçamento: {str(e)}")
+        logger.warning('Erro ao verificar espaçamento: %s', e)
         return True  # Em caso de erro, não penalizar
 
 
@@ -1554,7 +1936,7 @@ def extract_all_components(screen_data):
         extract_recursive(components)
         
     except Exception as e:
-        print(f"Erro ao extrair componentes: {str(e)}")
+        logger.warning('Erro ao extrair componentes: %s', e)
     
     return all_components
 
@@ -1686,9 +2068,11 @@ def analyze_colors(all_components):
     Análise de cores de todos os componentes do projeto
     Implementa as Tarefas 3.1 e 3.2 baseadas em Solecki (2020)
     """
-    if not COLOR_ANALYSIS_AVAILABLE:
+    if not is_color_analysis_available():
         return {
             'issues': ['⚠️ Análise de cores não disponível - bibliotecas não instaladas'],
+            'contrast_issues': [],
+            'saturation_issues': [],
             'has_contrast_issues': False,
             'has_saturation_issues': False,
             'stats': {}
@@ -1738,6 +2122,8 @@ def analyze_colors(all_components):
     
     return {
         'issues': all_issues,
+        'contrast_issues': contrast_issues,
+        'saturation_issues': saturation_issues,
         'has_contrast_issues': len(contrast_issues) > 0,
         'has_saturation_issues': len(saturation_issues) > 0,
         'stats': {
@@ -1757,7 +2143,7 @@ def check_color_contrast(contrast_pairs):
     """
     issues = []
     
-    if not COLOR_ANALYSIS_AVAILABLE:
+    if not is_color_analysis_available():
         return {'issues': ['Verificação de contraste não disponível']}
     
     for pair in contrast_pairs:
@@ -1785,7 +2171,7 @@ def check_color_contrast(contrast_pairs):
                     )
                 
         except Exception as e:
-            print(f"Erro ao calcular contraste para {component_name}: {str(e)}")
+            logger.warning('Erro ao calcular contraste para %s: %s', component_name, e)
             continue
     
     return {'issues': issues}
@@ -1799,7 +2185,7 @@ def check_color_saturation(colors_list):
     issues = []
     neon_colors = []
     
-    if not COLOR_ANALYSIS_AVAILABLE:
+    if not is_color_analysis_available():
         return {'issues': ['Verificação de saturação não disponível']}
     
     for color_hex in colors_list:
@@ -1826,7 +2212,7 @@ def check_color_saturation(colors_list):
                 })
                 
         except Exception as e:
-            print(f"Erro ao analisar saturação da cor {color_hex}: {str(e)}")
+            logger.warning('Erro ao analisar saturação da cor %s: %s', color_hex, e)
             continue
     
     if neon_colors:
@@ -1898,52 +2284,28 @@ def identify_material_icon(image_asset):
     Retorna o estilo do ícone (filled, outlined, round, sharp, twotone) ou None
     """
     try:
-        # Carrega a imagem para análise
-        with Image.open(image_asset.extracted_file.path) as img:
-            # Convert to RGB if necessary
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Calcular hash da imagem para comparação
-            img_hash = calculate_image_hash(img)
-            
-            # Verificar se é um ícone Material Design comparando com a base de dados
-            for category_name, icons in MATERIAL_ICONS_DB.items():
-                for icon_name, styles in icons.items():
-                    for style_name, icon_data in styles.items():
-                        # Comparar hash ou similaridade visual
-                        if is_similar_to_material_icon(img, icon_data, img_hash):
-                            return style_name
-            
+        # A comparação usa apenas as dimensões, já lidas do cabeçalho na criação do
+        # asset: a imagem não é decodificada (nem convertida para RGB) aqui
+        info = ImageInfo(image_asset.format, image_asset.width, image_asset.height)
+        img_hash = None
+        
+        # A comparação atual depende só do tamanho: fora dos tamanhos padrão nenhum
+        # ícone do catálogo coincide, então a varredura (~50 mil estilos) é evitada
+        if not is_standard_icon_size(info.size):
             return None
-            
-    except Exception as e:
-        print(f"Erro ao identificar ícone Material Design para {image_asset.name}: {str(e)}")
-        return None
-
-
-def calculate_image_hash(img):
-    """
-    Calcula um hash simples da imagem para comparação
-    """
-    try:
-        # Redimensiona para 8x8 para comparação rápida
-        img_small = img.resize((8, 8), Image.Resampling.LANCZOS)
-        
-        # Converte para escala de cinza
-        img_gray = img_small.convert('L')
         
-        # Calcula a média dos pixels
-        pixels = list(img_gray.getdata())
-        avg = sum(pixels) / len(pixels)
-        
-        # Cria hash binário baseado na média
-        hash_bits = []
-        for pixel in pixels:
-            hash_bits.append('1' if pixel > avg else '0')
+        # Verificar se é um ícone Material Design comparando com a base de dados
+        for category_name, icons in MATERIAL_ICONS_DB.items():
+            for icon_name, styles in icons.items():
+                for style_name, icon_data in styles.items():
+                    # Comparar hash ou similaridade visual
+                    if is_similar_to_material_icon(info, icon_data, img_hash):
+                        return style_name
         
-        return ''.join(hash_bits)
-    except:
+        return None
+            
+    except Exception as e:
+        logger.warning('Erro ao identificar ícone Material Design para %s: %s', image_asset.name, e)
         return None
 
 
@@ -1951,17 +2313,15 @@ def is_similar_to_material_icon(img, icon_data, img_hash):
     """
     Verifica se uma imagem é similar a um ícone Material Design
     Por simplicidade, vamos usar o nome do arquivo e características básicas
+    
+    `img` pode ser uma imagem PIL ou um ImageInfo (só `size` é usado).
     """
     try:
         # Por enquanto, implementação simplificada baseada em nome e tamanho
         # Em uma implementação completa, seria necessário análise de SVG e comparação visual
         
         # Verifica se o tamanho está dentro dos padrões de ícones Material Design
-        img_size = img.size
-        standard_sizes = [16, 18, 20, 24, 32, 36, 40, 48, 56, 64, 72, 96, 128, 144, 192, 256, 512]
-        
-        # Se ambas as dimensões são iguais (quadrado) e correspondem a tamanhos padrão
-        if img_size[0] == img_size[1] and img_size[0] in standard_sizes:
+        if is_standard_icon_size(img.size):
             # Análise adicional pode ser implementada aqui
             # Por exemplo, análise de cor dominante, presença de transparência, etc.
             return True
@@ -1971,6 +2331,16 @@ def is_similar_to_material_icon(img, icon_data, img_hash):
         return False
 
 
+MATERIAL_ICON_STANDARD_SIZES = frozenset([16, 18, 20, 24, 32, 36, 40, 48, 56, 64, 72, 96, 128, 144, 192, 256, 512])
+
+
+def is_standard_icon_size(size):
+    """Ambas as dimensões iguais (quadrado) e em um tamanho padrão de ícone Material Design"""
+    width, height = size
+    return width == height and width in MATERIAL_ICON_STANDARD_SIZES
+
+
+@timed('icon_consistency')
 def analyze_icon_style_consistency(aia_file):
     """
     Tarefa 4.1: Analisar consistência de estilo dos ícones Material Design
@@ -2047,7 +2417,7 @@ def analyze_icon_style_consistency(aia_file):
         }
         
     except Exception as e:
-        print(f"Erro ao analisar consistência de estilo dos ícones: {str(e)}")
+        logger.warning('Erro ao analisar consistência de estilo dos ícones: %s', e)
         return {
             'issues': [f'Erro na análise de consistência de ícones: {str(e)}'],
             'has_style_inconsistency': False,
@@ -1,13 +1,50 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.defaultfilters import linebreaks_filter
+from django.urls import reverse
+from django.utils.cache import add_never_cache_headers, patch_cache_control
+from django.views.decorators.http import condition
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
 from django.views.generic import ListView
 from django.core.files.storage import default_storage
 from django.conf import settings
-from .models import AiaFile, ImageAsset, UsabilityEvaluation
-from .forms import AiaFileUploadForm
+from django.utils import timezone
+from django.db.models import Count, FloatField, Q
+from django.db.models.functions import Cast, NullIf, Round
+from .models import AiaFile, ImageAsset, UsabilityEvaluation, DashboardStats, Finding
+from .forms import AiaFileUploadForm, BatchUploadForm
+from .batch import (
+    ZipLimitError, create_aia_files, enqueue_batch, grade_sheet_rows, iter_zip_members, write_grade_sheet,
+)
+from .pagination import paginate_keyset
+from .image_similarity import find_similar_assets, group_by_project
+from .material_icons_search import MAX_QUERY_LENGTH, MAX_TERM_LENGTH, get_search_index, normalize_query
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, is_metrics_enabled, render_metrics
+from .report_cache import get_cached_report
+from .report_structure import RESULTS_SECTIONS, SECTION_TITLES, get_report_sections
+from .templatetags.report_filters import format_report
+from .timing import timing_rows
 from .utils import analyze_aia_file, find_similar_material_icon, analyze_icon_against_material_design
+import datetime
+import functools
+import hashlib
+import hmac
 import os
+import zipfile
+
+
+FILE_LIST_PAGE_SIZE = 24
+FILE_LIST_MAX_PAGE_SIZE = 100
+
+
+def get_file_list_page(request, page_size=FILE_LIST_PAGE_SIZE):
+    """Página da lista de arquivos (cursor em ?after= / ?before=)"""
+    queryset = AiaFile.objects.select_related('uploaded_by', 'evaluation')
+    return paginate_keyset(
+        queryset, page_size,
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
 
 
 class AiaFileListView(ListView):
@@ -15,7 +52,16 @@ class AiaFileListView(ListView):
     model = AiaFile
     template_name = 'analyzer/file_list.html'
     context_object_name = 'files'
-    ordering = ['-uploaded_at']
+    
+    def get_queryset(self):
+        # Paginação por cursor em (uploaded_at, id): custo constante em qualquer página
+        self.page = get_file_list_page(self.request)
+        return self.page.object_list
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page'] = self.page
+        return context
 
 
 def upload_file(request):
@@ -41,14 +87,74 @@ def upload_file(request):
     return render(request, 'analyzer/upload.html', {'form': form})
 
 
+def upload_batch(request):
+    """Upload de vários .aia (ou .zip com .aia); a análise fica na fila de process_batch_queue"""
+    if request.method == 'POST':
+        form = BatchUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            uploaded_by = request.user if request.user.is_authenticated else None
+            aia_files = []
+            for upload in form.cleaned_data['files']:
+                if not upload.name.lower().endswith('.zip'):
+                    aia_files += create_aia_files([(upload.name, upload)], uploaded_by)
+                    continue
+                try:
+                    with zipfile.ZipFile(upload) as archive:
+                        aia_files += create_aia_files(iter_zip_members(archive), uploaded_by)
+                except zipfile.BadZipFile:
+                    messages.error(request, f'❌ {upload.name} não é um arquivo .zip válido.')
+                except ZipLimitError as e:
+                    messages.error(request, f'❌ {upload.name} recusado: {e}')
+            
+            if aia_files:
+                ids = [aia_file.pk for aia_file in aia_files]
+                enqueue_batch(ids)
+                messages.success(request, f'📦 {len(ids)} projeto(s) enviado(s) e colocado(s) na fila de análise.')
+                return redirect(f"{reverse('batch_status')}?ids={','.join(map(str, ids))}")
+            
+            messages.error(request, 'Nenhum arquivo .aia encontrado nos arquivos enviados.')
+    else:
+        form = BatchUploadForm()
+    
+    return render(request, 'analyzer/upload_batch.html', {'form': form})
+
+
+def batch_status(request):
+    """Andamento de uma análise em lote e download da planilha de notas (?format=csv|json)"""
+    ids = [int(value) for value in request.GET.get('ids', '').split(',') if value.strip().isdigit()]
+    rows = grade_sheet_rows(ids)
+    
+    fmt = request.GET.get('format')
+    if fmt in ('csv', 'json'):
+        content_type = 'application/json' if fmt == 'json' else 'text/csv; charset=utf-8'
+        response = HttpResponse(content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="notas.{fmt}"'
+        write_grade_sheet(rows, response, fmt)
+        return response
+    
+    pending = sum(1 for row in rows if row['status'] == 'pending')
+    context = {
+        'rows': rows,
+        'ids': ','.join(str(row['id']) for row in rows),
+        'pending': pending,
+        'done': len(rows) - pending,
+    }
+    return render(request, 'analyzer/batch_status.html', context)
+
+
 def file_detail(request, pk):
     """Show details of an uploaded .aia file"""
     aia_file = get_object_or_404(AiaFile, pk=pk)
     
+    # Última execução da análise e o tempo de cada etapa
+    last_run = aia_file.analysis_runs.first()
+    
     context = {
         'aia_file': aia_file,
         'images': aia_file.images.all(),
         'evaluation': getattr(aia_file, 'evaluation', None),
+        'last_run': last_run,
+        'timing_rows': timing_rows(last_run.timings, last_run.duration_ms) if last_run and last_run.timings else [],
     }
     
     return render(request, 'analyzer/file_detail.html', context)
@@ -62,9 +168,15 @@ def analyze_file(request, pk):
         # Verifica se é uma reanálise
         is_reanalysis = aia_file.is_analyzed
         
+        # ?profile=1 (apenas staff): grava o perfil de CPU/memória desta análise (ver profiling.py)
+        profile = True if request.GET.get('profile') == '1' and request.user.is_staff else None
+        
         try:
             # Perform analysis
-            analyze_aia_file(aia_file)
+            run = analyze_aia_file(aia_file, profile=profile)
+            
+            if run.profile_stats:
+                messages.info(request, '📊 Perfil de CPU e memória salvo. Baixe-o no admin (Analysis runs).')
             
             if is_reanalysis:
                 messages.success(request, '🔄 Reanálise concluída com sucesso! Os scores foram atualizados com o novo sistema de pontuação granular.')
@@ -90,19 +202,21 @@ def analysis_results(request, pk):
         messages.warning(request, 'Este arquivo ainda não foi analisado.')
         return redirect('file_detail', pk=pk)
     
-    evaluation = get_object_or_404(UsabilityEvaluation, aia_file=aia_file)
-    images = aia_file.images.all()
+    # O texto completo das recomendações não é lido: a página usa as seções (ReportSection)
+    evaluation = get_object_or_404(UsabilityEvaluation.objects.defer('recommendations'), aia_file=aia_file)
+    # Uma única consulta; as categorias são separadas em memória
+    images = list(aia_file.images.all())
     
     # Categorize images by quality
-    high_quality_images = images.filter(quality_rating__in=['high', 'excellent'])
-    medium_quality_images = images.filter(quality_rating='medium')
-    low_quality_images = images.filter(quality_rating='low')
+    high_quality_images = [image for image in images if image.quality_rating in ('high', 'excellent')]
+    medium_quality_images = [image for image in images if image.quality_rating == 'medium']
+    low_quality_images = [image for image in images if image.quality_rating == 'low']
     
     # Group by asset type
-    icons = images.filter(asset_type='icon')
-    backgrounds = images.filter(asset_type='background')
-    buttons = images.filter(asset_type='button')
-    other_images = images.filter(asset_type__in=['image', 'other'])
+    icons = [image for image in images if image.asset_type == 'icon']
+    backgrounds = [image for image in images if image.asset_type == 'background']
+    buttons = [image for image in images if image.asset_type == 'button']
+    other_images = [image for image in images if image.asset_type in ('image', 'other')]
     
     context = {
         'aia_file': aia_file,
@@ -115,6 +229,15 @@ def analysis_results(request, pk):
         'backgrounds': backgrounds,
         'buttons': buttons,
         'other_images': other_images,
+        # Problemas da análise (tabela própria; uma única consulta)
+        'findings': list(evaluation.findings.all()),
+        # Seções já convertidas em HTML, em cache até a próxima reanálise
+        'report_sections': get_cached_report(
+            evaluation, 'results',
+            lambda: render_report_sections(
+                evaluation, RESULTS_SECTIONS, lambda text: linebreaks_filter(text, autoescape=True),
+            ),
+        ),
     }
     
     return render(request, 'analyzer/analysis_results.html', context)
@@ -122,11 +245,13 @@ def analysis_results(request, pk):
 
 def image_detail(request, pk):
     """Show detailed information about a specific image"""
-    image = get_object_or_404(ImageAsset, pk=pk)
+    image = get_object_or_404(ImageAsset.objects.select_related('aia_file'), pk=pk)
     
     context = {
         'image': image,
         'aia_file': image.aia_file,
+        # Outros projetos com a mesma imagem ou uma versão quase idêntica
+        'similar_projects': group_by_project(find_similar_assets(image)),
     }
     
     return render(request, 'analyzer/image_detail.html', context)
@@ -134,18 +259,20 @@ def image_detail(request, pk):
 
 def dashboard(request):
     """Main dashboard with statistics"""
-    total_files = AiaFile.objects.count()
-    analyzed_files = AiaFile.objects.filter(is_analyzed=True).count()
-    total_images = ImageAsset.objects.count()
+    # Contadores materializados (atualizados no envio/análise/exclusão de arquivos)
+    stats = DashboardStats.current()
     
     recent_files = AiaFile.objects.order_by('-uploaded_at')[:5]
     # Ordenar análises recentes pelo score geral em ordem decrescente (maior score primeiro)
-    recent_analyses = UsabilityEvaluation.objects.order_by('-overall_usability_score', '-evaluated_at')[:5]
+    recent_analyses = (
+        UsabilityEvaluation.objects.select_related('aia_file')
+        .order_by('-overall_usability_score', '-evaluated_at')[:5]
+    )
     
     context = {
-        'total_files': total_files,
-        'analyzed_files': analyzed_files,
-        'total_images': total_images,
+        'total_files': stats.total_files,
+        'analyzed_files': stats.analyzed_files,
+        'total_images': stats.total_images,
         'recent_files': recent_files,
         'recent_analyses': recent_analyses,
     }
@@ -174,47 +301,153 @@ def material_design_analysis(request, image_id):
     return render(request, 'analyzer/material_design_analysis.html', context)
 
 
+MATERIAL_ICONS_SEARCH_PAGE_SIZE = 20
+MATERIAL_ICONS_SEARCH_MAX_PAGE_SIZE = 100
+MATERIAL_ICONS_SEARCH_PARAMS = ('q', 'style', 'category', 'page', 'page_size')
+
+
+def _material_icons_search_etag(request):
+    """ETag da busca: versão do índice de ícones + parâmetros da consulta"""
+    index = get_search_index()
+    if index is None:
+        return None
+    params = '&'.join(f"{name}={request.GET.get(name, '')}" for name in MATERIAL_ICONS_SEARCH_PARAMS)
+    return hashlib.md5(f'{index.version}?{params}'.encode('utf-8')).hexdigest()
+
+
+def _int_param(request, name, default, minimum, maximum):
+    try:
+        value = int(request.GET.get(name, default))
+    except ValueError:
+        value = default
+    return max(minimum, min(value, maximum))
+
+
+def public_cache_on_success(max_age):
+    """
+    Cache público apenas para respostas 200/304; erros (400, 503 antes do
+    carregamento dos ícones...) saem com no-store para não ficarem em proxies
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                patch_cache_control(response, public=True, max_age=max_age)
+            else:
+                add_never_cache_headers(response)
+            return response
+        return wrapper
+    return decorator
+
+
+@public_cache_on_success(max_age=3600)
+@condition(etag_func=_material_icons_search_etag)
 def api_material_icons_search(request):
-    """API endpoint for searching Material Design icons"""
+    """
+    API endpoint for searching Material Design icons
+    
+    Parâmetros: q (obrigatório), style (filled, outlined, round, sharp, twotone),
+    category, page e page_size. Busca por prefixo e aproximada (erros de digitação).
+    """
     query = request.GET.get('q', '').strip()
     
     if not query:
         return JsonResponse({'icons': []})
     
-    # This would implement search in the Material Icons database
-    # For now, return empty results
+    # A busca aproximada custa mais a cada caractere: consultas longas são recusadas
+    if len(query) > MAX_QUERY_LENGTH or any(len(term) > MAX_TERM_LENGTH for term in normalize_query(query)):
+        return JsonResponse({
+            'error': f'Consulta muito longa (máximo de {MAX_QUERY_LENGTH} caracteres '
+                     f'e {MAX_TERM_LENGTH} por termo)',
+        }, status=400)
+    
+    index = get_search_index()
+    if index is None:
+        return JsonResponse({
+            'icons': [],
+            'query': query,
+            'message': 'Ícones Material Design não carregados. Execute: python manage.py load_material_icons'
+        }, status=503)
+    
+    style = request.GET.get('style', '').strip().lower() or None
+    category = request.GET.get('category', '').strip().lower() or None
+    page = _int_param(request, 'page', 1, 1, 10_000)
+    page_size = _int_param(
+        request, 'page_size', MATERIAL_ICONS_SEARCH_PAGE_SIZE, 1, MATERIAL_ICONS_SEARCH_MAX_PAGE_SIZE
+    )
+    
+    results = index.search(query, style=style, category=category)
+    start = (page - 1) * page_size
+    
     return JsonResponse({
-        'icons': [],
+        'icons': results[start:start + page_size],
         'query': query,
-        'message': 'Material Icons search will be implemented when icons are loaded'
+        'style': style,
+        'category': category,
+        'total': len(results),
+        'page': page,
+        'page_size': page_size,
+        'has_next': start + page_size < len(results),
     })
 
 
-def print_analysis(request, pk):
-    """Generate printable analysis report"""
-    aia_file = get_object_or_404(AiaFile, pk=pk)
-    
-    if not aia_file.is_analyzed:
-        messages.warning(request, 'Este arquivo ainda não foi analisado.')
-        return redirect('file_detail', pk=pk)
-    
-    evaluation = get_object_or_404(UsabilityEvaluation, aia_file=aia_file)
+def render_report_sections(evaluation, keys, render):
+    """
+    Seções salvas da avaliação convertidas em HTML
+
+    Avaliações anteriores às seções (ver build_structured_reports) usam o
+    texto completo de UsabilityEvaluation.recommendations.
+
+    Args:
+        keys: chaves das seções exibidas (None = todas)
+        render: função texto -> HTML
+
+    Returns:
+        [{'key', 'title', 'html'}, ...] na ordem do relatório
+    """
+    sections = get_report_sections(evaluation, keys)
+    if not sections and not evaluation.sections.exists() and evaluation.recommendations:
+        sections = {'recommendations': evaluation.recommendations}
+    return [
+        {'key': key, 'title': SECTION_TITLES.get(key, key), 'html': render(content)}
+        for key, content in sections.items()
+    ]
+
+
+def build_print_report(aia_file, evaluation):
+    """Contadores e seções (já em HTML) do relatório de impressão"""
     images = aia_file.images.all()
     
+    # Todos os contadores em uma única consulta (agregação condicional)
+    counts = images.alias(
+        ratio=Round(Cast('width', FloatField()) / NullIf('height', 0), 2)
+    ).aggregate(
+        total_images=Count('id'),
+        total_icons=Count('id', filter=Q(asset_type='icon')),
+        high_quality_count=Count('id', filter=Q(quality_rating__in=['high', 'excellent'])),
+        medium_quality_count=Count('id', filter=Q(quality_rating='medium')),
+        low_quality_count=Count('id', filter=Q(quality_rating='low')),
+        # Mesmo critério de ImageAsset.aspect_ratio (0 quando a altura é 0)
+        irregular_proportions=Count(
+            'id', filter=Q(height__lte=0) | Q(ratio__lt=0.8) | Q(ratio__gt=1.25)
+        ),
+    )
+    
     # Contadores por qualidade
-    high_quality_count = images.filter(quality_rating__in=['high', 'excellent']).count()
-    medium_quality_count = images.filter(quality_rating='medium').count()
-    low_quality_count = images.filter(quality_rating='low').count()
+    high_quality_count = counts['high_quality_count']
+    medium_quality_count = counts['medium_quality_count']
+    low_quality_count = counts['low_quality_count']
     
     # Contadores por tipo
-    total_images = images.count()
-    total_icons = images.filter(asset_type='icon').count()
+    total_images = counts['total_images']
+    total_icons = counts['total_icons']
     
-    # Usar as recomendações detalhadas do sistema
-    detailed_recommendations = evaluation.recommendations if evaluation.recommendations else ""
+    # Usar as seções do relatório salvas pela análise
+    report_sections = render_report_sections(evaluation, None, format_report)
     
     # Se não há recomendações salvas, gerar recomendações básicas
-    if not detailed_recommendations:
+    if not report_sections:
         recommendations = []
         
         if evaluation.image_quality_score < 70:
@@ -233,26 +466,140 @@ def print_analysis(request, pk):
             recommendations.append("Excelente trabalho! Seu projeto apresenta alta qualidade de usabilidade.")
         
         # Adicionar recomendações específicas baseadas em proporções
-        irregular_proportions = 0
-        for image in images:
-            if image.aspect_ratio < 0.8 or image.aspect_ratio > 1.25:
-                irregular_proportions += 1
+        irregular_proportions = counts['irregular_proportions']
         
         if irregular_proportions > 0:
             recommendations.append(f"Ajuste as proporções de {irregular_proportions} imagem(ns) para melhor adaptação em dispositivos móveis. Prefira proporções como 16:9, 4:3 ou 1:1.")
         
-        detailed_recommendations = '\n'.join([f"• {rec}" for rec in recommendations])
+        if recommendations:
+            report_sections = [{
+                'key': 'recommendations',
+                'title': SECTION_TITLES['recommendations'],
+                'html': format_report('\n'.join([f"• {rec}" for rec in recommendations])),
+            }]
     
-    context = {
-        'aia_file': aia_file,
-        'evaluation': evaluation,
-        'images': images,
+    return {
         'total_images': total_images,
         'total_icons': total_icons,
         'high_quality_count': high_quality_count,
         'medium_quality_count': medium_quality_count,
         'low_quality_count': low_quality_count,
-        'detailed_recommendations': detailed_recommendations,
+        'report_sections': report_sections,
+    }
+
+
+def api_file_list(request):
+    """Lista de arquivos em JSON para rolagem infinita (?after=<cursor>&limit=<n>)"""
+    try:
+        page_size = int(request.GET.get('limit', FILE_LIST_PAGE_SIZE))
+    except ValueError:
+        page_size = FILE_LIST_PAGE_SIZE
+    page_size = max(1, min(page_size, FILE_LIST_MAX_PAGE_SIZE))
+    
+    page = get_file_list_page(request, page_size)
+    files = []
+    for aia_file in page:
+        evaluation = getattr(aia_file, 'evaluation', None)
+        files.append({
+            'id': aia_file.pk,
+            'name': aia_file.name,
+            'uploaded_at': aia_file.uploaded_at.isoformat(),
+            'uploaded_by': aia_file.uploaded_by.username if aia_file.uploaded_by else None,
+            'is_analyzed': aia_file.is_analyzed,
+            'total_images': aia_file.total_images,
+            'total_icons': aia_file.total_icons,
+            'overall_usability_score': evaluation.overall_usability_score if evaluation else None,
+            'total_issues': evaluation.total_issues if evaluation else None,
+            'detail_url': reverse('file_detail', args=[aia_file.pk]),
+        })
+    
+    return JsonResponse({
+        'files': files,
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    })
+
+
+FINDINGS_MAX_LIMIT = 500
+
+
+def api_findings(request):
+    """
+    Problemas encontrados em todos os projetos, em JSON
+    
+    Filtros (opcionais): ?category=contrast&severity=high&since=2026-02-01&until=2026-07-31&limit=100
+    """
+    findings = Finding.objects.select_related('evaluation__aia_file', 'image_asset').order_by('-created_at', '-id')
+    
+    for param, field in (('category', 'category'), ('severity', 'severity')):
+        value = request.GET.get(param)
+        if value:
+            findings = findings.filter(**{f'{field}__in': value.split(',')})
+    
+    # Intervalo por data, comparado como datetime para aproveitar finding_category_idx
+    for param, lookup, days in (('since', 'created_at__gte', 0), ('until', 'created_at__lt', 1)):
+        value = request.GET.get(param)
+        if value:
+            try:
+                day = datetime.date.fromisoformat(value) + datetime.timedelta(days=days)
+            except ValueError:
+                return JsonResponse({'error': f'Data inválida em {param}: use AAAA-MM-DD'}, status=400)
+            start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+            findings = findings.filter(**{lookup: start})
+    
+    try:
+        limit = int(request.GET.get('limit', 100))
+    except ValueError:
+        limit = 100
+    limit = max(1, min(limit, FINDINGS_MAX_LIMIT))
+    
+    results = []
+    for finding in findings[:limit]:
+        aia_file = finding.evaluation.aia_file
+        results.append({
+            'id': finding.pk,
+            'category': finding.category,
+            'severity': finding.severity,
+            'message': finding.message,
+            'screen': finding.screen,
+            'image': finding.image_asset.name if finding.image_asset else None,
+            'project': {'id': aia_file.pk, 'name': aia_file.name},
+            'created_at': finding.created_at.isoformat(),
+            'results_url': reverse('analysis_results', args=[aia_file.pk]),
+        })
+    
+    return JsonResponse({'findings': results})
+
+
+def print_analysis(request, pk):
+    """Generate printable analysis report"""
+    aia_file = get_object_or_404(AiaFile, pk=pk)
+    
+    if not aia_file.is_analyzed:
+        messages.warning(request, 'Este arquivo ainda não foi analisado.')
+        return redirect('file_detail', pk=pk)
+    
+    evaluation = get_object_or_404(UsabilityEvaluation.objects.defer('recommendations'), aia_file=aia_file)
+    
+    # Contadores e seções em HTML ficam em cache até a próxima reanálise
+    report = get_cached_report(evaluation, 'print', lambda: build_print_report(aia_file, evaluation))
+    
+    context = {
+        'aia_file': aia_file,
+        'evaluation': evaluation,
+        **report,
     }
     
     return render(request, 'analyzer/print_analysis.html', context)
+
+
+def metrics(request):
+    """Métricas da aplicação no formato texto do Prometheus (ver analyzer/metrics.py)"""
+    if not is_metrics_enabled():
+        raise Http404('Métricas desabilitadas')
+    
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse('Token inválido', status=401, content_type='text/plain; charset=utf-8')
+    
+    return HttpResponse(render_metrics(), content_type=METRICS_CONTENT_TYPE)